@@ -1,256 +1,12 @@
+# New reminder message to every original recipient (To, CC, BCC).
+# Thin runner around the shared reminder engine (see ../reminder).
+# Run from this folder so its .env.encrypted / .env.key are picked up.
 import os
-import logging
-from datetime import timedelta
-from exchangelib import Credentials, Account, Configuration, DELEGATE
-from exchangelib.protocol import BaseProtocol, NoVerifyHTTPAdapter
-from exchangelib.folders import Inbox
-from exchangelib.items import Message
-import urllib3
-import pytz
-from dotenv import load_dotenv
-import subprocess
-from cryptography.fernet import Fernet
-import io
+import sys
 
-from outlookHelp import (
-    get_riyadh_datetime,
-    is_due_soon,
-    format_due_date_for_email,
-    get_reminder_subject,
-    get_reminder_body,
-    add_sent_category
-)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-# ================================================
-# 🔐 Secure Configuration
-# ================================================
-import subprocess
-from cryptography.fernet import Fernet
-import io
+from reminder.cli import main
 
-def load_encrypted_env():
-    """Load and decrypt the .env file."""
-    try:
-        # Get encryption key from Windows Credential Manager
-        result = subprocess.run(
-            ['cmdkey', '/list:exchange_app_key'],
-            capture_output=True,
-            text=True
-        )
-        
-        # If key not found in credential manager, try .env.key file
-        if 'Target: exchange_app_key' not in result.stdout:
-            if os.path.exists('.env.key'):
-                with open('.env.key', 'rb') as f:
-                    encryption_key = f.read()
-            else:
-                raise ValueError("Encryption key not found! Please store it in Windows Credential Manager.")
-        else:
-            # Extract key from credential manager (Windows-specific)
-            # For simplicity, we'll use the .env.key file method
-            # You can enhance this to actually retrieve from credential manager
-            if os.path.exists('.env.key'):
-                with open('.env.key', 'rb') as f:
-                    encryption_key = f.read()
-            else:
-                encryption_key = os.getenv("ENV_ENCRYPTION_KEY")
-                if not encryption_key:
-                    raise ValueError("Encryption key not found!")
-                encryption_key = encryption_key.encode()
-        
-        # Decrypt .env.encrypted file
-        cipher = Fernet(encryption_key)
-        with open('.env.encrypted', 'rb') as f:
-            encrypted_data = f.read()
-        
-        decrypted_data = cipher.decrypt(encrypted_data)
-        
-        # Load into environment
-        load_dotenv(stream=io.StringIO(decrypted_data.decode()))
-        
-    except FileNotFoundError:
-        print("⚠️  .env.encrypted not found, trying regular .env file...")
-        load_dotenv()
-    except Exception as e:
-        print(f"❌ Error loading encrypted environment: {e}")
-        print("Falling back to regular .env file...")
-        load_dotenv()
-
-load_dotenv()  # Load .env file if present (optional)
-
-EXCHANGE_USERNAME = os.getenv("EXCHANGE_USERNAME")
-EXCHANGE_PASSWORD = os.getenv("EXCHANGE_PASSWORD")
-EXCHANGE_EMAIL = os.getenv("EXCHANGE_EMAIL")
-EXCHANGE_URL = os.getenv("EXCHANGE_URL")
-
-FOLDER_NAME = "Flag"
-SENT_CATEGORY = "AutoReminderSent"
-
-if not all([EXCHANGE_USERNAME, EXCHANGE_PASSWORD, EXCHANGE_EMAIL, EXCHANGE_URL]):
-    raise ValueError(
-        "Missing Exchange environment variables. Please set EXCHANGE_USERNAME, "
-        "EXCHANGE_PASSWORD, EXCHANGE_EMAIL, and EXCHANGE_URL."
-    )
-
-# ================================================
-# ⚙️ Logging & Security
-# ================================================
-logging.basicConfig(level=logging.WARNING)
-urllib3.disable_warnings()
-
-# ================================================
-# 📧 Exchange Connection
-# ================================================
-def get_exchange_account():
-    """Establish connection to the Exchange account."""
-    BaseProtocol.HTTP_ADAPTER_CLS = NoVerifyHTTPAdapter
-    credentials = Credentials(EXCHANGE_USERNAME, EXCHANGE_PASSWORD)
-    config = Configuration(credentials=credentials, service_endpoint=EXCHANGE_URL)
-    account = Account(
-        primary_smtp_address=EXCHANGE_EMAIL,
-        config=config,
-        autodiscover=False,
-        access_type=DELEGATE
-    )
-    return account
-
-
-# ================================================
-# 📬 Email Processing Helpers
-# ================================================
-def email_should_be_processed(msg):
-    """Check if an email meets all the criteria for processing."""
-    try:
-        categories = msg.categories or []
-        return SENT_CATEGORY not in categories
-    except Exception as e:
-        print(f"Error checking email criteria for '{getattr(msg, 'subject', 'unknown')}': {e}")
-        return False
-
-
-def get_original_recipients(msg):
-    """Extract all original recipients from the email."""
-    recipients = []
-    for field in [msg.to_recipients, msg.cc_recipients, msg.bcc_recipients]:
-        if field:
-            for recipient in field:
-                if recipient.email_address:
-                    recipients.append(recipient.email_address)
-    # Remove duplicates
-    unique = list({r.lower(): r for r in recipients}.values())
-    return "; ".join(unique)
-
-
-def send_reminder_email(account, recipients, subject, body):
-    """Create and send a new email using exchangelib."""
-    try:
-        mail = Message(
-            account=account,
-            subject=subject,
-            body=body
-        )
-        mail.to_recipients = recipients.split('; ')
-        mail.send()
-        print(f"✅ Reminder sent successfully to: {recipients}")
-        return True
-    except Exception as e:
-        print(f"❌ Error sending email via EWS: {e}")
-        return False
-
-
-# ================================================
-# 🚀 Main Logic
-# ================================================
-def main():
-    """Main function to check flagged emails and send reminders."""
-    print("🔄 Starting Exchange reminder process...")
-
-    try:
-        account = get_exchange_account()
-        now_riyadh = get_riyadh_datetime()
-
-        try:
-            target_folder = account.inbox / FOLDER_NAME
-            print(f"📁 Using folder: {target_folder.name}")
-        except Exception as e:
-            print(f"❌ Could not find '{FOLDER_NAME}' folder under Inbox: {e}")
-            return
-
-        messages = list(target_folder.all())
-        total_count = len(messages)
-        print(f"📬 Found {total_count} messages in '{FOLDER_NAME}' folder.")
-
-        if total_count == 0:
-            print("ℹ️ No messages found. Exiting.")
-            return
-
-        flagged_count = 0
-        reminder_count = 0
-
-        for msg in messages:
-            try:
-                print(f"\n{'='*60}")
-                print(f"Processing: {msg.subject}")
-                print(f"{'='*60}")
-
-                reminder_is_set = getattr(msg, 'reminder_is_set', None)
-                reminder_due_by = getattr(msg, 'reminder_due_by', None)
-
-                print(f"  reminder_is_set: {reminder_is_set}")
-                print(f"  reminder_due_by: {reminder_due_by}")
-
-                if not reminder_is_set or not reminder_due_by:
-                    print("  ⚠️ Skipping: No reminder or due date.")
-                    continue
-
-                flagged_count += 1
-
-                categories = msg.categories or []
-                if not email_should_be_processed(msg):
-                    print(f"  ⚠️ Already processed ({SENT_CATEGORY} exists). Skipping.")
-                    continue
-
-                is_due = is_due_soon(reminder_due_by, now_riyadh)
-                print(f"  Is due within 2 days? {is_due}")
-
-                if not is_due:
-                    print("  ℹ️ Not due yet. Skipping.")
-                    continue
-
-                recipients = get_original_recipients(msg)
-                if not recipients:
-                    print("  ⚠️ No recipients found. Skipping.")
-                    continue
-
-                subject = get_reminder_subject(msg.subject)
-                due_date_str = format_due_date_for_email(reminder_due_by, now_riyadh.tzinfo)
-                body = get_reminder_body(msg.subject, due_date_str)
-
-                if send_reminder_email(account, recipients, subject, body):
-                    msg.categories = add_sent_category(categories, SENT_CATEGORY)
-                    msg.save(update_fields=['categories'])
-                    reminder_count += 1
-                    print("  ✅ Reminder marked as sent.")
-
-            except Exception as e:
-                print(f"❌ Error processing '{getattr(msg, 'subject', 'unknown')}': {e}")
-                import traceback
-                traceback.print_exc()
-                continue
-
-        print(f"\n📊 Summary:")
-        print(f"  - Total messages: {total_count}")
-        print(f"  - Flagged with due dates: {flagged_count}")
-        print(f"  - Reminders sent: {reminder_count}")
-
-    except Exception as e:
-        print(f"❌ Error in main process: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-# ================================================
-# 🏁 Entry Point
-# ================================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(["--recipients", "all", "--transport", "new-message"] + sys.argv[1:])
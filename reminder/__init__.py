@@ -0,0 +1,31 @@
+# reminder
+# Follow-up reminder engine shared by all mailbox runners:
+#
+#   python -m reminder --recipients to-only --plan plan.json
+#
+# Strategies (recipients, transport, template) and the mailbox backend are
+# pluggable; see recipients.py, transports.py, templates.py and backends/.
+from .backends import SEARCH_SOURCE, MailboxBackend, MemoryBackend, get_backend
+from .breaker import CircuitBreaker, CircuitOpen, GuardedBackend
+from .checkpoint import Checkpoint
+from .dedup import DedupIndex
+from .engine import ReminderEngine, print_plan
+from .groups import GroupExpander
+from .hedge import HedgedBackend, ReadTimeout
+from .identity import IdentityResolver
+from .ledger import SentLedger
+from .mailtips import MailTipsFilter
+from .mirror import InboxMirror
+from .models import MailItem, add_sent_category
+from .ndr import Suppressions
+from .outbox import Outbox
+from .recipients import (
+    RECIPIENT_POLICIES, AllRecipients, NonResponders, RecipientPolicy, ReplyAllRecipients, ToOnlyNonResponders,
+)
+from .schedule import ReminderSchedule
+from .store import TtlCache, connect
+from .templates import TEMPLATES, ArabicReminderTemplate, RiyadhLabelTemplate
+from .threads import ReplyGraph
+from .transports import (
+    TRANSPORTS, DigestTransport, NewMessageTransport, ReplyAllTransport, ReplyTransport, SmtpRelayTransport, Transport,
+)
@@ -0,0 +1,19 @@
+# Mailbox backends. The EWS backend needs exchangelib and is imported lazily
+# so the engine and the in-memory backend work without it; the Graph backend
+# only needs the standard library.
+from .base import SEARCH_SOURCE, MailboxBackend, chunked
+from .memory import MemoryBackend
+
+
+def get_backend(name, **kwargs):
+    """Create a backend by name ('ews', 'graph' or 'memory')."""
+    if name == "ews":
+        from .ews import EwsBackend
+        return EwsBackend(**kwargs)
+    if name == "graph":
+        from .graph import GraphBackend
+        return GraphBackend(**kwargs)
+    if name == "memory":
+        fixture = kwargs.get("fixture")
+        return MemoryBackend.from_json(fixture) if fixture else MemoryBackend()
+    raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,156 @@
+# base.py
+# Mailbox access used by the engine. Every method is batched: the engine
+# hands over everything it needs for the run and never loops over the server.
+import threading
+
+BATCH_SIZE = 100
+# Pseudo folder name: every flagged item in the mailbox, found through the
+# server-maintained flag index instead of a manually filled folder
+SEARCH_SOURCE = "@flagged"
+
+_count_lock = threading.Lock()
+
+
+def in_window(value, since=None, until=None):
+    """True if `value` lies in [since, until]; unknown times are kept."""
+    if value is None:
+        return True
+    return (since is None or value >= since) and (until is None or value <= until)
+
+
+def chunked(values, size=BATCH_SIZE):
+    """Yield successive lists of at most `size` values."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class MailboxBackend:
+    """Interface implemented by the EWS and in-memory backends."""
+    name = None
+    # Identifies the mailbox in local state (ledger, outbox)
+    mailbox = None
+    # Server requests made so far, retries and hedged twins included; None
+    # for backends without a server (the breaker then counts method calls)
+    requests_made = None
+
+    def count_requests(self, count=1):
+        """Add `count` server requests; safe from the read threads."""
+        with _count_lock:
+            self.requests_made = (self.requests_made or 0) + count
+
+    def scan_flagged(self, folder_name, offset=0, limit=None, below_stage=None):
+        """
+        Return MailItem objects for the items of the follow-up folder (or of
+        SEARCH_SOURCE), oldest first; `offset`/`limit` select one page of that
+        stable order. Only the cheap candidate fields are required here: id,
+        changekey, subject, reminder flag, due date and categories.
+        With `below_stage`, items whose hidden reminder state already has that
+        stage (or a later one) are filtered out by the server.
+        """
+        raise NotImplementedError
+
+    def fetch_details(self, items):
+        """
+        Sender, recipients, groups and thread ids of scanned `items`, called
+        only for items that passed the due check. Returns {item id: MailItem
+        carrying those fields, or the exception}; `items` are left untouched.
+        """
+        raise NotImplementedError
+
+    def count_items(self, folder_name, below_stage=None):
+        """Number of items scan_flagged would return unpaged."""
+        raise NotImplementedError
+
+    # Inbox reads take an optional received-time window [since, until];
+    # backends push it into the server query so results scale with the thread.
+
+    def conversation_senders(self, conversation_ids, since=None, until=None):
+        """Return {conversation id: {inbox item id: sender address}}."""
+        raise NotImplementedError
+
+    def subject_senders(self, subject, since=None, until=None):
+        """Return {inbox item id: sender address} for items whose subject contains `subject`."""
+        raise NotImplementedError
+
+    def expand_groups(self, addresses):
+        """
+        Return {address: [(member address, member is a group), ...]} for each
+        distribution list; None for addresses that can't be expanded.
+        """
+        raise NotImplementedError
+
+    def resolve_addresses(self, addresses):
+        """
+        Return {address: (primary SMTP address, [proxy aliases])} for each
+        address the directory knows; None for the rest.
+        """
+        raise NotImplementedError
+
+    def mail_tips(self, addresses):
+        """
+        Return {address: {"oof": bool, "invalid": bool, "max_size": bytes or None}}
+        from MailTips; None for addresses without tips.
+        """
+        raise NotImplementedError
+
+    def inbox_headers(self, since=None, until=None):
+        """
+        Yield MailItem objects carrying only internet_message_id, in_reply_to,
+        references, sender and datetime_received for Inbox items received
+        in the window (all of them when unbounded).
+        """
+        raise NotImplementedError
+
+    def delivery_reports(self, since=None):
+        """
+        Non-delivery reports in the Inbox received since `since` (all when None),
+        as [(item id, received datetime, raw MIME)].
+        """
+        raise NotImplementedError
+
+    def sync_inbox(self, sync_state=None):
+        """
+        Inbox changes since `sync_state` (None: everything).
+        Returns ([("create"|"update", MailItem) or ("delete", item id), ...], new sync state).
+        """
+        raise NotImplementedError
+
+    def send_replies(self, reminders, reply_all=True):
+        """
+        Reply to each reminder's original item, as a reply-all or (with
+        `reply_all` off) a plain reply; either way To is the reminder's
+        recipients and CC stays empty. Returns True or an exception per reminder.
+        """
+        raise NotImplementedError
+
+    def send_new_messages(self, reminders):
+        """Send each reminder as a new message. Returns True or an exception per reminder."""
+        raise NotImplementedError
+
+    def schedule_reminders(self, reminders):
+        """
+        Reply on each reminder's thread with deferred delivery at reminder["send_at"]
+        (ISO string); the message waits in the mailbox, tagged with the item id,
+        until the server sends it. Returns True or an exception per reminder.
+        """
+        raise NotImplementedError
+
+    def cancel_scheduled(self, item_ids):
+        """
+        Delete the deferred reminders of `item_ids` that were not sent yet.
+        Returns {item id: True if one was deleted, False if none was pending}.
+        """
+        raise NotImplementedError
+
+    def add_category(self, item_ids, category, states=None):
+        """
+        Add `category` to each item. `states` ({item id: (stage, recipients,
+        sent at)}) is written to the hidden reminder-state property in the
+        same update.
+        Returns True or an exception per item id.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections, if any."""
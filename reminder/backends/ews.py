@@ -0,0 +1,496 @@
+# ews.py
+# Exchange Web Services backend (exchangelib).
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import urllib3
+from exchangelib import Credentials, Account, Configuration, DELEGATE, EWSDateTime, Q
+from exchangelib.errors import ErrorFolderNotFound
+from exchangelib.extended_properties import ExtendedProperty
+from exchangelib.folders import DeletedItems, FolderCollection, JunkEmail
+from exchangelib.items import HARD_DELETE, Message, ReplyAllToItem, ReplyToItem, SEND_AND_SAVE_COPY
+from exchangelib.properties import ConversationId, Mailbox, ReferenceItemId, SendingAs
+from exchangelib.protocol import BaseProtocol, NoVerifyHTTPAdapter
+from exchangelib.services import GetMailTips
+from exchangelib.util import add_xml_child
+
+from ..dates import parse_datetime
+from ..ledger import recipients_hash
+from ..models import MailItem, add_sent_category
+from ..recorder import get_http_adapter_cls
+from .base import SEARCH_SOURCE, MailboxBackend, chunked
+
+logging.basicConfig(level=logging.WARNING)
+urllib3.disable_warnings()
+
+# Phase one: fields FindItem returns itself, so the scan needs no GetItem
+SCAN_FIELDS = ['id', 'changekey', 'subject', 'reminder_is_set', 'reminder_due_by', 'categories']
+# Phase two: recipient collections need GetItem; fetched for due items only
+DETAIL_FIELDS = [
+    'conversation_id', 'sender', 'to_recipients', 'cc_recipients', 'bcc_recipients',
+    'datetime_sent', 'message_id', 'references',
+]
+DETAIL_BATCH_SIZE = 250
+HEADER_FIELDS = ['message_id', 'in_reply_to', 'references', 'sender', 'datetime_received']
+MIRROR_FIELDS = HEADER_FIELDS + ['conversation_id', 'subject']
+INBOX_PAGE_SIZE = 1000
+GROUP_MAILBOX_TYPES = {'PublicDL', 'PrivateDL'}
+EXPAND_WORKERS = 4
+RESOLVE_WORKERS = 4
+MAILTIPS_BATCH_SIZE = 50
+NDR_ITEM_CLASS = 'REPORT.IPM.Note.NDR'
+# Never searched for flagged items, subfolders included
+SKIPPED_FOLDERS = (DeletedItems, JunkEmail)
+# PidTagFlagStatus: 2 = flagged for follow-up, 1 = complete
+FLAG_ACTIVE = 2
+
+
+class FlagStatus(ExtendedProperty):
+    property_tag = 0x1090
+    property_type = 'Integer'
+
+
+# Hidden reminder state written next to the sent category; named properties
+# in PS_PUBLIC_STRINGS, so they are indexed and can restrict FindItem
+class ReminderStage(ExtendedProperty):
+    distinguished_property_set_id = 'PublicStrings'
+    property_name = 'AutoReminderStage'
+    property_type = 'Integer'
+
+
+class ReminderLastSent(ExtendedProperty):
+    distinguished_property_set_id = 'PublicStrings'
+    property_name = 'AutoReminderLastSent'
+    property_type = 'SystemTime'
+
+
+class ReminderRecipientsHash(ExtendedProperty):
+    distinguished_property_set_id = 'PublicStrings'
+    property_name = 'AutoReminderRecipientsHash'
+    property_type = 'String'
+
+
+# PidTagDeferredSendTime: the server holds the message until this moment
+class DeferredSendTime(ExtendedProperty):
+    property_tag = 0x3FEF
+    property_type = 'SystemTime'
+
+
+# Original item a scheduled reminder belongs to, so it can be found and cancelled
+class ReminderFor(ExtendedProperty):
+    distinguished_property_set_id = 'PublicStrings'
+    property_name = 'AutoReminderFor'
+    property_type = 'String'
+
+
+Message.register('flag_status', FlagStatus)
+Message.register('reminder_stage', ReminderStage)
+Message.register('reminder_last_sent', ReminderLastSent)
+Message.register('reminder_recipients_hash', ReminderRecipientsHash)
+Message.register('deferred_send_time', DeferredSendTime)
+Message.register('reminder_for', ReminderFor)
+REMINDER_STATE_FIELDS = ['reminder_stage', 'reminder_last_sent', 'reminder_recipients_hash']
+
+
+class MailTipsRequest(GetMailTips):
+    """GetMailTips with a <m:MailTipsRequested> element; exchangelib writes the value as bare text."""
+
+    def get_payload(self, recipients, sending_as, mail_tips_requested):
+        payload = super().get_payload(recipients, sending_as, None)
+        add_xml_child(payload, 'm:MailTipsRequested', mail_tips_requested)
+        return payload
+
+
+def _address(mailbox):
+    """Lowercase SMTP address of an exchangelib Mailbox, or None."""
+    address = getattr(mailbox, 'email_address', None)
+    return address.lower() if address else None
+
+
+def searchable_folders(folders):
+    """Mail folders of a walked hierarchy, without Deleted Items, Junk Email and their subfolders."""
+    parents = {f.id: f.parent_folder_id.id if f.parent_folder_id else None for f in folders}
+    skipped = {f.id for f in folders if isinstance(f, SKIPPED_FOLDERS)}
+
+    def is_skipped(folder_id):
+        while folder_id is not None and folder_id not in skipped:
+            folder_id = parents.get(folder_id)
+        return folder_id is not None
+
+    return [f for f in folders if f.CONTAINER_CLASS == 'IPF.Note' and not is_skipped(f.id)]
+
+
+def _addresses(mailboxes):
+    return [a for a in (_address(m) for m in mailboxes or []) if a]
+
+
+def _is_group(mailbox):
+    return getattr(mailbox, 'mailbox_type', None) in GROUP_MAILBOX_TYPES
+
+
+def _to_datetime(value):
+    """EWSDateTime -> plain aware datetime in UTC."""
+    if not value:
+        return None
+    if value.tzinfo is None:
+        return datetime.datetime(*value.timetuple()[:6], tzinfo=datetime.timezone.utc)
+    return datetime.datetime.fromtimestamp(value.timestamp(), tz=datetime.timezone.utc)
+
+
+def to_mail_item(msg):
+    """Convert an exchangelib Message into a MailItem."""
+    conversation_id = getattr(msg, 'conversation_id', None)
+    recipients = [
+        *(getattr(msg, 'to_recipients', None) or []),
+        *(getattr(msg, 'cc_recipients', None) or []),
+        *(getattr(msg, 'bcc_recipients', None) or []),
+    ]
+    return MailItem(
+        id=msg.id,
+        changekey=msg.changekey,
+        subject=getattr(msg, 'subject', None),
+        reminder_is_set=getattr(msg, 'reminder_is_set', False),
+        due=_to_datetime(getattr(msg, 'reminder_due_by', None)),
+        categories=getattr(msg, 'categories', None),
+        conversation_id=conversation_id.id if conversation_id else None,
+        sender=_address(getattr(msg, 'sender', None)),
+        to=_addresses(getattr(msg, 'to_recipients', None)),
+        cc=_addresses(getattr(msg, 'cc_recipients', None)),
+        bcc=_addresses(getattr(msg, 'bcc_recipients', None)),
+        datetime_sent=_to_datetime(getattr(msg, 'datetime_sent', None)),
+        datetime_received=_to_datetime(getattr(msg, 'datetime_received', None)),
+        internet_message_id=getattr(msg, 'message_id', None),
+        in_reply_to=getattr(msg, 'in_reply_to', None),
+        references=getattr(msg, 'references', None),
+        groups=[_address(m) for m in recipients if _is_group(m) and _address(m)],
+    )
+
+
+def to_mail_tip(tip):
+    """Convert an exchangelib MailTips into the backend's tip dict."""
+    # ReplyBody is only returned while the automatic reply is active; it is plain text
+    reply = tip.out_of_office.reply_body if tip.out_of_office else None
+    return {
+        'oof': bool(reply and reply.strip()),
+        'invalid': bool(tip.invalid_recipient),
+        'max_size': tip.max_message_size,
+    }
+
+
+def counting_adapter(adapter_cls, backend):
+    """Subclass of exchangelib's HTTP adapter that counts every SOAP request on `backend`."""
+
+    class CountingAdapter(adapter_cls):
+        def send(self, request, **kwargs):
+            backend.count_requests()
+            return super().send(request, **kwargs)
+
+    return CountingAdapter
+
+
+class EwsBackend(MailboxBackend):
+    """Mailbox access over EWS with batched CreateItem/GetItem/UpdateItem calls."""
+    name = "ews"
+
+    def __init__(self, settings, timeout=None):
+        self.settings = settings
+        self.timeout = timeout
+        self.mailbox = settings.email.lower()
+        self._account = None
+        self._search_source = None
+        self.requests_made = 0
+
+    # ================================================
+    # 🔧 Exchange Connection
+    # ================================================
+    @property
+    def account(self):
+        """Establish connection to the Exchange account on first use."""
+        if self._account is None:
+            # EWS_RECORD_FILE / EWS_REPLAY_FILE swap in the record-and-replay adapter
+            BaseProtocol.HTTP_ADAPTER_CLS = counting_adapter(get_http_adapter_cls(NoVerifyHTTPAdapter), self)
+            if self.timeout is not None:
+                # Hard socket timeout, so an abandoned read cannot hang its thread forever
+                BaseProtocol.TIMEOUT = self.timeout
+            credentials = Credentials(self.settings.username, self.settings.password)
+            config = Configuration(credentials=credentials, service_endpoint=self.settings.url)
+            self._account = Account(
+                primary_smtp_address=self.settings.email,
+                config=config,
+                autodiscover=False,
+                access_type=DELEGATE
+            )
+        return self._account
+
+    def close(self):
+        if self._account is not None:
+            self._account.protocol.close()
+
+    # ================================================
+    # 📖 Reads
+    # ================================================
+    def _flagged_search(self):
+        """
+        Server-maintained view of flagged items across the whole mailbox: the
+        well-known To-Do search folder, or one FindItem over every mail folder
+        when Outlook has not created it yet.
+        """
+        if self._search_source is None:
+            try:
+                self._search_source = self.account.todo_search
+                print(f"📁 Using search folder: {self._search_source.name}")
+            except ErrorFolderNotFound:
+                folders = searchable_folders(list(self.account.msg_folder_root.walk()))
+                self._search_source = FolderCollection(account=self.account, folders=folders)
+                print(f"📁 No To-Do search folder; searching {len(folders)} mail folders")
+        return self._search_source
+
+    def _flagged_query(self, folder_name):
+        if folder_name == SEARCH_SOURCE:
+            # Flag status is indexed, so the restriction is evaluated by the server
+            return self._flagged_search().filter(flag_status=FLAG_ACTIVE)
+        target_folder = self.account.inbox / folder_name
+        print(f"📁 Using folder: {target_folder.name}")
+        return target_folder.all()
+
+    def _candidates(self, folder_name, below_stage=None):
+        query = self._flagged_query(folder_name)
+        if below_stage is not None:
+            query = query.filter(Q(reminder_stage__exists=False) | Q(reminder_stage__lt=below_stage))
+        return query
+
+    def scan_flagged(self, folder_name, offset=0, limit=None, below_stage=None):
+        # Oldest first, so positions stay stable while new items arrive
+        query = self._candidates(folder_name, below_stage).only(*SCAN_FIELDS).order_by('datetime_received')
+        if offset or limit is not None:
+            query = query[offset:None if limit is None else offset + limit]
+        return [to_mail_item(msg) for msg in query]
+
+    def fetch_details(self, items):
+        # No changekey: the details are wanted even if the item changed since the scan
+        ids = [(item.id, None) for item in items]
+        fetched = self.account.fetch(ids=ids, only_fields=DETAIL_FIELDS, chunk_size=DETAIL_BATCH_SIZE)
+        return {
+            item.id: msg if isinstance(msg, Exception) else to_mail_item(msg)
+            for item, msg in zip(items, fetched)
+        }
+
+    def count_items(self, folder_name, below_stage=None):
+        if folder_name == SEARCH_SOURCE or below_stage is not None:
+            return self._candidates(folder_name, below_stage).count()
+        return (self.account.inbox / folder_name).total_count
+
+    def _inbox(self, since=None, until=None, **filters):
+        """Inbox query with the received-time window pushed to the server."""
+        if since is not None:
+            filters['datetime_received__gte'] = EWSDateTime.from_datetime(since)
+        if until is not None:
+            filters['datetime_received__lte'] = EWSDateTime.from_datetime(until)
+        return self.account.inbox.filter(**filters) if filters else self.account.inbox.all()
+
+    def conversation_senders(self, conversation_ids, since=None, until=None):
+        senders = {}
+        for batch in chunked(conversation_ids):
+            replies = self._inbox(
+                since, until, conversation_id__in=[ConversationId(id=c) for c in batch]
+            ).only('id', 'conversation_id', 'sender')
+            for reply in replies:
+                sender = _address(getattr(reply, 'sender', None))
+                if sender and reply.conversation_id:
+                    senders.setdefault(reply.conversation_id.id, {})[reply.id] = sender
+        return senders
+
+    def subject_senders(self, subject, since=None, until=None):
+        senders = {}
+        for reply in self._inbox(since, until, subject__contains=subject).only('id', 'sender'):
+            sender = _address(getattr(reply, 'sender', None))
+            if sender:
+                senders[reply.id] = sender
+        return senders
+
+    def mail_tips(self, addresses):
+        tips = {address: None for address in addresses}
+        sending_as = SendingAs(email_address=self.settings.email)
+        service = MailTipsRequest(protocol=self.account.protocol)
+        for batch in chunked(sorted(tips), MAILTIPS_BATCH_SIZE):
+            found = service.call(
+                sending_as=sending_as,
+                recipients=[Mailbox(email_address=address) for address in batch],
+                mail_tips_requested='All',
+            )
+            for tip in found:
+                if isinstance(tip, Exception):
+                    continue
+                tips[_address(tip.recipient_address)] = to_mail_tip(tip)
+        return tips
+
+    def inbox_headers(self, since=None, until=None):
+        query = self._inbox(since, until).only(*HEADER_FIELDS)
+        query.page_size = INBOX_PAGE_SIZE
+        for msg in query:
+            yield MailItem(
+                id=msg.id,
+                internet_message_id=msg.message_id,
+                in_reply_to=msg.in_reply_to,
+                references=msg.references,
+                sender=_address(getattr(msg, 'sender', None)),
+                datetime_received=_to_datetime(msg.datetime_received),
+            )
+
+    def delivery_reports(self, since=None):
+        # One projected query: only NDRs, only what the DSN parser needs
+        query = self._inbox(since, None, item_class__startswith=NDR_ITEM_CLASS).only(
+            'id', 'datetime_received', 'mime_content'
+        )
+        return [(report.id, _to_datetime(report.datetime_received), report.mime_content) for report in query]
+
+    def sync_inbox(self, sync_state=None):
+        inbox = self.account.inbox
+        changes = []
+        for change_type, item in inbox.sync_items(sync_state=sync_state, only_fields=MIRROR_FIELDS):
+            if change_type == 'delete':
+                changes.append(('delete', item.id))
+            elif change_type in ('create', 'update'):
+                changes.append((change_type, to_mail_item(item)))
+        # exchangelib keeps the state of the finished sync on the folder
+        return changes, inbox.item_sync_state
+
+    def expand_groups(self, addresses):
+        # EWS ExpandDL takes one list per request; run the run's DLs side by side
+        def expand(address):
+            try:
+                return [(_address(m), _is_group(m)) for m in self.account.protocol.expand_dl(address) if _address(m)]
+            except Exception as e:
+                print(f"  ⚠️ Could not expand '{address}': {e}")
+                return None
+
+        addresses = list(addresses)
+        with ThreadPoolExecutor(max_workers=EXPAND_WORKERS) as pool:
+            return dict(zip(addresses, pool.map(expand, addresses)))
+
+    def resolve_addresses(self, addresses):
+        # ResolveNames answers one name per request; run the run's unseen addresses side by side
+        def resolve(address):
+            try:
+                found = [
+                    r for r in self.account.protocol.resolve_names([address], return_full_contact_data=True)
+                    if not isinstance(r, Exception)
+                ]
+            except Exception as e:
+                print(f"  ⚠️ Could not resolve '{address}': {e}")
+                return None
+            # Ambiguous or unknown names stay unresolved
+            if len(found) != 1:
+                return None
+            mailbox, contact = found[0]
+            if not _address(mailbox):
+                return None
+            aliases = []
+            for entry in getattr(contact, 'email_addresses', None) or []:
+                email = getattr(entry, 'email', None)
+                if email:
+                    # Proxy addresses come back as 'smtp:alias@...' / 'X500:/O=...'; senders
+                    # carry an old X500 DN without its prefix, like a legacyExchangeDN
+                    prefix, _, value = email.partition(':')
+                    aliases.append(value if prefix.lower() in ('smtp', 'x500') and value else email)
+            return _address(mailbox), aliases
+
+        addresses = list(addresses)
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+            return dict(zip(addresses, pool.map(resolve, addresses)))
+
+    # ================================================
+    # 📤 Writes
+    # ================================================
+    def send_replies(self, reminders, reply_all=True):
+        reply_cls = ReplyAllToItem if reply_all else ReplyToItem
+        replies = [
+            reply_cls(
+                account=self.account,
+                # No changekey: sending must not fail because the item changed since planning
+                reference_item_id=ReferenceItemId(id=reminder["id"]),
+                subject=reminder["template"]["subject"],
+                new_body=reminder["template"]["body"],
+                to_recipients=list(reminder["remind"]),
+                cc_recipients=[],
+            )
+            for reminder in reminders
+        ]
+        return self._create(replies)
+
+    def send_new_messages(self, reminders):
+        messages = [
+            Message(
+                account=self.account,
+                subject=reminder["template"]["subject"],
+                body=reminder["template"]["body"],
+                to_recipients=list(reminder["remind"]),
+            )
+            for reminder in reminders
+        ]
+        return self._create(messages)
+
+    def schedule_reminders(self, reminders):
+        # ReplyAllToItem can't carry extended properties: a plain Message with
+        # the thread headers set keeps the reminder on the original thread
+        messages = []
+        for reminder in reminders:
+            original = reminder.get("internet_message_id")
+            send_at = parse_datetime(reminder["send_at"]).astimezone(datetime.timezone.utc)
+            messages.append(Message(
+                account=self.account,
+                subject=reminder["template"]["subject"],
+                body=reminder["template"]["body"],
+                to_recipients=list(reminder["remind"]),
+                in_reply_to=original,
+                references=" ".join(filter(None, [reminder.get("references"), original])) or None,
+                deferred_send_time=EWSDateTime.from_datetime(send_at),
+                reminder_for=reminder["id"],
+            ))
+        return self._create(messages)
+
+    def cancel_scheduled(self, item_ids):
+        # Submitted deferred messages wait in the Outbox; Drafts holds the
+        # ones a client scheduled instead
+        folders = FolderCollection(account=self.account, folders=[self.account.outbox, self.account.drafts])
+        cancelled = set()
+        for batch in chunked(item_ids):
+            pending = list(folders.filter(reminder_for__in=batch).only('id', 'changekey', 'reminder_for'))
+            if not pending:
+                continue
+            deleted = self.account.bulk_delete(ids=pending, delete_type=HARD_DELETE)
+            cancelled.update(msg.reminder_for for msg, result in zip(pending, deleted) if result is True)
+        return {item_id: item_id in cancelled for item_id in item_ids}
+
+    def _create(self, items):
+        if not items:
+            return []
+        results = self.account.bulk_create(folder=None, items=items, message_disposition=SEND_AND_SAVE_COPY)
+        return [r if isinstance(r, Exception) else True for r in results]
+
+    def add_category(self, item_ids, category, states=None):
+        states = states or {}
+        results = {}
+        for batch in chunked(item_ids):
+            # Re-fetch to get the latest ChangeKey (and categories) before saving
+            fresh = list(self.account.fetch(ids=[(item_id, None) for item_id in batch], only_fields=['categories']))
+            updates = []
+            for item_id, msg in zip(batch, fresh):
+                if isinstance(msg, Exception):
+                    results[item_id] = msg
+                    continue
+                msg.categories = add_sent_category(msg.categories or [], category)
+                fields = ['categories']
+                if item_id in states:
+                    stage, recipients, sent_at = states[item_id]
+                    msg.reminder_stage = stage
+                    msg.reminder_last_sent = EWSDateTime.from_datetime(sent_at.astimezone(datetime.timezone.utc))
+                    msg.reminder_recipients_hash = recipients_hash(recipients)
+                    fields += REMINDER_STATE_FIELDS
+                updates.append((item_id, msg, fields))
+
+            saved = self.account.bulk_update(items=[(msg, fields) for _, msg, fields in updates]) if updates else []
+            for (item_id, _, _), result in zip(updates, saved):
+                results[item_id] = result if isinstance(result, Exception) else True
+        return [results[item_id] for item_id in item_ids]
@@ -0,0 +1,528 @@
+# graph.py
+# Microsoft Graph backend for mailboxes on Exchange Online. Per-item work
+# (detail fetches, sends, category updates, DL and alias lookups) goes out
+# as JSON $batch calls of up to 20 requests; the Inbox mirror is kept
+# current with a delta query. Plain urllib, so a local stand-in is enough
+# to exercise it (GRAPH_URL + GRAPH_TOKEN).
+import datetime
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from ..dates import parse_datetime
+from ..models import MailItem, add_sent_category
+from .base import SEARCH_SOURCE, MailboxBackend, in_window
+
+GRAPH_BATCH_SIZE = 20
+GRAPH_PAGE_SIZE = 500
+GRAPH_TIMEOUT = 60
+GRAPH_RETRIES = 3
+MAILTIPS_BATCH_SIZE = 100
+# PR_MESSAGE_CLASS of non-delivery reports
+NDR_FILTER = "singleValueExtendedProperties/any(ep: ep/id eq 'String 0x001A' and ep/value eq 'REPORT.IPM.Note.NDR')"
+# $orderby properties must lead the $filter, in the same order, or Graph
+# rejects the query as InefficientFilter; the date clause matches everything
+FLAGGED_FILTER = "receivedDateTime ge 1900-01-01T00:00:00Z and flag/flagStatus eq 'flagged'"
+# PidTagDeferredSendTime, and the PS_PUBLIC_STRINGS tag naming the item a scheduled reminder belongs to
+DEFERRED_SEND_PROPERTY = "SystemTime 0x3FEF"
+REMINDER_FOR_PROPERTY = "String {00020329-0000-0000-C000-000000000046} Name AutoReminderFor"
+# Submitted deferred messages wait in the Outbox; Drafts holds client-scheduled ones
+SCHEDULED_FOLDERS = ("outbox", "drafts")
+SCAN_SELECT = "id,changeKey,subject,flag,categories,receivedDateTime"
+DETAIL_SELECT = "changeKey,conversationId,sender,toRecipients,ccRecipients,bccRecipients,sentDateTime,internetMessageId"
+HEADER_SELECT = "id,conversationId,subject,sender,receivedDateTime,internetMessageId,internetMessageHeaders"
+
+
+class GraphError(Exception):
+    """A Graph request (or one request of a $batch) failed."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def _address(recipient):
+    """Lowercase SMTP address of a Graph recipient, or None."""
+    address = ((recipient or {}).get("emailAddress") or {}).get("address")
+    return address.lower() if address else None
+
+
+def _addresses(recipients):
+    return [a for a in (_address(r) for r in recipients or []) if a]
+
+
+def _recipients(addresses):
+    return [{"emailAddress": {"address": address}} for address in addresses]
+
+
+def _to_datetime(value):
+    """Graph time (UTC via the Prefer header) -> aware datetime."""
+    if isinstance(value, dict):
+        value = value.get("dateTime")
+    if not value:
+        return None
+    # Graph sends 7 fractional digits; fromisoformat takes at most 6
+    head, dot, fraction = value.rstrip("Z").partition(".")
+    return parse_datetime(f"{head}.{fraction[:6]}" if dot else head)
+
+
+def _graph_time(value):
+    return value.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _quoted(value):
+    """OData string literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _filter(expression):
+    return urllib.parse.quote(expression)
+
+
+def _header(headers, name):
+    for header in headers or []:
+        if header.get("name", "").lower() == name:
+            return header.get("value")
+    return None
+
+
+def to_mail_item(msg):
+    """Convert a Graph message resource into a MailItem."""
+    flag = msg.get("flag") or {}
+    headers = msg.get("internetMessageHeaders")
+    return MailItem(
+        id=msg["id"],
+        changekey=msg.get("changeKey"),
+        subject=msg.get("subject"),
+        reminder_is_set=flag.get("flagStatus") == "flagged",
+        due=_to_datetime(flag.get("dueDateTime")),
+        categories=msg.get("categories"),
+        conversation_id=msg.get("conversationId"),
+        sender=_address(msg.get("sender")),
+        to=_addresses(msg.get("toRecipients")),
+        cc=_addresses(msg.get("ccRecipients")),
+        bcc=_addresses(msg.get("bccRecipients")),
+        internet_message_id=msg.get("internetMessageId"),
+        in_reply_to=_header(headers, "in-reply-to"),
+        references=_header(headers, "references"),
+        datetime_sent=_to_datetime(msg.get("sentDateTime")),
+        datetime_received=_to_datetime(msg.get("receivedDateTime")),
+    )
+
+
+class GraphBackend(MailboxBackend):
+    """Mailbox access over Microsoft Graph with $batch writes and delta Inbox sync."""
+    name = "graph"
+
+    def __init__(self, settings, timeout=GRAPH_TIMEOUT):
+        self.settings = settings
+        self.mailbox = settings.mailbox.lower()
+        self.timeout = timeout
+        self.user = f"/users/{urllib.parse.quote(settings.mailbox)}"
+        self._token = None
+        self._token_expires = 0
+        self.requests_made = 0
+        self._folder_ids = {}
+        # Graph recipients carry no mailbox type: {address: is a group}, learned per run
+        self._is_group = {}
+
+    # ================================================
+    # 🔧 HTTP
+    # ================================================
+    def token(self):
+        """Bearer token: the configured one, or client credentials from Entra ID."""
+        if self.settings.token:
+            return self.settings.token
+        if self._token is None or time.time() > self._token_expires - 60:
+            form = urllib.parse.urlencode({
+                "grant_type": "client_credentials",
+                "client_id": self.settings.client_id,
+                "client_secret": self.settings.client_secret,
+                "scope": "https://graph.microsoft.com/.default",
+            }).encode()
+            with urllib.request.urlopen(self.settings.token_url, data=form, timeout=self.timeout) as response:
+                body = json.load(response)
+            self._token = body["access_token"]
+            self._token_expires = time.time() + int(body.get("expires_in", 3600))
+        return self._token
+
+    def _request(self, method, url, body=None, headers=None, raw=False):
+        """
+        One Graph call; `url` is relative to the API root or a full @odata link.
+        Returns the decoded JSON body, or the bytes with `raw`.
+        """
+        if not url.startswith("http"):
+            url = self.settings.url + url
+        data = json.dumps(body).encode() if body is not None else None
+        # Graph throttles each request of a $batch on its own
+        count = len(body["requests"]) if url.endswith("/$batch") else 1
+        for attempt in range(GRAPH_RETRIES + 1):
+            self.count_requests(count)
+            request = urllib.request.Request(url, data=data, method=method, headers={
+                "Authorization": f"Bearer {self.token()}",
+                "Content-Type": "application/json",
+                "Prefer": 'outlook.timezone="UTC"',
+                **(headers or {}),
+            })
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    content = response.read()
+                if raw:
+                    return content
+                return json.loads(content) if content else {}
+            except urllib.error.HTTPError as e:
+                if e.code in (429, 503) and attempt < GRAPH_RETRIES:
+                    time.sleep(float(e.headers.get("Retry-After") or 2 ** attempt))
+                    continue
+                raise GraphError(e.code, e.read().decode(errors="replace")[:500])
+
+    def _pages(self, url):
+        """Follow @odata.nextLink; returns (values, final response)."""
+        values = []
+        while True:
+            page = self._request("GET", url)
+            values.extend(page.get("value", []))
+            url = page.get("@odata.nextLink")
+            if not url:
+                return values, page
+
+    def _batch(self, requests):
+        """
+        Run [(method, url, body)] as JSON $batch calls of GRAPH_BATCH_SIZE.
+        Returns the response body or a GraphError per request, in order.
+        Throttled requests inside a batch are retried in the next round.
+        """
+        results = [None] * len(requests)
+        pending = list(range(len(requests)))
+        for attempt in range(GRAPH_RETRIES + 1):
+            throttled = []
+            wait = 0
+            for start in range(0, len(pending), GRAPH_BATCH_SIZE):
+                chunk = pending[start:start + GRAPH_BATCH_SIZE]
+                payload = {"requests": []}
+                for index in chunk:
+                    method, url, body = requests[index]
+                    entry = {"id": str(index), "method": method, "url": url}
+                    if body is not None:
+                        entry["body"] = body
+                        entry["headers"] = {"Content-Type": "application/json"}
+                    payload["requests"].append(entry)
+                answer = self._request("POST", "/$batch", payload)
+                for response in answer.get("responses", []):
+                    index = int(response["id"])
+                    status = int(response.get("status", 500))
+                    if status in (429, 503) and attempt < GRAPH_RETRIES:
+                        throttled.append(index)
+                        wait = max(wait, float((response.get("headers") or {}).get("Retry-After") or 2 ** attempt))
+                    elif status >= 400:
+                        error = (response.get("body") or {}).get("error") or {}
+                        results[index] = GraphError(status, error.get("message", "request failed"))
+                    else:
+                        results[index] = response.get("body") or {}
+            if not throttled:
+                break
+            time.sleep(wait)
+            pending = sorted(throttled)
+        return results
+
+    def close(self):
+        pass
+
+    # ================================================
+    # 📖 Reads
+    # ================================================
+    def _folder_id(self, folder_name):
+        if folder_name not in self._folder_ids:
+            found, _ = self._pages(
+                f"{self.user}/mailFolders/inbox/childFolders?$filter={_filter('displayName eq ' + _quoted(folder_name))}&$select=id"
+            )
+            if not found:
+                raise KeyError(f"Folder not found: {folder_name}")
+            self._folder_ids[folder_name] = found[0]["id"]
+            print(f"📁 Using folder: {folder_name}")
+        return self._folder_ids[folder_name]
+
+    def _messages_url(self, folder_name):
+        if folder_name == SEARCH_SOURCE:
+            # Flag status is indexed: one query over the whole mailbox
+            return f"{self.user}/messages?$filter={_filter(FLAGGED_FILTER)}&"
+        return f"{self.user}/mailFolders/{self._folder_id(folder_name)}/messages?"
+
+    def scan_flagged(self, folder_name, offset=0, limit=None, below_stage=None):
+        if below_stage is not None:
+            # Graph cannot filter on a missing extended property, so reminded
+            # items could not be kept out of the paged order
+            raise ValueError("The graph backend does not support --reminder-state filtering.")
+        url = f"{self._messages_url(folder_name)}$select={SCAN_SELECT}&$orderby=receivedDateTime"
+        items = []
+        while limit is None or len(items) < limit:
+            top = GRAPH_PAGE_SIZE if limit is None else min(GRAPH_PAGE_SIZE, limit - len(items))
+            page = self._request("GET", f"{url}&$top={top}&$skip={offset + len(items)}").get("value", [])
+            items.extend(to_mail_item(msg) for msg in page)
+            if len(page) < top:
+                break
+        return items
+
+    def count_items(self, folder_name, below_stage=None):
+        if folder_name == SEARCH_SOURCE:
+            answer = self._request("GET", f"{self._messages_url(folder_name)}$count=true&$top=1&$select=id",
+                                   headers={"ConsistencyLevel": "eventual"})
+            return int(answer.get("@odata.count", 0))
+        return int(self._request("GET", f"{self.user}/mailFolders/{self._folder_id(folder_name)}")["totalItemCount"])
+
+    def fetch_details(self, items):
+        answers = self._batch([("GET", f"{self.user}/messages/{item.id}?$select={DETAIL_SELECT}", None) for item in items])
+        details = {
+            item.id: answer if isinstance(answer, Exception) else to_mail_item({"id": item.id, **answer})
+            for item, answer in zip(items, answers)
+        }
+        found = [d for d in details.values() if not isinstance(d, Exception)]
+
+        addresses = {a for d in found for a in (*d.to, *d.cc, *d.bcc)}
+        unknown = sorted(addresses - set(self._is_group))
+        lookups = self._batch([("GET", f"/groups?$filter={_filter('mail eq ' + _quoted(a))}&$select=id", None) for a in unknown])
+        for address, answer in zip(unknown, lookups):
+            self._is_group[address] = not isinstance(answer, Exception) and bool(answer.get("value"))
+        for d in found:
+            d.groups |= {a for a in (*d.to, *d.cc, *d.bcc) if self._is_group.get(a)}
+        return details
+
+    def _inbox_filter(self, since=None, until=None, *clauses):
+        clauses = list(clauses)
+        if since is not None:
+            clauses.append(f"receivedDateTime ge {_graph_time(since)}")
+        if until is not None:
+            clauses.append(f"receivedDateTime le {_graph_time(until)}")
+        return " and ".join(clauses)
+
+    def conversation_senders(self, conversation_ids, since=None, until=None):
+        conversation_ids = list(conversation_ids)
+        requests = []
+        for conversation_id in conversation_ids:
+            query = _filter(self._inbox_filter(since, until, "conversationId eq " + _quoted(conversation_id)))
+            requests.append(("GET", f"{self.user}/mailFolders/inbox/messages?$filter={query}&$select=id,sender&$top=999", None))
+        senders = {}
+        for conversation_id, answer in zip(conversation_ids, self._batch(requests)):
+            if isinstance(answer, Exception):
+                print(f"  ⚠️ Could not search conversation: {answer}")
+                continue
+            for msg in answer.get("value", []):
+                sender = _address(msg.get("sender"))
+                if sender:
+                    senders.setdefault(conversation_id, {})[msg["id"]] = sender
+        return senders
+
+    def subject_senders(self, subject, since=None, until=None):
+        # $search can't be combined with $filter on messages; the window is applied here
+        search = urllib.parse.quote(f'"subject:{subject.replace(chr(34), "")}"')
+        found, _ = self._pages(f"{self.user}/mailFolders/inbox/messages?$search={search}&$select=id,subject,sender,receivedDateTime")
+        senders = {}
+        for msg in found:
+            sender = _address(msg.get("sender"))
+            if sender and subject in (msg.get("subject") or "") and in_window(_to_datetime(msg.get("receivedDateTime")), since, until):
+                senders[msg["id"]] = sender
+        return senders
+
+    def mail_tips(self, addresses):
+        tips = {address: None for address in addresses}
+        addresses = sorted(tips)
+        for start in range(0, len(addresses), MAILTIPS_BATCH_SIZE):
+            answer = self._request("POST", f"{self.user}/getMailTips", {
+                "EmailAddresses": addresses[start:start + MAILTIPS_BATCH_SIZE],
+                "MailTipsOptions": "automaticReplies, maxMessageSize",
+            })
+            for tip in answer.get("value", []):
+                address = (tip.get("emailAddress") or {}).get("address", "").lower()
+                error = tip.get("error") or {}
+                reply = (tip.get("automaticReplies") or {}).get("message")
+                tips[address] = {
+                    "oof": bool(reply and reply.strip()),
+                    "invalid": error.get("code") in ("UnknownRecipient", "InvalidRecipient"),
+                    "max_size": tip.get("maxMessageSize"),
+                }
+        return tips
+
+    def inbox_headers(self, since=None, until=None):
+        query = self._inbox_filter(since, until)
+        url = f"{self.user}/mailFolders/inbox/messages?$select={HEADER_SELECT}&$top={GRAPH_PAGE_SIZE}"
+        if query:
+            url += f"&$filter={_filter(query)}"
+        while url:
+            page = self._request("GET", url)
+            for msg in page.get("value", []):
+                yield to_mail_item(msg)
+            url = page.get("@odata.nextLink")
+
+    def delivery_reports(self, since=None):
+        query = _filter(self._inbox_filter(since, None, NDR_FILTER))
+        found, _ = self._pages(f"{self.user}/mailFolders/inbox/messages?$filter={query}&$select=id,receivedDateTime")
+        # $batch can't return MIME; the reports since the last run are few
+        reports = []
+        for msg in found:
+            try:
+                mime = self._request("GET", f"{self.user}/messages/{msg['id']}/$value", raw=True)
+            except GraphError as e:
+                print(f"  ⚠️ Could not read delivery report {msg['id']}: {e}")
+                continue
+            reports.append((msg["id"], _to_datetime(msg.get("receivedDateTime")), mime))
+        return reports
+
+    def sync_inbox(self, sync_state=None):
+        # The sync state is the @odata.deltaLink of the previous round
+        url = sync_state or f"{self.user}/mailFolders/inbox/messages/delta?$select={HEADER_SELECT}"
+        found, last = self._pages(url)
+        changes = []
+        for msg in found:
+            if "@removed" in msg:
+                changes.append(("delete", msg["id"]))
+            else:
+                changes.append(("update" if sync_state else "create", to_mail_item(msg)))
+        return changes, last.get("@odata.deltaLink", sync_state)
+
+    def expand_groups(self, addresses):
+        addresses = list(addresses)
+        lookups = self._batch([
+            ("GET", f"/groups?$filter={_filter('mail eq ' + _quoted(a))}&$select=id", None) for a in addresses
+        ])
+        group_ids = {}
+        for address, answer in zip(addresses, lookups):
+            found = [] if isinstance(answer, Exception) else answer.get("value", [])
+            if found:
+                group_ids[address] = found[0]["id"]
+        members = self._batch([
+            ("GET", f"/groups/{group_id}/members?$select=mail&$top=999", None) for group_id in group_ids.values()
+        ])
+        expanded = {address: None for address in addresses}
+        for address, answer in zip(group_ids, members):
+            if isinstance(answer, Exception):
+                print(f"  ⚠️ Could not expand '{address}': {answer}")
+                continue
+            expanded[address] = [
+                (m["mail"].lower(), m.get("@odata.type") == "#microsoft.graph.group")
+                for m in answer.get("value", []) if m.get("mail")
+            ]
+        return expanded
+
+    def resolve_addresses(self, addresses):
+        addresses = list(addresses)
+        # Graph knows SMTP proxies but not legacyExchangeDN; X500 names stay unresolved
+        smtp = [a for a in addresses if "@" in a and not a.startswith("/o=")]
+        answers = self._batch([
+            ("GET", f"/users?$filter={_filter('proxyAddresses/any(p:p eq ' + _quoted('smtp:' + a) + ')')}"
+                    f"&$select=mail,proxyAddresses", None)
+            for a in smtp
+        ])
+        resolved = {address: None for address in addresses}
+        for address, answer in zip(smtp, answers):
+            found = [] if isinstance(answer, Exception) else answer.get("value", [])
+            if len(found) == 1 and found[0].get("mail"):
+                aliases = [p.split(":", 1)[1] for p in found[0].get("proxyAddresses", []) if ":" in p]
+                resolved[address] = (found[0]["mail"].lower(), aliases)
+        return resolved
+
+    # ================================================
+    # 📤 Writes
+    # ================================================
+    def send_replies(self, reminders, reply_all=True):
+        action = "replyAll" if reply_all else "reply"
+        return self._results(self._batch([
+            ("POST", f"{self.user}/messages/{reminder['id']}/{action}", {
+                "message": {
+                    "subject": reminder["template"]["subject"],
+                    "toRecipients": _recipients(reminder["remind"]),
+                    "ccRecipients": [],
+                },
+                "comment": reminder["template"]["body"],
+            })
+            for reminder in reminders
+        ]))
+
+    def send_new_messages(self, reminders):
+        return self._results(self._batch([
+            ("POST", f"{self.user}/sendMail", {
+                "message": {
+                    "subject": reminder["template"]["subject"],
+                    "body": {"contentType": "Text", "content": reminder["template"]["body"]},
+                    "toRecipients": _recipients(reminder["remind"]),
+                },
+                "saveToSentItems": True,
+            })
+            for reminder in reminders
+        ]))
+
+    def schedule_reminders(self, reminders):
+        # createReplyAll keeps the thread; the draft gets the deferred send
+        # time and the item tag, then is sent and held by the server
+        drafts = self._batch([
+            ("POST", f"{self.user}/messages/{reminder['id']}/createReplyAll", {
+                "message": {
+                    "subject": reminder["template"]["subject"],
+                    "toRecipients": _recipients(reminder["remind"]),
+                    "ccRecipients": [],
+                },
+                "comment": reminder["template"]["body"],
+            })
+            for reminder in reminders
+        ])
+        created = [(i, draft["id"]) for i, draft in enumerate(drafts) if not isinstance(draft, Exception)]
+        tagged = self._batch([
+            ("PATCH", f"{self.user}/messages/{draft_id}", {
+                "singleValueExtendedProperties": [
+                    {"id": DEFERRED_SEND_PROPERTY, "value": _graph_time(parse_datetime(reminders[i]["send_at"]))},
+                    {"id": REMINDER_FOR_PROPERTY, "value": reminders[i]["id"]},
+                ],
+            })
+            for i, draft_id in created
+        ])
+        results = list(drafts)
+        for (i, _), answer in zip(created, tagged):
+            results[i] = answer
+        ready = [(i, draft_id) for i, draft_id in created if not isinstance(results[i], Exception)]
+        sent = self._batch([("POST", f"{self.user}/messages/{draft_id}/send", {}) for _, draft_id in ready])
+        for (i, _), answer in zip(ready, sent):
+            results[i] = answer
+        return self._results(results)
+
+    def cancel_scheduled(self, item_ids):
+        item_ids = list(item_ids)
+        lookups = [
+            (item_id, f"{self.user}/mailFolders/{folder}/messages?$select=id&$filter=" + _filter(
+                f"singleValueExtendedProperties/any(ep: ep/id eq {_quoted(REMINDER_FOR_PROPERTY)}"
+                f" and ep/value eq {_quoted(item_id)})"
+            ))
+            for item_id in item_ids for folder in SCHEDULED_FOLDERS
+        ]
+        found = self._batch([("GET", url, None) for _, url in lookups])
+        pending = []
+        for (item_id, _), answer in zip(lookups, found):
+            if isinstance(answer, Exception):
+                raise answer
+            pending.extend((item_id, msg["id"]) for msg in answer.get("value", []))
+        deleted = self._batch([("DELETE", f"{self.user}/messages/{msg_id}", None) for _, msg_id in pending])
+        cancelled = {item_id for (item_id, _), answer in zip(pending, deleted) if not isinstance(answer, Exception)}
+        return {item_id: item_id in cancelled for item_id in item_ids}
+
+    def add_category(self, item_ids, category, states=None):
+        # `states` only comes with --reminder-state, which scan_flagged refuses
+        item_ids = list(item_ids)
+        # Read the current categories first: PATCH replaces the whole list
+        current = self._batch([("GET", f"{self.user}/messages/{item_id}?$select=categories", None) for item_id in item_ids])
+        updates = []
+        for item_id, answer in zip(item_ids, current):
+            if isinstance(answer, Exception):
+                continue
+            updates.append((item_id, {"categories": add_sent_category(answer.get("categories") or [], category)}))
+        saved = dict(zip(
+            [item_id for item_id, _ in updates],
+            self._batch([("PATCH", f"{self.user}/messages/{item_id}", patch) for item_id, patch in updates]),
+        ))
+        results = []
+        for item_id, answer in zip(item_ids, current):
+            result = answer if isinstance(answer, Exception) else saved[item_id]
+            results.append(result if isinstance(result, Exception) else True)
+        return results
+
+    def _results(self, answers):
+        return [answer if isinstance(answer, Exception) else True for answer in answers]
@@ -0,0 +1,211 @@
+# memory.py
+# In-memory mailbox: a deterministic stand-in for Exchange, used for dry
+# runs against fixtures and for benchmarking the engine's hot path.
+import copy
+import json
+from collections import Counter
+
+from ..dates import parse_datetime
+from ..ledger import recipients_hash
+from ..models import MailItem, add_sent_category
+from .base import SEARCH_SOURCE, MailboxBackend, in_window
+
+
+class MemoryBackend(MailboxBackend):
+    """Mailbox held in Python lists; `calls` counts every backend request."""
+    name = "memory"
+    mailbox = "memory"
+
+    def __init__(self, folders=None, inbox=None, groups=None, aliases=None, mailtips=None, reports=None):
+        self.folders = {name: list(items) for name, items in (folders or {}).items()}
+        self.inbox = list(inbox or [])
+        self.groups = {dl.lower(): [m.lower() for m in members] for dl, members in (groups or {}).items()}
+        self.aliases = {primary.lower(): [a.lower() for a in proxies] for primary, proxies in (aliases or {}).items()}
+        self.mailtips = {address.lower(): tip for address, tip in (mailtips or {}).items()}
+        # Non-delivery reports: [(item id, received datetime, raw MIME)]
+        self.reports = list(reports or [])
+        self.sent = []
+        # Deferred reminders not yet delivered: [{"reminder_for", "send_at", "to", "subject", "body"}]
+        self.scheduled = []
+        # Hidden reminder state: {item id: {"stage", "sent_at", "recipients_hash"}}
+        self.reminder_state = {}
+        self.calls = Counter()
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Load a fixture: {"folders": {"Flag": [item, ...]}, "inbox": [item, ...],
+        "groups": {dl: [member, ...]}, "aliases": {primary: [alias, ...]},
+        "mailtips": {address: {"oof": bool, "invalid": bool, "max_size": int}},
+        "reports": [{"id": ..., "received": ISO string, "mime": raw DSN text}, ...]}
+        where each item holds MailItem keyword arguments (datetimes as ISO strings).
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            folders={name: [_item_from_dict(d) for d in items] for name, items in data.get("folders", {}).items()},
+            inbox=[_item_from_dict(d) for d in data.get("inbox", [])],
+            groups=data.get("groups"),
+            aliases=data.get("aliases"),
+            mailtips=data.get("mailtips"),
+            reports=[(r["id"], parse_datetime(r.get("received")), r["mime"]) for r in data.get("reports", [])],
+        )
+
+    def _find(self, item_id):
+        for items in self.folders.values():
+            for item in items:
+                if item.id == item_id:
+                    return item
+        raise KeyError(f"Item not found: {item_id}")
+
+    def _flagged(self, folder_name):
+        if folder_name == SEARCH_SOURCE:
+            return [item for items in self.folders.values() for item in items if item.reminder_is_set]
+        if folder_name not in self.folders:
+            raise KeyError(f"Folder not found: {folder_name}")
+        return self.folders[folder_name]
+
+    def scan_flagged(self, folder_name, offset=0, limit=None, below_stage=None):
+        self.calls["scan_flagged"] += 1
+        return self._candidates(folder_name, below_stage)[offset:None if limit is None else offset + limit]
+
+    def _candidates(self, folder_name, below_stage=None):
+        items = self._flagged(folder_name)
+        if below_stage is not None:
+            items = [item for item in items if self.reminder_state.get(item.id, {}).get("stage", 0) < below_stage]
+        return items
+
+    def count_items(self, folder_name, below_stage=None):
+        return len(self._candidates(folder_name, below_stage))
+
+    def fetch_details(self, items):
+        # Fixture items already carry every field; only the DL marking is phase-two work
+        self.calls["fetch_details"] += 1
+        self.calls["fetched_items"] += len(items)
+        details = {}
+        for item in items:
+            try:
+                found = copy.copy(self._find(item.id))
+            except KeyError as e:
+                details[item.id] = e
+                continue
+            found.groups |= {a for a in (*found.to, *found.cc, *found.bcc) if a in self.groups}
+            details[item.id] = found
+        return details
+
+    def conversation_senders(self, conversation_ids, since=None, until=None):
+        self.calls["conversation_senders"] += 1
+        wanted = set(conversation_ids)
+        senders = {}
+        for item in self.inbox:
+            if item.conversation_id in wanted and item.sender and in_window(item.datetime_received, since, until):
+                senders.setdefault(item.conversation_id, {})[item.id] = item.sender
+        return senders
+
+    def subject_senders(self, subject, since=None, until=None):
+        self.calls["subject_senders"] += 1
+        return {
+            item.id: item.sender for item in self.inbox
+            if subject in item.subject and item.sender and in_window(item.datetime_received, since, until)
+        }
+
+    def expand_groups(self, addresses):
+        self.calls["expand_groups"] += 1
+        return {
+            address: [(m, m in self.groups) for m in self.groups[address]] if address in self.groups else None
+            for address in addresses
+        }
+
+    def resolve_addresses(self, addresses):
+        self.calls["resolve_addresses"] += 1
+        resolved = {}
+        for address in addresses:
+            resolved[address] = None
+            for primary, proxies in self.aliases.items():
+                if address == primary or address in proxies:
+                    resolved[address] = (primary, proxies)
+        return resolved
+
+    def mail_tips(self, addresses):
+        self.calls["mail_tips"] += 1
+        return {address: self.mailtips.get(address) for address in addresses}
+
+    def inbox_headers(self, since=None, until=None):
+        self.calls["inbox_headers"] += 1
+        for item in self.inbox:
+            if in_window(item.datetime_received, since, until):
+                yield item
+
+    def delivery_reports(self, since=None):
+        self.calls["delivery_reports"] += 1
+        return [report for report in self.reports if in_window(report[1], since)]
+
+    def sync_inbox(self, sync_state=None):
+        # The in-memory Inbox only grows: the sync state is the number of items already seen
+        self.calls["sync_inbox"] += 1
+        seen = int(sync_state or 0)
+        return [("create", item) for item in self.inbox[seen:]], str(len(self.inbox))
+
+    def _send(self, kind, reminders):
+        self.calls[kind] += 1
+        results = []
+        for reminder in reminders:
+            self.sent.append({
+                "kind": kind,
+                "reply_to": reminder["id"] if kind in ("send_replies", "send_reply") else None,
+                "to": list(reminder["remind"]),
+                "subject": reminder["template"]["subject"],
+                "body": reminder["template"]["body"],
+            })
+            results.append(True)
+        return results
+
+    def send_replies(self, reminders, reply_all=True):
+        return self._send("send_replies" if reply_all else "send_reply", reminders)
+
+    def send_new_messages(self, reminders):
+        return self._send("send_new_messages", reminders)
+
+    def schedule_reminders(self, reminders):
+        self.calls["schedule_reminders"] += 1
+        for reminder in reminders:
+            self.scheduled.append({
+                "reminder_for": reminder["id"],
+                "send_at": reminder["send_at"],
+                "to": list(reminder["remind"]),
+                "subject": reminder["template"]["subject"],
+                "body": reminder["template"]["body"],
+            })
+        return [True] * len(reminders)
+
+    def cancel_scheduled(self, item_ids):
+        self.calls["cancel_scheduled"] += 1
+        wanted = set(item_ids)
+        cancelled = {m["reminder_for"] for m in self.scheduled if m["reminder_for"] in wanted}
+        self.scheduled = [m for m in self.scheduled if m["reminder_for"] not in wanted]
+        return {item_id: item_id in cancelled for item_id in item_ids}
+
+    def add_category(self, item_ids, category, states=None):
+        self.calls["add_category"] += 1
+        results = []
+        for item_id in item_ids:
+            try:
+                item = self._find(item_id)
+                item.categories = add_sent_category(item.categories, category)
+                if states and item_id in states:
+                    stage, recipients, sent_at = states[item_id]
+                    self.reminder_state[item_id] = {
+                        "stage": stage, "sent_at": sent_at.timestamp(), "recipients_hash": recipients_hash(recipients),
+                    }
+                results.append(True)
+            except KeyError as e:
+                results.append(e)
+        return results
+
+
+def _item_from_dict(data):
+    data = dict(data)
+    for key in ("due", "datetime_sent", "datetime_received"):
+        if data.get(key):
+            data[key] = parse_datetime(data[key])
+    return MailItem(**data)
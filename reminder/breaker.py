@@ -0,0 +1,107 @@
+# breaker.py
+# Per-run request budget and circuit breaker around every backend call.
+# When Exchange degrades, the run stops after a few failures or slow calls
+# instead of timing out item by item, and the checkpoint tells the next run
+# where to pick up.
+import inspect
+import time
+
+MAX_FAILURES = 5
+SLOW_CALL_SECONDS = 30.0
+MAX_SLOW_CALLS = 3
+
+
+class CircuitOpen(Exception):
+    """The run must stop: Exchange is failing, too slow, or the budget is spent."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `max_failures` consecutive failed calls, `max_slow` consecutive
+    calls whose requests took longer than `slow_seconds` on average, or once
+    `max_requests` requests were made. Once open it stays open for the rest
+    of the run.
+
+    Requests are the server requests the backend counts (SOAP calls for EWS,
+    each request inside a $batch for Graph, retries and hedged twins
+    included); for a backend that counts none, each method call is one. The
+    budget is checked before every call, so the call that spends it still
+    runs to its end.
+    """
+
+    def __init__(self, max_requests=None, max_failures=MAX_FAILURES,
+                 slow_seconds=SLOW_CALL_SECONDS, max_slow=MAX_SLOW_CALLS):
+        self.max_requests = max_requests
+        self.max_failures = max_failures
+        self.slow_seconds = slow_seconds
+        self.max_slow = max_slow
+        self.calls = 0
+        # Set by GuardedBackend: whose requests_made to read
+        self.backend = None
+        self.failures = 0
+        self.slow = 0
+        self.open_reason = None
+
+    @property
+    def requests(self):
+        made = getattr(self.backend, "requests_made", None)
+        return self.calls if made is None else made
+
+    def check(self):
+        """Raise CircuitOpen if no further request may be made."""
+        if self.open_reason is None and self.max_requests is not None and self.requests >= self.max_requests:
+            self.open_reason = f"request budget of {self.max_requests} spent"
+        if self.open_reason is not None:
+            raise CircuitOpen(self.open_reason)
+
+    def call(self, name, fn, *args, **kwargs):
+        """Run one backend request under the breaker."""
+        self.check()
+        self.calls += 1
+        before = self.requests
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+            # Generators (paged reads) are consumed here so their requests count
+            if inspect.isgenerator(result):
+                result = list(result)
+        except Exception as e:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.open_reason = f"{self.failures} consecutive failures (last: {name}: {e})"
+            raise
+        # A paged read or a batched lookup is many requests: judge their average
+        elapsed = (time.monotonic() - started) / max(1, self.requests - before)
+
+        self.failures = 0
+        if self.slow_seconds is not None and elapsed > self.slow_seconds:
+            self.slow += 1
+            if self.slow >= self.max_slow:
+                self.open_reason = f"{self.slow} consecutive calls with requests slower than {self.slow_seconds:.0f}s (last: {name})"
+        else:
+            self.slow = 0
+        return result
+
+
+class GuardedBackend:
+    """Backend proxy that routes every request method through a CircuitBreaker."""
+
+    REQUEST_METHODS = {
+        "scan_flagged", "fetch_details", "count_items", "conversation_senders", "subject_senders", "expand_groups", "mail_tips",
+        "resolve_addresses", "inbox_headers", "delivery_reports", "sync_inbox", "send_replies", "send_new_messages", "add_category",
+        "schedule_reminders", "cancel_scheduled",
+    }
+
+    def __init__(self, backend, breaker):
+        self.backend = backend
+        self.breaker = breaker
+        breaker.backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name not in self.REQUEST_METHODS:
+            return attr
+
+        def guarded(*args, **kwargs):
+            return self.breaker.call(name, attr, *args, **kwargs)
+        return guarded
@@ -0,0 +1,91 @@
+# checkpoint.py
+# Resumable scanning of large follow-up folders. The scan position and the
+# items handled in the current pass are saved after every page, so a run
+# that hits its time budget (or crashes) continues where it stopped. Items
+# skipped for a transient reason (details unavailable, recipients out of
+# office) are not marked handled; the next run re-reads their page.
+import time
+
+# Pages are re-read from a little before the saved position, in case items
+# were removed from the folder in between; processed ids filter the overlap.
+RESUME_OVERLAP = 20
+
+
+class Checkpoint:
+    """Scan position of one (mailbox, folder) pass."""
+
+    def __init__(self, conn, mailbox, folder_name):
+        self.conn = conn
+        self.key = (mailbox, folder_name)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scan_checkpoint ("
+                " mailbox TEXT NOT NULL, folder TEXT NOT NULL, position INTEGER NOT NULL,"
+                " pass_started REAL NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (mailbox, folder))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scan_processed ("
+                " mailbox TEXT NOT NULL, folder TEXT NOT NULL, item_id TEXT NOT NULL,"
+                " PRIMARY KEY (mailbox, folder, item_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scan_retry ("
+                " mailbox TEXT NOT NULL, folder TEXT NOT NULL, item_id TEXT NOT NULL, position INTEGER NOT NULL,"
+                " PRIMARY KEY (mailbox, folder, item_id))"
+            )
+
+    def position(self):
+        """Saved scan position, or 0 when no pass is in progress."""
+        row = self.conn.execute(
+            "SELECT position FROM scan_checkpoint WHERE mailbox = ? AND folder = ?", self.key
+        ).fetchone()
+        return row[0] if row else 0
+
+    def resume_position(self):
+        """Where the next page should start."""
+        return max(0, self.position() - RESUME_OVERLAP)
+
+    def processed(self):
+        """Item ids already handled in the current pass."""
+        rows = self.conn.execute("SELECT item_id FROM scan_processed WHERE mailbox = ? AND folder = ?", self.key)
+        return {item_id for (item_id,) in rows}
+
+    def retry_position(self):
+        """Where to re-read from for items to retry, or None."""
+        row = self.conn.execute(
+            "SELECT MIN(position) FROM scan_retry WHERE mailbox = ? AND folder = ?", self.key
+        ).fetchone()
+        return None if row[0] is None else max(0, row[0] - RESUME_OVERLAP)
+
+    def save(self, position, item_ids, retry_ids=(), page_position=None):
+        """
+        Record a finished page: `item_ids` were handled, `retry_ids` (read at
+        `page_position`) must be looked at again by the next run.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO scan_checkpoint (mailbox, folder, position, pass_started, updated_at)"
+                " VALUES (?, ?, ?, ?, ?) ON CONFLICT (mailbox, folder)"
+                " DO UPDATE SET position = excluded.position, updated_at = excluded.updated_at",
+                (*self.key, position, now, now),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO scan_processed (mailbox, folder, item_id) VALUES (?, ?, ?)",
+                [(*self.key, item_id) for item_id in item_ids],
+            )
+            self.conn.executemany(
+                "DELETE FROM scan_retry WHERE mailbox = ? AND folder = ? AND item_id = ?",
+                [(*self.key, item_id) for item_id in item_ids],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scan_retry (mailbox, folder, item_id, position) VALUES (?, ?, ?, ?)",
+                [(*self.key, item_id, page_position) for item_id in retry_ids],
+            )
+
+    def complete(self):
+        """The pass reached the end of the folder: the next run starts over."""
+        with self.conn:
+            self.conn.execute("DELETE FROM scan_checkpoint WHERE mailbox = ? AND folder = ?", self.key)
+            self.conn.execute("DELETE FROM scan_processed WHERE mailbox = ? AND folder = ?", self.key)
+            self.conn.execute("DELETE FROM scan_retry WHERE mailbox = ? AND folder = ?", self.key)
@@ -0,0 +1,260 @@
+# cli.py
+# Command line entry point shared by every mailbox runner.
+import argparse
+import datetime
+import json
+import time
+
+from .backends import SEARCH_SOURCE, get_backend
+from .breaker import MAX_FAILURES, SLOW_CALL_SECONDS, CircuitBreaker, CircuitOpen, GuardedBackend
+from .checkpoint import Checkpoint
+from .config import FOLDER_NAME, SENT_CATEGORY
+from .dates import DUE_WINDOW
+from .dedup import DEDUP_WINDOW, DedupIndex, default_dedup_path
+from .engine import PAGE_SIZE, ReminderEngine, print_plan
+from .groups import DL_CACHE_TTL, GroupExpander
+from .hedge import HEDGE_DELAY, READ_TIMEOUT, HedgedBackend
+from .identity import IdentityResolver
+from .ledger import REMINDER_STAGE, SentLedger
+from .mailtips import MAILTIPS_TTL, MailTipsFilter
+from .mirror import InboxMirror
+from .ndr import DEAD_ADDRESS_DAYS, Suppressions
+from .outbox import Outbox
+from .recipients import RECIPIENT_POLICIES
+from .schedule import SCHEDULE_HORIZON, ReminderSchedule
+from .store import connect
+from .templates import TEMPLATES
+from .transports import MAX_RECIPIENTS, TRANSPORTS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Send follow-up reminders for flagged emails.")
+    parser.add_argument("--recipients", choices=sorted(RECIPIENT_POLICIES), default="non-responders",
+                        help="who gets the reminder (default: non-responders in To and CC)")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="reply-all",
+                        help="reply-all or reply on the original thread, send a new message, one digest per recipient, "
+                             "or submit over SMTP")
+    parser.add_argument("--template", choices=sorted(TEMPLATES), default="arabic")
+    parser.add_argument("--max-recipients", type=int, default=MAX_RECIPIENTS,
+                        help="recipients per message; longer lists are split and sent concurrently")
+    parser.add_argument("--backend", choices=["ews", "graph", "memory"], default="ews",
+                        help="EWS (exchangelib), Microsoft Graph for Exchange Online, or a JSON fixture")
+    parser.add_argument("--fixture", metavar="FILE", help="mailbox JSON for the memory backend")
+    parser.add_argument("--folder", default=FOLDER_NAME, help=f"follow-up folder under Inbox (default: {FOLDER_NAME})")
+    parser.add_argument("--source", choices=["folder", "search"], default="folder",
+                        help="scan the follow-up folder, or every flagged item in the mailbox via the flag search")
+    parser.add_argument("--sent-category", default=SENT_CATEGORY)
+    parser.add_argument("--state-db", metavar="FILE", help="local state database (default: REMINDER_STATE_DB or .reminder_state.db)")
+    parser.add_argument("--no-expand-dl", action="store_true", help="treat distribution lists as single recipients")
+    parser.add_argument("--dl-ttl-hours", type=float, default=DL_CACHE_TTL / 3600,
+                        help="how long expanded DL membership is cached")
+    parser.add_argument("--no-resolve", action="store_true",
+                        help="compare addresses as-is instead of resolving aliases/X500 to primary SMTP")
+    parser.add_argument("--mail-tips", action="store_true",
+                        help="check MailTips before sending: skip invalid recipients, defer out-of-office ones")
+    parser.add_argument("--mail-tips-ttl-minutes", type=float, default=MAILTIPS_TTL / 60,
+                        help="how long MailTips are cached")
+    parser.add_argument("--ndr-suppression", action="store_true",
+                        help="ingest non-delivery reports and stop reminding addresses that bounced")
+    parser.add_argument("--dead-address-days", type=float, default=DEAD_ADDRESS_DAYS,
+                        help="how long a bounced address stays suppressed after its last NDR")
+    parser.add_argument("--dedup-db", metavar="FILE", default=default_dedup_path(),
+                        help="dedup index shared by all mailbox runners (default: REMINDER_DEDUP_DB; off when unset)")
+    parser.add_argument("--dedup-window-days", type=float, default=DEDUP_WINDOW / 86400,
+                        help="a recipient gets one reminder per thread and stage within this window")
+    parser.add_argument("--no-outbox", action="store_true",
+                        help="deliver straight from the plan instead of through the durable outbox")
+    parser.add_argument("--drain", action="store_true",
+                        help="only deliver what is already queued in the outbox (delivery worker)")
+    parser.add_argument("--no-thread-graph", action="store_true",
+                        help="match replies by conversation and subject only, without the In-Reply-To graph")
+    parser.add_argument("--inbox-mirror", action="store_true",
+                        help="answer responder lookups from a local Inbox header mirror synced with SyncFolderItems")
+    parser.add_argument("--reply-grace-days", type=float, metavar="DAYS",
+                        help="only count replies received up to the due date plus DAYS (default: no upper bound)")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="time budget for this run; the next run resumes where it stopped")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="items scanned per checkpointed page")
+    parser.add_argument("--schedule", action="store_true",
+                        help="off-peak mode: hand reminders to Exchange with deferred delivery at their exact reminder "
+                             "time; answered ones are cancelled on later runs")
+    parser.add_argument("--schedule-days", type=float, default=SCHEDULE_HORIZON.days,
+                        help="with --schedule, schedule reminders for items due within this many days")
+    parser.add_argument("--stage", type=int, default=REMINDER_STAGE,
+                        help="reminder stage of this run; items reminded at an earlier stage are reminded again")
+    parser.add_argument("--reminder-state", action="store_true",
+                        help="store the reminder stage on the item (hidden property) and skip reminded items server-side")
+    parser.add_argument("--max-requests", type=int,
+                        help="server request budget for this run: EWS SOAP calls or Graph requests, "
+                             "retries and hedged reads included (default: unlimited)")
+    parser.add_argument("--max-failures", type=int, default=MAX_FAILURES,
+                        help="consecutive failed requests before the run aborts")
+    parser.add_argument("--slow-call-seconds", type=float, default=SLOW_CALL_SECONDS,
+                        help="a request slower than this counts towards aborting the run")
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT, metavar="SECONDS",
+                        help="give up on a single read after SECONDS")
+    parser.add_argument("--hedge", action="store_true",
+                        help="resend slow reads after their p95 latency and take the first answer (reads only)")
+    parser.add_argument("--hedge-delay", type=float, default=HEDGE_DELAY, metavar="SECONDS",
+                        help="hedge delay until enough latencies are known for a p95")
+    parser.add_argument("--plan", metavar="FILE", help="write the reminder plan as JSON and exit (dry run)")
+    parser.add_argument("--execute", metavar="FILE", help="execute a reminder plan written by --plan")
+    return parser
+
+
+def make_backend(args):
+    if args.backend == "ews":
+        from .config import ExchangeSettings, load_encrypted_env
+        load_encrypted_env()
+        # Socket timeout just above the read timeout, so abandoned reads end too
+        return get_backend("ews", settings=ExchangeSettings(), timeout=args.read_timeout + 10)
+    if args.backend == "graph":
+        from .config import GraphSettings, load_encrypted_env
+        load_encrypted_env()
+        return get_backend("graph", settings=GraphSettings(), timeout=args.read_timeout + 10)
+    return get_backend("memory", fixture=args.fixture)
+
+
+def flagged_source(args):
+    return SEARCH_SOURCE if args.source == "search" else args.folder
+
+
+def make_engine(args, backend, conn):
+    groups = None
+    if not args.no_expand_dl:
+        groups = GroupExpander(backend, conn, ttl_seconds=args.dl_ttl_hours * 3600)
+    identities = None if args.no_resolve else IdentityResolver(backend, conn)
+    outbox = None if args.no_outbox else Outbox(conn)
+    ledger = SentLedger(conn, backend.mailbox)
+    suppressions = None
+    if args.ndr_suppression:
+        suppressions = Suppressions(conn, backend.mailbox, args.dead_address_days)
+        try:
+            suppressions.ingest(backend)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            # Addresses learned on earlier runs still apply; the next run retries
+            print(f"⚠️ Error ingesting non-delivery reports: {e}")
+    inbox = None
+    if args.inbox_mirror:
+        inbox = InboxMirror(conn, backend)
+        try:
+            inbox.sync()
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            # A stale mirror would miss the latest replies: read the Inbox live instead
+            print(f"⚠️ Error syncing the Inbox mirror, using live Inbox reads: {e}")
+            inbox = None
+    template = TEMPLATES[args.template]()
+    return ReminderEngine(
+        backend,
+        recipients=RECIPIENT_POLICIES[args.recipients](mailbox=backend.mailbox),
+        transport=TRANSPORTS[args.transport](template, max_recipients=args.max_recipients),
+        template=template,
+        folder_name=flagged_source(args),
+        sent_category=args.sent_category,
+        due_window=datetime.timedelta(days=args.schedule_days) if args.schedule else DUE_WINDOW,
+        groups=groups,
+        identities=identities,
+        outbox=outbox,
+        ledger=ledger,
+        stage=args.stage,
+        use_thread_graph=not args.no_thread_graph,
+        inbox=inbox,
+        reminder_state=args.reminder_state,
+        # Always present: plain runs must skip and settle reminders Exchange is holding
+        schedule=ReminderSchedule(conn, backend.mailbox),
+        suppressions=suppressions,
+        dedup=DedupIndex.open(args.dedup_db, backend.mailbox, args.dedup_window_days * 86400) if args.dedup_db else None,
+        mail_tips=MailTipsFilter(backend, conn, args.mail_tips_ttl_minutes * 60) if args.mail_tips else None,
+        reply_grace=datetime.timedelta(days=args.reply_grace_days) if args.reply_grace_days is not None else None,
+    )
+
+
+def main(argv=None):
+    """Check flagged emails and send reminders."""
+    args = build_parser().parse_args(argv)
+    if args.recipients == "all" and args.transport in ("reply", "reply-all"):
+        # A thread reply would show the original BCC recipients to everyone
+        build_parser().error("--recipients all includes BCC; reply on the thread with --recipients reply-all.")
+    if args.stage < REMINDER_STAGE:
+        build_parser().error(f"--stage starts at {REMINDER_STAGE}.")
+    if args.schedule and args.transport not in ("reply", "reply-all"):
+        build_parser().error("--schedule replies on the original thread; use --transport reply or reply-all.")
+    print("🔄 Starting Exchange reminder process...")
+    started = time.monotonic()
+
+    try:
+        breaker = CircuitBreaker(
+            max_requests=args.max_requests, max_failures=args.max_failures, slow_seconds=args.slow_call_seconds
+        )
+        hedged = HedgedBackend(make_backend(args), timeout=args.read_timeout, hedge=args.hedge,
+                               hedge_delay=args.hedge_delay)
+        backend = GuardedBackend(hedged, breaker)
+        conn = connect(args.state_db)
+        engine = make_engine(args, backend, conn)
+
+        if args.drain:
+            if engine.outbox is None:
+                raise ValueError("--drain needs the outbox (drop --no-outbox).")
+            retired = engine.outbox.drain(engine)
+            print(f"\n📊 Delivered and retired {retired} queued reminders. Outbox: {engine.outbox.stats()}")
+            return
+
+        if args.plan:
+            plan = engine.build_plan()
+            print_plan(plan)
+            with open(args.plan, "w", encoding="utf-8") as f:
+                json.dump(plan, f, ensure_ascii=False, indent=2)
+            print(f"💾 Plan written to {args.plan}. Nothing was sent.")
+            return
+
+        if args.execute:
+            with open(args.execute, encoding="utf-8") as f:
+                plan = json.load(f)
+            print(f"📂 Loaded plan from {args.execute} ({len(plan['items'])} items)")
+            reminder_count = engine.execute_plan(plan)
+            print("\n📊 Summary:")
+            print(f"  - Planned items: {len(plan['items'])}")
+            print(f"  - Reminders sent: {reminder_count}")
+            print(f"  - Run time: {time.monotonic() - started:.2f}s")
+            return
+
+        if args.schedule:
+            stats = engine.run_scheduled()
+            print("\n📊 Summary:")
+            print(f"  - Flagged with due dates: {stats['flagged']}")
+            print(f"  - Due within {args.schedule_days:g} days: {stats['due']}")
+            print(f"  - Reminders scheduled: {stats['scheduled']}")
+            print(f"  - Reminders sent now: {stats['marked']}")
+            print(f"  - Delivered since last run: {stats['settled']}")
+            print(f"  - Cancelled after a reply: {stats['cancelled']}")
+            print(f"  - Run time: {time.monotonic() - started:.2f}s")
+            return
+
+        checkpoint = Checkpoint(conn, backend.mailbox, flagged_source(args))
+        stats = engine.run_resumable(checkpoint, deadline=args.deadline, page_size=args.page_size)
+
+        print("\n📊 Summary:")
+        print(f"  - Messages scanned: {stats['scanned']}")
+        print(f"  - Flagged with due dates: {stats['flagged']}")
+        print(f"  - Due: {stats['due']}")
+        print(f"  - Reminders sent: {stats['marked']}")
+        print(f"  - Run time: {stats['seconds']:.2f}s ({stats['items_per_second']:.1f} items/s)")
+        print(f"  - Backend requests: {breaker.requests} ({hedged.hedged} hedged reads)")
+        if stats["finished"]:
+            print("  - Folder fully processed.")
+        elif stats["aborted"]:
+            print(f"  - Aborted: {stats['aborted']}")
+        elif stats["items_per_second"]:
+            eta = stats["remaining"] / stats["items_per_second"]
+            print(f"  - Remaining: {stats['remaining']} items, about {eta:.0f}s at this rate.")
+
+    except CircuitOpen as e:
+        print(f"🛑 Circuit open: {e}. Aborted; queued work stays in the outbox for the next run.")
+    except Exception as e:
+        print(f"❌ Error in main process: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,92 @@
+# config.py
+# Encrypted .env loading and the settings shared by every mailbox runner.
+import io
+import os
+
+FOLDER_NAME = "Flag"
+SENT_CATEGORY = "AutoReminderSent"
+
+
+# ================================================
+# 🔐 Secure Configuration (Encrypted)
+# ================================================
+def load_encrypted_env():
+    """Load and decrypt the .env file."""
+    from cryptography.fernet import Fernet
+    from dotenv import load_dotenv
+
+    try:
+        encryption_key = os.getenv("ENV_ENCRYPTION_KEY")
+        if not encryption_key:
+            if os.path.exists('.env.key'):
+                with open('.env.key', 'rb') as f:
+                    encryption_key = f.read().decode()
+            else:
+                raise ValueError("Encryption key not found! Set ENV_ENCRYPTION_KEY environment variable.")
+
+        cipher = Fernet(encryption_key.encode())
+        with open('.env.encrypted', 'rb') as f:
+            encrypted_data = f.read()
+        decrypted_data = cipher.decrypt(encrypted_data)
+        load_dotenv(stream=io.StringIO(decrypted_data.decode()))
+        print("✅ Loaded encrypted environment variables")
+    except FileNotFoundError:
+        print("⚠️  .env.encrypted not found, trying regular .env file...")
+        load_dotenv()
+    except Exception as e:
+        print(f"❌ Error loading encrypted environment: {e}")
+        print("Falling back to regular .env file...")
+        load_dotenv()
+
+
+class SmtpSettings:
+    """SMTP relay settings read from the environment (SMTP_*)."""
+
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST")
+        self.port = int(os.getenv("SMTP_PORT") or 25)
+        self.username = os.getenv("SMTP_USERNAME")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.starttls = os.getenv("SMTP_STARTTLS", "1").lower() not in ("0", "false", "no")
+        self.sender = os.getenv("SMTP_FROM") or os.getenv("EXCHANGE_EMAIL")
+
+        if not self.host or not self.sender:
+            raise ValueError("Missing SMTP environment variables. Please set SMTP_HOST and SMTP_FROM (or EXCHANGE_EMAIL).")
+
+
+class GraphSettings:
+    """Microsoft Graph settings read from the environment (GRAPH_*)."""
+
+    def __init__(self):
+        self.tenant_id = os.getenv("GRAPH_TENANT_ID")
+        self.client_id = os.getenv("GRAPH_CLIENT_ID")
+        self.client_secret = os.getenv("GRAPH_CLIENT_SECRET")
+        # A fixed bearer token skips the client-credentials flow (local stand-ins)
+        self.token = os.getenv("GRAPH_TOKEN")
+        self.mailbox = os.getenv("GRAPH_MAILBOX") or os.getenv("EXCHANGE_EMAIL")
+        self.url = (os.getenv("GRAPH_URL") or "https://graph.microsoft.com/v1.0").rstrip("/")
+        self.token_url = os.getenv("GRAPH_TOKEN_URL") or (
+            f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
+        )
+
+        if not self.mailbox or not (self.token or all([self.tenant_id, self.client_id, self.client_secret])):
+            raise ValueError(
+                "Missing Graph environment variables. Please set GRAPH_MAILBOX (or EXCHANGE_EMAIL) and "
+                "GRAPH_TENANT_ID, GRAPH_CLIENT_ID and GRAPH_CLIENT_SECRET (or GRAPH_TOKEN)."
+            )
+
+
+class ExchangeSettings:
+    """Exchange connection settings read from the environment."""
+
+    def __init__(self):
+        self.username = os.getenv("EXCHANGE_USERNAME")
+        self.password = os.getenv("EXCHANGE_PASSWORD")
+        self.email = os.getenv("EXCHANGE_EMAIL")
+        self.url = os.getenv("EXCHANGE_URL")
+
+        if not all([self.username, self.password, self.email, self.url]):
+            raise ValueError(
+                "Missing Exchange environment variables. Please set EXCHANGE_USERNAME, "
+                "EXCHANGE_PASSWORD, EXCHANGE_EMAIL, and EXCHANGE_URL."
+            )
@@ -0,0 +1,50 @@
+# dates.py
+# Riyadh-time helpers. Backends hand the engine plain, timezone-aware
+# datetimes, so nothing here needs to know about EWSDateTime.
+import datetime
+import os
+
+import pytz
+
+RIYADH_TZ = pytz.timezone('Asia/Riyadh')
+DUE_WINDOW = datetime.timedelta(days=2)
+
+
+def get_riyadh_datetime():
+    """
+    Returns the current datetime in Riyadh (UTC+3).
+    REMINDER_NOW (ISO format) pins the clock, e.g. when replaying a recorded run.
+    """
+    pinned = os.getenv("REMINDER_NOW")
+    if pinned:
+        return parse_datetime(pinned).astimezone(RIYADH_TZ)
+    return datetime.datetime.now(RIYADH_TZ)
+
+
+def parse_datetime(value):
+    """Parse an ISO string into an aware datetime (naive values are taken as UTC)."""
+    if value is None or isinstance(value, datetime.datetime):
+        parsed = value
+    else:
+        parsed = datetime.datetime.fromisoformat(str(value))
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def is_due_soon(due_date, now_in_riyadh, window=DUE_WINDOW):
+    """Checks if the due date falls between now and now + window."""
+    if not due_date:
+        return False
+    return now_in_riyadh <= due_date <= now_in_riyadh + window
+
+
+def format_due_date_for_email(due_date):
+    """Formats the due date as 'YYYY-MM-DD HH:MM' Riyadh time."""
+    if not due_date:
+        return None
+    try:
+        return due_date.astimezone(RIYADH_TZ).strftime('%Y-%m-%d %H:%M')
+    except Exception as e:
+        print(f"  ⚠️ Error formatting date: {e}")
+        return str(due_date)
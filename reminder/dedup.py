@@ -0,0 +1,89 @@
+# dedup.py
+# Cross-mailbox reminder deduplication. Every mailbox runner claims
+# (thread, recipient, stage) in one shared SQLite index before sending, so a
+# thread flagged in several shared mailboxes reminds each person once per
+# stage within the window, whichever runner gets there first.
+import os
+import time
+
+from .store import connect
+
+DEDUP_WINDOW = 7 * 24 * 3600
+
+
+def default_dedup_path():
+    """REMINDER_DEDUP_DB: a database file every runner on the host can reach."""
+    return os.getenv("REMINDER_DEDUP_DB")
+
+
+def thread_key(item):
+    """The original's Internet Message-ID, else its conversation; None if neither is known."""
+    if item.get("internet_message_id"):
+        return "msgid:" + item["internet_message_id"].strip().lower()
+    if item.get("conversation_id"):
+        return "conv:" + item["conversation_id"]
+    return None
+
+
+class DedupIndex:
+    """(thread key, recipient, stage) -> which mailbox reminded them, and when."""
+
+    def __init__(self, conn, mailbox, window_seconds=DEDUP_WINDOW):
+        self.conn = conn
+        self.mailbox = mailbox
+        self.window = window_seconds
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reminder_dedup ("
+                " thread_key TEXT NOT NULL, recipient TEXT NOT NULL, stage INTEGER NOT NULL,"
+                " mailbox TEXT NOT NULL, claimed_at REAL NOT NULL,"
+                " PRIMARY KEY (thread_key, recipient, stage))"
+            )
+
+    @classmethod
+    def open(cls, path, mailbox, window_seconds=DEDUP_WINDOW):
+        return cls(connect(path), mailbox, window_seconds)
+
+    def claim(self, key, recipients, stage):
+        """
+        Claim the recipients of one thread for this mailbox. Returns
+        (claimed, {recipient: mailbox that already reminded them}).
+        """
+        now = time.time()
+        claimed, taken = [], {}
+        # IMMEDIATE: concurrent runners serialise on the write lock, so each
+        # recipient is claimed by exactly one of them
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for recipient in recipients:
+                row = self.conn.execute(
+                    "SELECT mailbox, claimed_at FROM reminder_dedup WHERE thread_key = ? AND recipient = ? AND stage = ?",
+                    (key, recipient, stage),
+                ).fetchone()
+                if row and row[0] != self.mailbox and row[1] > now - self.window:
+                    taken[recipient] = row[0]
+                    continue
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO reminder_dedup (thread_key, recipient, stage, mailbox, claimed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, recipient, stage, self.mailbox, now),
+                )
+                claimed.append(recipient)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return claimed, taken
+
+    def release(self, key, recipients, stage):
+        """Give up this mailbox's claims after a failed send."""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM reminder_dedup WHERE thread_key = ? AND recipient = ? AND stage = ? AND mailbox = ?",
+                [(key, recipient, stage, self.mailbox) for recipient in recipients],
+            )
+
+    def purge(self):
+        """Drop claims older than the window."""
+        with self.conn:
+            self.conn.execute("DELETE FROM reminder_dedup WHERE claimed_at <= ?", (time.time() - self.window,))
@@ -0,0 +1,689 @@
+# engine.py
+# The reminder loop shared by every mailbox runner, split into a read-only
+# plan phase and a batched execute phase.
+import time
+
+from .breaker import CircuitOpen
+from .config import FOLDER_NAME, SENT_CATEGORY
+from .dedup import thread_key
+from .dates import DUE_WINDOW, get_riyadh_datetime, is_due_soon, parse_datetime
+from .ledger import REMINDER_STAGE
+from .models import MailItem
+from .recipients import NonResponders
+from .templates import ArabicReminderTemplate
+from .threads import ReplyGraph
+from .transports import ReplyAllTransport
+
+PAGE_SIZE = 200
+# Skips that a later run may get past; a resumable pass does not mark them handled
+RETRY_REASONS = ("details unavailable", "recipients out of office")
+
+
+class ReminderEngine:
+    """
+    Finds flagged items that are due, works out who to remind and sends the
+    reminders through the configured strategies.
+    """
+
+    def __init__(self, backend, recipients=None, transport=None, template=None,
+                 folder_name=FOLDER_NAME, sent_category=SENT_CATEGORY, due_window=DUE_WINDOW,
+                 groups=None, identities=None, outbox=None, ledger=None, stage=REMINDER_STAGE,
+                 use_thread_graph=False, inbox=None, reply_grace=None, reminder_state=False, mail_tips=None,
+                 suppressions=None, dedup=None, schedule=None, remind_before=DUE_WINDOW):
+        self.backend = backend
+        self.recipients = recipients or NonResponders()
+        self.transport = transport or ReplyAllTransport()
+        self.template = template or ArabicReminderTemplate()
+        self.folder_name = folder_name
+        self.sent_category = sent_category
+        self.due_window = due_window
+        # Optional GroupExpander: DLs are replaced by their members
+        self.groups = groups
+        # Optional IdentityResolver: aliases and X500 addresses become primary SMTP
+        self.identities = identities
+        # Optional Outbox: decisions are queued durably before delivery
+        self.outbox = outbox
+        # Optional SentLedger: local idempotency check, categories become a mirror
+        self.ledger = ledger
+        self.stage = stage
+        # Match replies through In-Reply-To/References instead of subject search
+        self.use_thread_graph = use_thread_graph
+        # Where Inbox reads go: the backend itself or a local InboxMirror
+        self.inbox = inbox or backend
+        # Optional timedelta: replies later than due + grace are not searched for
+        self.reply_grace = reply_grace
+        # Write stage/time/recipient hash to hidden item properties and let the
+        # server drop items already reminded at this stage from the scan
+        self.reminder_state = reminder_state
+        # Optional MailTipsFilter: invalid recipients are dropped, OOF ones deferred
+        self.mail_tips = mail_tips
+        # Optional Suppressions: addresses with recent NDRs are never reminded
+        self.suppressions = suppressions
+        # Optional DedupIndex shared by every mailbox runner: one reminder per
+        # thread, recipient and stage across mailboxes
+        self.dedup = dedup
+        # Optional ReminderSchedule: reminders are handed to Exchange with
+        # deferred delivery at due - remind_before instead of sent right away
+        self.schedule = schedule
+        self.remind_before = remind_before
+
+    # ================================================
+    # 👥 Responders
+    # ================================================
+    def reply_window(self, items):
+        """
+        Received-time window that can hold replies to `items`: from the
+        earliest original send time to the latest due date plus the grace
+        period (open-ended without one). Unknown send times leave it unbounded.
+        """
+        if not items:
+            return None, None
+        sent_times = [item.datetime_sent for item in items if item.datetime_sent]
+        since = min(sent_times) if len(sent_times) == len(items) else None
+        until = None
+        if self.reply_grace is not None:
+            until = max(item.due for item in items) + self.reply_grace
+        return since, until
+
+    def find_responders(self, items):
+        """
+        Responders for many items at once: the reply graph (when enabled) plus
+        one batched conversation lookup. The subject search is only the
+        fallback when there is no graph and the conversation found nothing.
+        Returns {item id: set of responder addresses}.
+        """
+        since, until = self.reply_window(items)
+        graph = None
+        if self.use_thread_graph and items:
+            try:
+                graph = ReplyGraph.build(self.inbox, since, until)
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                print(f"  ⚠️ Error building reply graph: {e}")
+
+        conversation_ids = {item.conversation_id for item in items if item.conversation_id}
+        try:
+            senders = self.inbox.conversation_senders(conversation_ids, since, until) if conversation_ids else {}
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            print(f"  ⚠️ Error finding responders by conversation: {e}")
+            senders = {}
+
+        responders = {}
+        for item in items:
+            found = senders.get(item.conversation_id, {})
+            # Skip the original message itself
+            responders[item.id] = {s for item_id, s in found.items() if item_id != item.id}
+            if graph is not None:
+                responders[item.id] |= graph.repliers(item.internet_message_id)
+                continue
+
+            if not responders[item.id] and item.subject:
+                try:
+                    found = self.inbox.subject_senders(item.subject, *self.reply_window([item]))
+                    responders[item.id] = {s for item_id, s in found.items() if item_id != item.id}
+                except CircuitOpen:
+                    raise
+                except Exception as e:
+                    print(f"  ⚠️ Error finding responders by subject: {e}")
+        return responders
+
+    def _with_details(self, items, plan):
+        """
+        Fetch the phase-two fields of `items`. Items whose details could not be
+        read are skipped, so a later run retries them instead of planning
+        them without recipients.
+        """
+        try:
+            details = self.backend.fetch_details(items)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            print(f"  ⚠️ Error fetching item details: {e}")
+            details = {}
+        fetched = []
+        for item in items:
+            found = details.get(item.id)
+            if found is None or isinstance(found, Exception):
+                if found is not None:
+                    print(f"  ⚠️ Could not fetch details of '{item.subject}': {found}")
+                plan["skipped"].append({"id": item.id, "subject": item.subject, "reason": "details unavailable"})
+                continue
+            item.update_details(found)
+            fetched.append(item)
+        return fetched
+
+    # ================================================
+    # 🗺️ Plan Phase (read-only)
+    # ================================================
+    def build_plan(self, now=None, items=None):
+        """
+        Decide everything without side effects and return the reminder plan.
+        `items` plans one page of a resumable scan instead of the whole folder.
+        """
+        now = now or get_riyadh_datetime()
+        if items is None:
+            items = self.backend.scan_flagged(self.folder_name, below_stage=self._below_stage())
+            print(f"📬 Found {len(items)} messages in '{self.folder_name}' folder.")
+
+        plan = {
+            "created_at": now.isoformat(),
+            "backend": self.backend.name,
+            "folder": self.folder_name,
+            "sent_category": self.sent_category,
+            "stage": self.stage,
+            "recipients_policy": self.recipients.name,
+            "delivery": self.transport.name,
+            "total_messages": len(items),
+            "flagged": 0,
+            "items": [],
+            "skipped": [],
+        }
+
+        flagged = [item for item in items if item.reminder_is_set and item.due]
+        plan["flagged"] = len(flagged)
+        # One local lookup replaces the category check for everything already reminded
+        reminded = self.ledger.sent_ids([item.id for item in flagged], self.stage) if self.ledger else set()
+        # Items left open for deferred recipients: only the others are reminded now
+        reminded_before = self.ledger.partial([item.id for item in flagged], self.stage) if self.ledger else {}
+        scheduled = self.schedule.pending_ids([item.id for item in flagged], self.stage) if self.schedule else set()
+
+        due_items = []
+        for item in flagged:
+            if item.id in reminded:
+                plan["skipped"].append({"id": item.id, "subject": item.subject, "reason": "in sent ledger"})
+            elif self.stage == REMINDER_STAGE and item.has_category(self.sent_category):
+                # The category only says "reminded once"; later stages go by the ledger
+                plan["skipped"].append({"id": item.id, "subject": item.subject, "reason": "already processed"})
+            elif item.id in scheduled:
+                plan["skipped"].append({"id": item.id, "subject": item.subject, "reason": "already scheduled"})
+            elif not is_due_soon(item.due, now, self.due_window):
+                plan["skipped"].append({"id": item.id, "subject": item.subject, "reason": "not due"})
+            else:
+                due_items.append(item)
+
+        if due_items:
+            # Phase two: recipients and thread ids only for what will be planned
+            due_items = self._with_details(due_items, plan)
+
+        members = {}
+        if self.groups is not None:
+            all_groups = set().union(*(item.groups for item in due_items))
+            if all_groups:
+                members = self.groups.expand(all_groups)
+                print(f"👪 Expanded {len(members)} of {len(all_groups)} distribution lists.")
+
+        responders = self.find_responders(due_items) if self.recipients.needs_responders else {}
+
+        canonical = {}
+        if self.identities is not None and due_items:
+            seen = set()
+            for item in due_items:
+                seen |= self.recipients.candidates(item, members)
+                seen |= responders.get(item.id, set())
+                if item.sender:
+                    seen.add(item.sender)
+            canonical = self.identities.resolve(seen)
+            responders = {
+                item_id: {canonical.get(a, a) for a in found} for item_id, found in responders.items()
+            }
+
+        remind = {
+            item.id: sorted(self.recipients.select(item, responders.get(item.id, set()), members, canonical))
+            for item in due_items
+        }
+        for item_id, earlier in reminded_before.items():
+            if item_id in remind:
+                remind[item_id] = [address for address in remind[item_id] if address not in earlier]
+        templates = {item.id: self.template.render(item) for item in due_items}
+        everyone = set().union(*remind.values()) if due_items else set()
+        dead = self.suppressions.dead(everyone) if self.suppressions is not None else set()
+        tips = {}
+        if self.mail_tips is not None and everyone - dead:
+            tips = self.mail_tips.tips(everyone - dead)
+
+        for item in due_items:
+            item_responders = responders.get(item.id, set())
+            suppressed = {address: "non-delivery report" for address in remind[item.id] if address in dead}
+            deferred = {}
+            remind[item.id] = [address for address in remind[item.id] if address not in dead]
+            if tips:
+                remind[item.id], tipped, deferred = self.mail_tips.split(remind[item.id], templates[item.id], tips)
+                suppressed.update(tipped)
+                if deferred and not remind[item.id]:
+                    # Nobody reachable yet: leave the item unmarked for a later run
+                    plan["skipped"].append({
+                        "id": item.id, "subject": item.subject, "reason": "recipients out of office",
+                        "suppressed": suppressed, "deferred": deferred,
+                    })
+                    continue
+            plan["items"].append({
+                "id": item.id,
+                "changekey": item.changekey,
+                "subject": item.subject,
+                "internet_message_id": item.internet_message_id,
+                "conversation_id": item.conversation_id,
+                "references": item.references,
+                "datetime_sent": item.datetime_sent.isoformat() if item.datetime_sent else None,
+                "due": item.due.isoformat(),
+                "recipients": sorted(self.recipients.candidates(item, members, canonical)),
+                "expanded_groups": sorted(item.groups & set(members)),
+                "responders": sorted(item_responders),
+                "remind": remind[item.id],
+                "reminded_before": sorted(reminded_before.get(item.id, ())),
+                "suppressed": suppressed,
+                "deferred": deferred,
+                "template": templates[item.id],
+                "stage": self.stage,
+                "category_change": {"add": self.sent_category},
+            })
+
+        return plan
+
+    # ================================================
+    # 📤 Execute Phase (batched writes)
+    # ================================================
+    def send_reminders(self, items):
+        """
+        Send the reminders of many plan items in one transport call.
+        Items with nobody left to remind succeed without sending.
+        Returns True or the exception raised, per item.
+        """
+        already = self._already_sent(items)
+        to_send = [item for item in items if item["remind"] and item["id"] not in already]
+        to_send = self._claim_threads(to_send)
+        try:
+            sent = self.transport.send(self.backend, to_send) if to_send else []
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            sent = [e] * len(to_send)
+        sent_by_id = {item["id"]: result for item, result in zip(to_send, sent)}
+        sent_remind = {item["id"]: item["remind"] for item in to_send}
+
+        results = []
+        for item in items:
+            if item["id"] in already:
+                # e.g. a crash after sending but before the outbox saw it
+                print(f"  ℹ️ '{item['subject']}' is already in the sent ledger. Not sending again.")
+                results.append(True)
+                continue
+            if not item["remind"] and item.get("reminded_before"):
+                print(f"  ℹ️ Everyone left on '{item['subject']}' was reminded on an earlier run.")
+                results.append(True)
+                continue
+            if not item["remind"] and item.get("suppressed"):
+                print(f"  ℹ️ No deliverable recipients left for '{item['subject']}'. No reminder sent.")
+                results.append(True)
+                continue
+            if not item["remind"]:
+                print(f"  ℹ️ All recipients have responded to '{item['subject']}'. No reminder needed.")
+                results.append(True)
+                continue
+            if item["id"] not in sent_by_id:
+                print(f"  ℹ️ Everyone on '{item['subject']}' was already reminded from another mailbox.")
+                results.append(True)
+                continue
+            result = sent_by_id[item["id"]]
+            if isinstance(result, Exception):
+                print(f"  ❌ Error sending reminder for '{item['subject']}': {result}")
+            else:
+                print(f"  ✅ Sent reminder to {len(sent_remind[item['id']])} recipients: {item['subject']}")
+            results.append(result)
+
+        if self.dedup is not None:
+            for sent_item in to_send:
+                if isinstance(sent_by_id[sent_item["id"]], Exception) and thread_key(sent_item):
+                    self.dedup.release(thread_key(sent_item), sent_item["remind"], sent_item.get("stage", self.stage))
+
+        if self.ledger is not None:
+            done = [
+                item for item, result in zip(items, results)
+                if item["id"] not in already and not isinstance(result, Exception)
+            ]
+            # Items with deferred recipients stay open for a later run
+            for partial in (False, True):
+                self.ledger.record([
+                    (item["id"], item.get("stage", self.stage), item["remind"])
+                    for item in done if bool(item.get("deferred")) == partial
+                ], partial=partial)
+        return results
+
+    def _claim_threads(self, items):
+        """
+        Claim each item's recipients in the shared dedup index. Returns the
+        items to send, without the recipients another mailbox already
+        reminded about the same thread.
+        """
+        if self.dedup is None:
+            return items
+        to_send = []
+        for item in items:
+            key = thread_key(item)
+            if key is None:
+                to_send.append(item)
+                continue
+            claimed, taken = self.dedup.claim(key, item["remind"], item.get("stage", self.stage))
+            if taken:
+                print(f"  ℹ️ {len(taken)} recipients of '{item['subject']}' were reminded from "
+                      f"{', '.join(sorted(set(taken.values())))}.")
+            if claimed:
+                to_send.append({**item, "remind": claimed})
+        return to_send
+
+    def _already_sent(self, items):
+        if self.ledger is None:
+            return set()
+        already = set()
+        for stage in {item.get("stage", self.stage) for item in items}:
+            already |= self.ledger.sent_ids([i["id"] for i in items if i.get("stage", self.stage) == stage], stage)
+        return already
+
+    def commit_categories(self, items, category, now=None):
+        """
+        Add the sent category to many items at once. With a ledger this is
+        only a mirror for mailbox users. Returns True or an exception per item.
+        """
+        if not items:
+            return []
+        now = now or get_riyadh_datetime()
+        # Items with deferred recipients are not marked: the next run reminds them
+        to_mark = [item for item in items if not item.get("deferred")]
+        try:
+            states = None
+            if self.reminder_state:
+                # Scheduled reminders went out at their send time, the rest at this run's clock
+                states = {
+                    item["id"]: (item.get("stage", self.stage), item["remind"], item.get("send_at") or now)
+                    for item in to_mark
+                }
+            saved = self.backend.add_category([item["id"] for item in to_mark], category, states=states) if to_mark else []
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            saved = [e] * len(to_mark)
+        saved = dict(zip([item["id"] for item in to_mark], saved))
+        results = []
+        for item in items:
+            if item.get("deferred"):
+                print(f"  ⏸️ '{item['subject']}' stays open for {len(item['deferred'])} deferred recipients.")
+            results.append(saved.get(item["id"], True))
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Could not save category for '{item['subject']}': {result}")
+        return results
+
+    def _below_stage(self):
+        return self.stage if self.reminder_state else None
+
+    def execute_plan(self, plan, now=None):
+        """
+        Carry out a plan: one batched send for all reminders, then one batched
+        category update. With an outbox the plan is queued first and delivered
+        from there. Returns the number of items marked as sent.
+        """
+        now = now or parse_datetime(plan["created_at"])
+        if self.outbox is not None:
+            self.outbox.enqueue(plan)
+            return self.outbox.drain(self, now)
+
+        results = self.send_reminders(plan["items"])
+        sent = [item for item, result in zip(plan["items"], results) if not isinstance(result, Exception)]
+        saved = self.commit_categories(sent, plan["sent_category"], now)
+        return sum(1 for result in saved if not isinstance(result, Exception))
+
+    # ================================================
+    # ⏳ Scheduled Delivery (deferred send)
+    # ================================================
+    def schedule_plan(self, plan, now=None):
+        """
+        Hand the plan's reminders to the backend with deferred delivery at
+        due - remind_before; items already past that moment (or with nobody
+        to remind) are executed right away. Returns (marked, scheduled).
+        """
+        now = now or get_riyadh_datetime()
+        later, immediate = [], []
+        for item in plan["items"]:
+            send_at = parse_datetime(item["due"]) - self.remind_before
+            if item["remind"] and send_at > now:
+                later.append({**item, "send_at": send_at.isoformat()})
+            else:
+                immediate.append(item)
+        marked = self.execute_plan({**plan, "items": immediate}, now) if immediate else 0
+
+        later = self._claim_threads(later)
+        try:
+            results = self.backend.schedule_reminders(later) if later else []
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            results = [e] * len(later)
+        scheduled = []
+        for item, result in zip(later, results):
+            if isinstance(result, Exception):
+                print(f"  ❌ Error scheduling reminder for '{item['subject']}': {result}")
+                if self.dedup is not None and thread_key(item):
+                    self.dedup.release(thread_key(item), item["remind"], item["stage"])
+            else:
+                print(f"  🕒 Scheduled reminder to {len(item['remind'])} recipients for {item['send_at']}: {item['subject']}")
+                scheduled.append(item)
+        self.schedule.record(scheduled)
+        return marked, len(scheduled)
+
+    def settle_schedule(self, now=None):
+        """
+        Scheduled reminders whose send time has passed were delivered by the
+        server: record them in the ledger and mark the items. Returns the count.
+        """
+        now = now or get_riyadh_datetime()
+        delivered = [entry for entry in self.schedule.entries() if entry["send_at"] <= now]
+        return self._settle(delivered)
+
+    def _settle(self, entries):
+        if not entries:
+            return 0
+        if self.ledger is not None:
+            self.ledger.record([(entry["id"], entry["stage"], entry["remind"]) for entry in entries])
+        saved = self.commit_categories(entries, self.sent_category)
+        self.schedule.remove(entries)
+        return sum(1 for result in saved if not isinstance(result, Exception))
+
+    def cancel_answered(self, now=None):
+        """
+        Cancel pending scheduled reminders that someone they would remind has
+        answered in the meantime. The item is planned again on this run,
+        without the new responders. Returns the number cancelled.
+        """
+        now = now or get_riyadh_datetime()
+        waiting = [entry for entry in self.schedule.entries() if entry["send_at"] > now]
+        if not waiting or not self.recipients.needs_responders:
+            return 0
+        items = [
+            MailItem(
+                entry["id"], subject=entry["subject"], due=parse_datetime(entry["due"]),
+                conversation_id=entry["conversation_id"], internet_message_id=entry["internet_message_id"],
+                datetime_sent=parse_datetime(entry["datetime_sent"]),
+            )
+            for entry in waiting
+        ]
+        responders = self.find_responders(items)
+        if self.identities is not None:
+            canonical = self.identities.resolve(set().union(*responders.values()))
+            responders = {
+                item_id: {canonical.get(a, a) for a in found} for item_id, found in responders.items()
+            }
+        answered = [entry for entry in waiting if responders.get(entry["id"], set()) & set(entry["remind"])]
+        if not answered:
+            return 0
+
+        found = self.backend.cancel_scheduled([entry["id"] for entry in answered])
+        cancelled, gone = [], []
+        for entry in answered:
+            if found.get(entry["id"]):
+                print(f"  🗑️ Cancelled scheduled reminder for '{entry['subject']}': answered since scheduling.")
+                cancelled.append(entry)
+            else:
+                # Nothing left to cancel: the server already sent it
+                gone.append(entry)
+        if self.dedup is not None:
+            for entry in cancelled:
+                if thread_key(entry):
+                    self.dedup.release(thread_key(entry), entry["remind"], entry["stage"])
+        self.schedule.remove(cancelled)
+        self._settle(gone)
+        return len(cancelled)
+
+    def reconcile_schedule(self, now=None):
+        """
+        Bring the schedule up to date before planning: every run, scheduled or
+        not, settles delivered reminders and cancels answered ones, so a poll
+        never sends what Exchange is holding. Returns (settled, cancelled).
+        """
+        if self.schedule is None:
+            return 0, 0
+        now = now or get_riyadh_datetime()
+        return self.settle_schedule(now), self.cancel_answered(now)
+
+    def run_scheduled(self, now=None):
+        """
+        Off-peak pre-scheduling run: settle delivered reminders, cancel
+        answered ones, then plan the horizon and schedule it. Returns run statistics.
+        """
+        now = now or get_riyadh_datetime()
+        settled, cancelled = self.reconcile_schedule(now)
+        plan = self.build_plan(now)
+        print_plan(plan)
+        marked, scheduled = self.schedule_plan(plan, now)
+        return {
+            "flagged": plan["flagged"], "due": len(plan["items"]), "marked": marked,
+            "scheduled": scheduled, "cancelled": cancelled, "settled": settled,
+        }
+
+    def run(self, now=None):
+        """Plan and execute in one go. Returns (plan, number marked as sent)."""
+        now = now or get_riyadh_datetime()
+        self.reconcile_schedule(now)
+        plan = self.build_plan(now)
+        print_plan(plan)
+        return plan, self.execute_plan(plan)
+
+    def run_resumable(self, checkpoint, deadline=None, page_size=PAGE_SIZE, now=None):
+        """
+        Plan and execute page by page, saving the scan position after each
+        page. Stops cleanly once `deadline` seconds are used; the next run
+        resumes from the checkpoint. A whole-plan transport (digest) gets
+        the reminders of every page in one delivery at the end. Returns run
+        statistics.
+        """
+        now = now or get_riyadh_datetime()
+        started = time.monotonic()
+        position = checkpoint.resume_position()
+        processed = checkpoint.processed()
+        if processed:
+            print(f"⏯️ Resuming '{self.folder_name}' at item {checkpoint.position()} ({len(processed)} already handled).")
+        # While re-reading pages for retries, the saved position stays at
+        # least where the pass had got to
+        resume_at = position
+        retry_from = checkpoint.retry_position()
+        if retry_from is not None and retry_from < position:
+            print(f"🔁 Re-reading from item {retry_from} for items that could not be handled earlier.")
+            position = retry_from
+
+        stats = {"scanned": 0, "flagged": 0, "due": 0, "marked": 0, "finished": False, "aborted": None}
+        # Pages planned but not delivered yet, for whole-plan transports
+        held = {"sent_category": self.sent_category, "items": []}
+        try:
+            self.reconcile_schedule(now)
+        except CircuitOpen as e:
+            print(f"🛑 Circuit open: {e}. Aborting before the scan.")
+            stats["aborted"] = str(e)
+        while not stats["aborted"]:
+            if deadline is not None and time.monotonic() - started >= deadline:
+                print(f"⏱️ Time budget of {deadline:.0f}s used. Stopping at item {position}.")
+                break
+
+            try:
+                page = self.backend.scan_flagged(
+                    self.folder_name, offset=position, limit=page_size, below_stage=self._below_stage()
+                )
+                fresh = [item for item in page if item.id not in processed]
+                plan = self.build_plan(now, items=fresh)
+                print_plan(plan)
+                if not self.transport.whole_plan:
+                    stats["marked"] += self.execute_plan(plan, now)
+                elif self.outbox is not None:
+                    # Queued now, so an aborted run still delivers them next time
+                    self.outbox.enqueue(plan)
+                else:
+                    held["items"].extend(plan["items"])
+            except CircuitOpen as e:
+                # The page is not checkpointed: the ledger and outbox make redoing it safe
+                print(f"🛑 Circuit open: {e}. Aborting; the next run resumes at item {position}.")
+                stats["aborted"] = str(e)
+                break
+            except Exception as e:
+                # e.g. ReadTimeout or a transport error: same as above, without the breaker
+                print(f"❌ Error on the page at item {position}: {e}. Aborting; the next run resumes there.")
+                stats["aborted"] = str(e)
+                break
+            stats["scanned"] += len(fresh)
+            stats["flagged"] += plan["flagged"]
+            stats["due"] += len(plan["items"])
+
+            page_position = position
+            position += len(page)
+            if self.reminder_state:
+                # Reminded items drop out of the filtered scan and shift later
+                # ones forward; at most the planned ones left, and the overlap
+                # is filtered by the processed ids
+                position -= len(plan["items"])
+                resume_at -= len(plan["items"])
+            # Transient skips and deferred recipients are not handled yet
+            retry = {s["id"] for s in plan["skipped"] if s["reason"] in RETRY_REASONS}
+            retry |= {item["id"] for item in plan["items"] if item.get("deferred")}
+            handled = [item.id for item in fresh if item.id not in retry]
+            processed.update(handled)
+            checkpoint.save(max(position, resume_at), handled, retry, page_position)
+
+            if len(page) < page_size:
+                checkpoint.complete()
+                stats["finished"] = True
+                break
+
+        if self.transport.whole_plan and not stats["aborted"]:
+            try:
+                if self.outbox is not None:
+                    stats["marked"] += self.outbox.drain(self, now)
+                elif held["items"]:
+                    stats["marked"] += self.execute_plan(held, now)
+            except CircuitOpen as e:
+                print(f"🛑 Circuit open: {e}. The planned reminders are delivered by the next run.")
+                stats["aborted"] = str(e)
+
+        elapsed = time.monotonic() - started
+        stats["seconds"] = elapsed
+        stats["items_per_second"] = stats["scanned"] / elapsed if elapsed else 0.0
+        stats["remaining"] = None
+        if stats["finished"]:
+            stats["remaining"] = 0
+        elif not stats["aborted"]:
+            stats["remaining"] = max(
+                0, self.backend.count_items(self.folder_name, self._below_stage()) - max(position, resume_at)
+            )
+        return stats
+
+
+def print_plan(plan):
+    """Console summary of a plan."""
+    for item in plan["items"]:
+        print(f"\n{'='*60}")
+        print(f"Due: {item['subject']} ({item['due']})")
+        print(f"  👥 Recipients: {len(item['recipients'])}")
+        print(f"  ✅ Responders: {len(item['responders'])}")
+        print(f"  ⏰ To remind: {', '.join(item['remind']) or 'none'}")
+        for address, reason in {**item.get("suppressed", {}), **item.get("deferred", {})}.items():
+            print(f"  🚫 Not reminded: {address} ({reason})")
+    print(f"\n🗺️ Plan: {len(plan['items'])} due, {len(plan['skipped'])} skipped, "
+          f"{plan['flagged']} flagged of {plan['total_messages']} messages.")
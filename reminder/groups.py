@@ -0,0 +1,94 @@
+# groups.py
+# Distribution-list expansion. A DL on the original message is replaced by
+# its members, so responders match at member level and only the silent
+# members get reminded.
+from .breaker import CircuitOpen
+from .store import TtlCache
+
+DL_CACHE_TTL = 24 * 3600
+# Groups the server could not expand are retried sooner than known membership
+DL_NEGATIVE_TTL = 3600
+MAX_DEPTH = 3
+
+
+class GroupExpander:
+    """
+    Expands every DL seen in a run with one batched backend call per nesting
+    level, backed by a persistent TTL cache of flattened membership.
+    """
+
+    def __init__(self, backend, conn=None, ttl_seconds=DL_CACHE_TTL, max_depth=MAX_DEPTH,
+                 negative_ttl_seconds=DL_NEGATIVE_TTL):
+        self.backend = backend
+        self.cache = TtlCache(conn, "dl", ttl_seconds) if conn is not None else None
+        self.max_depth = max_depth
+        self.negative_ttl_seconds = min(negative_ttl_seconds, ttl_seconds)
+
+    def expand(self, groups):
+        """Return {group address: set of member addresses} for every expandable group."""
+        groups = set(groups)
+        # Cached None: the server could not expand the group last time
+        cached = self.cache.get_many(groups) if self.cache else {}
+        members = {group: set(found) for group, found in cached.items() if found is not None}
+
+        missing = groups - set(cached)
+        if missing:
+            fetched = self._expand_nested(missing)
+            members.update((group, found) for group, found in fetched.items() if found is not None)
+            if self.cache:
+                self.cache.set_many({group: sorted(found) for group, found in fetched.items() if found is not None})
+                self.cache.set_many(
+                    {group: None for group, found in fetched.items() if found is None}, self.negative_ttl_seconds
+                )
+        return members
+
+    def _expand_nested(self, groups):
+        """
+        Flatten nested DLs level by level, at most `max_depth` levels deep.
+        Groups the server answered for but could not expand map to None; a
+        failed call returns {} so nothing is cached.
+        """
+        try:
+            raw = self.backend.expand_groups(groups)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            print(f"  ⚠️ Error expanding distribution lists: {e}")
+            return {}
+
+        direct = {}
+        for group in groups:
+            if raw.get(group) is not None:
+                direct[group] = raw[group]
+
+        # Resolve nested DLs with one more batched call per level
+        known = dict(raw)
+        pending = {m for entries in direct.values() for m, is_group in entries if is_group} - set(known)
+        depth = 1
+        while pending and depth < self.max_depth:
+            try:
+                known.update(self.backend.expand_groups(pending))
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                print(f"  ⚠️ Error expanding nested distribution lists: {e}")
+                break
+            pending = {
+                m for entries in known.values() if entries for m, is_group in entries if is_group
+            } - set(known)
+            depth += 1
+
+        flat = {group: self._flatten(group, known, set()) for group in direct}
+        flat.update((group, None) for group in groups if group not in direct)
+        return flat
+
+    def _flatten(self, group, known, seen):
+        seen.add(group)
+        flat = set()
+        for member, is_group in known.get(group) or []:
+            if is_group and known.get(member) is not None:
+                if member not in seen:
+                    flat |= self._flatten(member, known, seen)
+            else:
+                flat.add(member)
+        return flat
@@ -0,0 +1,143 @@
+# hedge.py
+# Per-call timeouts and hedged requests for idempotent backend reads. A read
+# that has not answered after the method's recent p95 latency gets a twin
+# request; whichever finishes first wins. Writes (send, category update) are
+# never duplicated and only pass through.
+import itertools
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+READ_TIMEOUT = 60.0
+HEDGE_DELAY = 2.0
+HEDGE_WORKERS = 8
+# Items pulled from a paged read per timed step (one EWS Inbox page)
+PAGE_ITEMS = 1000
+LATENCY_SAMPLES = 50
+MIN_SAMPLES = 5
+
+
+class ReadTimeout(Exception):
+    """A backend read did not answer within the per-call timeout."""
+
+
+class LatencyTracker:
+    """Recent latencies per method, used to pick the hedge delay."""
+
+    def __init__(self, initial_delay=HEDGE_DELAY, samples=LATENCY_SAMPLES):
+        self.initial_delay = initial_delay
+        self.latencies = defaultdict(lambda: deque(maxlen=samples))
+
+    def record(self, name, seconds):
+        self.latencies[name].append(seconds)
+
+    def p95(self, name):
+        """p95 of the recent calls, or the initial delay until there are enough samples."""
+        recent = sorted(self.latencies[name])
+        if len(recent) < MIN_SAMPLES:
+            return self.initial_delay
+        return recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+
+
+class HedgedBackend:
+    """
+    Backend proxy adding a timeout to every read and, with `hedge` on, a
+    duplicate request once a read is slower than its p95. Reads are run on
+    worker threads; a read that times out is abandoned, not cancelled, so the
+    backend's own socket timeout still bounds how long its thread lives.
+    """
+
+    # fetch_details returns the details instead of filling in the caller's
+    # items, so an abandoned or twin attempt never writes into a plan
+    READ_METHODS = {
+        "scan_flagged", "fetch_details", "count_items", "conversation_senders", "subject_senders",
+        "delivery_reports", "expand_groups", "mail_tips", "resolve_addresses",
+    }
+    # Whole-Inbox passes: the timeout applies to each page, and a half-read
+    # pass can't be hedged
+    PAGED_METHODS = {"inbox_headers"}
+
+    def __init__(self, backend, timeout=READ_TIMEOUT, hedge=False, hedge_delay=HEDGE_DELAY):
+        self.backend = backend
+        self.timeout = timeout
+        self.hedge = hedge
+        self.tracker = LatencyTracker(hedge_delay)
+        self.hedged = 0
+        self.pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="read")
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name in self.PAGED_METHODS:
+            def paged(*args, **kwargs):
+                return self._paged(name, attr, *args, **kwargs)
+            return paged
+        if name not in self.READ_METHODS:
+            return attr
+
+        def read(*args, **kwargs):
+            return self._read(name, attr, *args, **kwargs)
+        return read
+
+    def _attempt(self, fn, args, kwargs):
+        started = time.monotonic()
+        # Paged reads are generators; drain them on the worker thread
+        result = fn(*args, **kwargs)
+        if hasattr(result, "__next__"):
+            result = list(result)
+        return result, time.monotonic() - started
+
+    def _read(self, name, fn, *args, **kwargs):
+        started = time.monotonic()
+        deadline = None if self.timeout is None else started + self.timeout
+        pending = {self.pool.submit(self._attempt, fn, args, kwargs)}
+        hedge_at = started + self.tracker.p95(name) if self.hedge else None
+        first_error = None
+
+        while pending:
+            wake_at = [t for t in (deadline, hedge_at) if t is not None]
+            timeout = max(0.0, min(wake_at) - time.monotonic()) if wake_at else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                self.tracker.record(name, seconds)
+                return result
+
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                # One twin per read; both stay in flight and the first answer wins
+                hedge_at = None
+                self.hedged += 1
+                pending.add(self.pool.submit(self._attempt, fn, args, kwargs))
+            elif deadline is not None and now >= deadline:
+                raise ReadTimeout(f"{name} did not answer within {self.timeout:.0f}s")
+            elif not pending and hedge_at is not None:
+                # The only attempt failed before the hedge delay; do not hedge a failure
+                break
+        raise first_error
+
+    def _paged(self, name, fn, *args, **kwargs):
+        """Yield a paged read's items, each page pulled on a worker under the timeout."""
+        pages = []
+
+        def next_page():
+            if not pages:
+                pages.append(iter(fn(*args, **kwargs)))
+            return list(itertools.islice(pages[0], PAGE_ITEMS))
+
+        while True:
+            try:
+                page = self.pool.submit(next_page).result(timeout=self.timeout)
+            except FutureTimeout:
+                raise ReadTimeout(f"{name} page did not answer within {self.timeout:.0f}s") from None
+            yield from page
+            if len(page) < PAGE_ITEMS:
+                return
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        self.backend.close()
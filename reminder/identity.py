@@ -0,0 +1,57 @@
+# identity.py
+# Address canonicalisation. Senders often come back as X500/legacyExchangeDN
+# or as one of their proxy aliases; mapping every address to the primary SMTP
+# address keeps responder matching a plain set lookup.
+from .breaker import CircuitOpen
+from .store import TtlCache
+
+IDENTITY_CACHE_TTL = 7 * 24 * 3600
+
+
+class IdentityResolver:
+    """
+    Resolves every address not seen before with one batched backend lookup
+    per run and remembers alias -> primary SMTP in a persistent TTL cache.
+    """
+
+    def __init__(self, backend, conn=None, ttl_seconds=IDENTITY_CACHE_TTL):
+        self.backend = backend
+        self.cache = TtlCache(conn, "identity", ttl_seconds) if conn is not None else None
+        self.memory = {}
+
+    def resolve(self, addresses):
+        """Return {address: canonical address} for every address given."""
+        addresses = {a for a in addresses if a}
+        canonical = {a: self.memory[a] for a in addresses if a in self.memory}
+
+        unseen = addresses - set(canonical)
+        if unseen and self.cache:
+            canonical.update(self.cache.get_many(unseen))
+            unseen -= set(canonical)
+
+        if unseen:
+            learned = {}
+            try:
+                resolved = self.backend.resolve_addresses(unseen)
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                print(f"  ⚠️ Error resolving addresses: {e}")
+                resolved = {}
+            for address in unseen:
+                entry = resolved.get(address)
+                if entry:
+                    primary, aliases = entry
+                    # Every proxy address of the same mailbox is learned at once
+                    for alias in {address, primary, *aliases}:
+                        learned[alias.lower()] = primary.lower()
+                else:
+                    # Unresolvable addresses (external, one-off) map to themselves
+                    learned[address] = address
+            if self.cache:
+                self.cache.set_many(learned)
+            canonical.update((a, learned[a]) for a in unseen)
+            self.memory.update(learned)
+
+        self.memory.update(canonical)
+        return canonical
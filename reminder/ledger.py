@@ -0,0 +1,85 @@
+# ledger.py
+# Local record of every reminder sent. It is the engine's primary
+# idempotency check: an item already in the ledger is skipped with one
+# indexed lookup, before any Exchange call. The AutoReminderSent category
+# is only a mirror of this ledger for people reading the mailbox.
+import hashlib
+import json
+import time
+
+REMINDER_STAGE = 1
+
+
+def recipients_hash(recipients):
+    """Short stable hash of a recipient set, stored with the item's reminder state."""
+    return hashlib.sha256("\n".join(sorted(recipients)).encode("utf-8")).hexdigest()[:16]
+
+
+class SentLedger:
+    """
+    (mailbox, item id, stage) -> recipients and time of the reminder.
+    A partial entry (some recipients deferred) keeps the item open: later
+    runs remind only the recipients not listed yet.
+    """
+
+    def __init__(self, conn, mailbox):
+        self.conn = conn
+        self.mailbox = mailbox
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sent_ledger ("
+                " mailbox TEXT NOT NULL, item_id TEXT NOT NULL, stage INTEGER NOT NULL,"
+                " recipients TEXT NOT NULL, sent_at REAL NOT NULL,"
+                " partial INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (mailbox, item_id, stage))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sent_ledger)")}
+            if "partial" not in columns:
+                conn.execute("ALTER TABLE sent_ledger ADD COLUMN partial INTEGER NOT NULL DEFAULT 0")
+
+    def _rows(self, item_ids, stage, partial):
+        item_ids = list(item_ids)
+        for i in range(0, len(item_ids), 500):
+            batch = item_ids[i:i + 500]
+            yield from self.conn.execute(
+                f"SELECT item_id, recipients FROM sent_ledger WHERE mailbox = ? AND stage = ? AND partial = ?"
+                f" AND item_id IN ({','.join('?' * len(batch))})",
+                [self.mailbox, stage, int(partial), *batch],
+            )
+
+    def sent_ids(self, item_ids, stage=REMINDER_STAGE):
+        """Return the subset of `item_ids` fully reminded at `stage`."""
+        return {item_id for item_id, _ in self._rows(item_ids, stage, False)}
+
+    def partial(self, item_ids, stage=REMINDER_STAGE):
+        """Return {item id: recipients already reminded} for items left open at `stage`."""
+        return {item_id: set(json.loads(r)) for item_id, r in self._rows(item_ids, stage, True)}
+
+    def record(self, entries, partial=False):
+        """
+        entries: [(item id, stage, recipients)] that were just reminded.
+        Recipients of an open entry are kept; `partial` leaves the items open.
+        """
+        entries = list(entries)
+        earlier = {}
+        for stage in {stage for _, stage, _ in entries}:
+            for item_id, recipients in self.partial([e[0] for e in entries if e[1] == stage], stage).items():
+                earlier[item_id, stage] = recipients
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sent_ledger (mailbox, item_id, stage, recipients, sent_at, partial)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (self.mailbox, item_id, stage,
+                     json.dumps(sorted(set(recipients) | earlier.get((item_id, stage), set()))), now, int(partial))
+                    for item_id, stage, recipients in entries
+                ],
+            )
+
+    def history(self, item_id):
+        """All reminders recorded for one item, oldest stage first."""
+        rows = self.conn.execute(
+            "SELECT stage, recipients, sent_at FROM sent_ledger WHERE mailbox = ? AND item_id = ? ORDER BY stage",
+            (self.mailbox, item_id),
+        )
+        return [{"stage": stage, "recipients": json.loads(r), "sent_at": sent_at} for stage, r, sent_at in rows]
@@ -0,0 +1,64 @@
+# mailtips.py
+# Pre-send MailTips check. Recipients whose address no longer exists, or
+# whose mailbox can't take the reminder, are suppressed; recipients with an
+# active out-of-office reply are deferred to a later run. Tips are fetched
+# in batches for everyone a run would remind and cached for a short TTL.
+from .breaker import CircuitOpen
+from .store import TtlCache
+
+MAILTIPS_TTL = 3600
+# Headers and MIME overhead on top of subject and body
+MESSAGE_OVERHEAD = 4096
+
+
+def message_size(template):
+    """Rough size in bytes of a rendered reminder."""
+    return len(template["subject"].encode("utf-8")) + len(template["body"].encode("utf-8")) + MESSAGE_OVERHEAD
+
+
+class MailTipsFilter:
+    """Splits reminder recipients into send / suppress / defer using MailTips."""
+
+    def __init__(self, backend, conn=None, ttl_seconds=MAILTIPS_TTL):
+        self.backend = backend
+        self.cache = TtlCache(conn, "mailtips", ttl_seconds) if conn is not None else None
+
+    def tips(self, addresses):
+        """Return {address: {"oof", "invalid", "max_size"}} for the addresses MailTips knows."""
+        addresses = set(addresses)
+        found = self.cache.get_many(addresses) if self.cache else {}
+        missing = addresses - set(found)
+        if missing:
+            try:
+                fetched = {a: t for a, t in self.backend.mail_tips(missing).items() if t is not None}
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                # Without tips everyone is sent to, as before
+                print(f"  ⚠️ Error fetching MailTips: {e}")
+                fetched = {}
+            found.update(fetched)
+            if self.cache:
+                self.cache.set_many(fetched)
+        return found
+
+    def split(self, remind, template, tips):
+        """
+        Returns (send, suppressed, deferred); the last two map address -> reason.
+        `tips` is the result of tips() for the whole run.
+        """
+        size = message_size(template)
+        send, suppressed, deferred = [], {}, {}
+        for address in remind:
+            tip = tips.get(address)
+            if tip is None:
+                send.append(address)
+            elif tip.get("invalid"):
+                suppressed[address] = "invalid recipient"
+            elif tip.get("max_size") and size > tip["max_size"]:
+                suppressed[address] = f"message over {tip['max_size']} bytes"
+            elif tip.get("oof"):
+                deferred[address] = "out of office"
+            else:
+                send.append(address)
+        return send, suppressed, deferred
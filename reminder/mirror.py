@@ -0,0 +1,141 @@
+# mirror.py
+# Optional local mirror of Inbox headers, kept current with SyncFolderItems.
+# Once synced, responder lookups are indexed SQLite queries and the hot path
+# makes no EWS calls at all. It offers the same read methods as a backend,
+# so the engine can use either as its Inbox source.
+import datetime
+import re
+
+from .dates import parse_datetime
+from .models import MailItem
+
+SUBJECT_PREFIX_RE = re.compile(r"^\s*(re|fw|fwd|رد|إعادة توجيه)\s*:\s*", re.IGNORECASE)
+
+
+def normalize_subject(subject):
+    """'RE: Fw: Budget ' -> 'budget'."""
+    subject = (subject or "").strip()
+    while True:
+        stripped = SUBJECT_PREFIX_RE.sub("", subject, count=1)
+        if stripped == subject:
+            return subject.lower()
+        subject = stripped
+
+
+def _utc_text(value):
+    """Sortable UTC text, so date ranges are plain string comparisons."""
+    return value.astimezone(datetime.timezone.utc).isoformat() if value else None
+
+
+def _references_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(v for v in value if v)
+    return value
+
+
+class InboxMirror:
+    """Inbox header rows of one mailbox in the state database."""
+
+    def __init__(self, conn, backend):
+        self.conn = conn
+        self.backend = backend
+        self.mailbox = backend.mailbox
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inbox_mirror ("
+                " mailbox TEXT NOT NULL, item_id TEXT NOT NULL, conversation_id TEXT, sender TEXT,"
+                " internet_message_id TEXT, in_reply_to TEXT, refs TEXT, subject_norm TEXT,"
+                " datetime_received TEXT, PRIMARY KEY (mailbox, item_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS inbox_mirror_conversation ON inbox_mirror (mailbox, conversation_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS inbox_mirror_subject ON inbox_mirror (mailbox, subject_norm)")
+            conn.execute("CREATE INDEX IF NOT EXISTS inbox_mirror_received ON inbox_mirror (mailbox, datetime_received)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inbox_sync_state (mailbox TEXT PRIMARY KEY, sync_state TEXT)"
+            )
+
+    # ================================================
+    # 🔄 Sync
+    # ================================================
+    def sync(self):
+        """Apply every Inbox change since the last sync. Returns (upserted, deleted)."""
+        row = self.conn.execute("SELECT sync_state FROM inbox_sync_state WHERE mailbox = ?", (self.mailbox,)).fetchone()
+        changes, sync_state = self.backend.sync_inbox(row[0] if row else None)
+
+        upserts = []
+        deletes = []
+        for change_type, value in changes:
+            if change_type == "delete":
+                deletes.append((self.mailbox, value))
+            else:
+                upserts.append((
+                    self.mailbox, value.id, value.conversation_id, value.sender, value.internet_message_id,
+                    value.in_reply_to, _references_text(value.references), normalize_subject(value.subject),
+                    _utc_text(value.datetime_received),
+                ))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO inbox_mirror (mailbox, item_id, conversation_id, sender,"
+                " internet_message_id, in_reply_to, refs, subject_norm, datetime_received)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                upserts,
+            )
+            self.conn.executemany("DELETE FROM inbox_mirror WHERE mailbox = ? AND item_id = ?", deletes)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO inbox_sync_state (mailbox, sync_state) VALUES (?, ?)",
+                (self.mailbox, sync_state),
+            )
+        print(f"🪞 Inbox mirror synced: {len(upserts)} new/changed, {len(deletes)} removed.")
+        return len(upserts), len(deletes)
+
+    # ================================================
+    # 📖 Local reads (same shape as the backend reads)
+    # ================================================
+    def _window(self, since, until):
+        clause, params = "", []
+        if since is not None:
+            clause += " AND datetime_received >= ?"
+            params.append(_utc_text(since))
+        if until is not None:
+            clause += " AND datetime_received <= ?"
+            params.append(_utc_text(until))
+        return clause, params
+
+    def conversation_senders(self, conversation_ids, since=None, until=None):
+        senders = {}
+        window, window_params = self._window(since, until)
+        conversation_ids = list(conversation_ids)
+        for i in range(0, len(conversation_ids), 500):
+            batch = conversation_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT conversation_id, item_id, sender FROM inbox_mirror WHERE mailbox = ?"
+                f" AND sender IS NOT NULL AND conversation_id IN ({','.join('?' * len(batch))}){window}",
+                [self.mailbox, *batch, *window_params],
+            )
+            for conversation_id, item_id, sender in rows:
+                senders.setdefault(conversation_id, {})[item_id] = sender
+        return senders
+
+    def subject_senders(self, subject, since=None, until=None):
+        # Indexed equality on the normalised subject instead of a substring scan
+        window, window_params = self._window(since, until)
+        rows = self.conn.execute(
+            "SELECT item_id, sender FROM inbox_mirror WHERE mailbox = ? AND subject_norm = ?"
+            " AND sender IS NOT NULL" + window,
+            (self.mailbox, normalize_subject(subject), *window_params),
+        )
+        return dict(rows.fetchall())
+
+    def inbox_headers(self, since=None, until=None):
+        window, window_params = self._window(since, until)
+        query = (
+            "SELECT item_id, internet_message_id, in_reply_to, refs, sender, datetime_received"
+            " FROM inbox_mirror WHERE mailbox = ?" + window
+        )
+        params = [self.mailbox, *window_params]
+        for item_id, message_id, in_reply_to, refs, sender, received in self.conn.execute(query, params):
+            yield MailItem(
+                id=item_id, internet_message_id=message_id, in_reply_to=in_reply_to, references=refs,
+                sender=sender, datetime_received=parse_datetime(received),
+            )
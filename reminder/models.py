@@ -0,0 +1,83 @@
+# models.py
+# Backend-neutral mail item the engine works on.
+import sys
+
+# Most items have no distribution lists; they all share this one
+NO_GROUPS = frozenset()
+
+
+def _address(address):
+    """Lowercase and intern an address: the same people recur on every item."""
+    return sys.intern(address.lower())
+
+
+def _addresses(addresses):
+    return tuple(_address(a) for a in addresses or ())
+
+
+class MailItem:
+    """
+    The fields of a mailbox item the reminder logic needs.
+    Addresses are lowercase SMTP strings; datetimes are timezone-aware.
+    Slotted, with interned addresses and tuples, so tens of thousands of
+    scanned items and Inbox headers stay small.
+    """
+    __slots__ = (
+        "id", "changekey", "subject", "reminder_is_set", "due", "categories", "conversation_id",
+        "sender", "to", "cc", "bcc", "internet_message_id", "in_reply_to", "references",
+        "datetime_sent", "datetime_received", "groups",
+    )
+
+    def __init__(self, id, changekey=None, subject="", reminder_is_set=False, due=None,
+                 categories=(), conversation_id=None, sender=None, to=(), cc=(), bcc=(),
+                 internet_message_id=None, datetime_sent=None, datetime_received=None, groups=(),
+                 in_reply_to=None, references=None):
+        self.id = id
+        self.changekey = changekey
+        self.subject = subject or ""
+        self.reminder_is_set = bool(reminder_is_set)
+        self.due = due
+        self.categories = tuple(categories or ())
+        self.conversation_id = sys.intern(conversation_id) if conversation_id else None
+        self.sender = _address(sender) if sender else None
+        self.to = _addresses(to)
+        self.cc = _addresses(cc)
+        self.bcc = _addresses(bcc)
+        self.internet_message_id = internet_message_id
+        self.in_reply_to = in_reply_to
+        self.references = references
+        self.datetime_sent = datetime_sent
+        self.datetime_received = datetime_received
+        # Recipients that are distribution lists
+        self.groups = frozenset(_addresses(groups)) if groups else NO_GROUPS
+
+    def update_details(self, other):
+        """Copy the phase-two fields (sender, recipients, thread ids) from `other`."""
+        for field in ("changekey", "conversation_id", "sender", "to", "cc", "bcc", "internet_message_id",
+                      "in_reply_to", "references", "datetime_sent", "groups"):
+            setattr(self, field, getattr(other, field))
+
+    def has_category(self, category):
+        """Case-insensitive category check."""
+        return category.lower() in (c.lower() for c in self.categories)
+
+    def __repr__(self):
+        return f"MailItem(id={self.id!r}, subject={self.subject!r})"
+
+
+def add_sent_category(existing_categories, sent_category):
+    """
+    Safely adds the sent category to existing categories.
+    """
+    if not existing_categories:
+        return [sent_category]
+
+    if isinstance(existing_categories, str):
+        category_list = [cat.strip() for cat in existing_categories.split(',')]
+    else:
+        category_list = list(existing_categories)
+
+    if sent_category not in category_list:
+        category_list.append(sent_category)
+
+    return category_list
@@ -0,0 +1,102 @@
+# ndr.py
+# Non-delivery report ingestion. Delivery-failure reports received since the
+# last run are parsed for their failed recipients, which go into a persistent
+# suppression set; the engine never reminds those addresses again while the
+# last failure is recent.
+import datetime
+import email
+import email.policy
+import time
+
+from .dates import parse_datetime
+
+DEAD_ADDRESS_DAYS = 90
+
+
+def failed_recipients(mime):
+    """Final-Recipient addresses with Action: failed in a DSN (RFC 3464) report."""
+    if isinstance(mime, str):
+        mime = mime.encode("utf-8")
+    message = email.message_from_bytes(mime, policy=email.policy.compat32)
+    failed = set()
+    for part in message.walk():
+        if part.get_content_type() != "message/delivery-status":
+            continue
+        # The first block describes the message, the others one recipient each
+        for block in part.get_payload()[1:]:
+            if (block.get("Action") or "").strip().lower() != "failed":
+                continue
+            recipient = block.get("Final-Recipient") or block.get("Original-Recipient") or ""
+            address = recipient.split(";", 1)[-1].strip().strip("<>").lower()
+            if "@" in address:
+                failed.add(address)
+    return failed
+
+
+class Suppressions:
+    """Dead addresses of one mailbox, learned from its NDRs."""
+
+    def __init__(self, conn, mailbox, max_age_days=DEAD_ADDRESS_DAYS):
+        self.conn = conn
+        self.mailbox = mailbox
+        self.max_age = max_age_days * 86400
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead_addresses ("
+                " mailbox TEXT NOT NULL, address TEXT NOT NULL, failures INTEGER NOT NULL,"
+                " first_seen REAL NOT NULL, last_seen REAL NOT NULL, PRIMARY KEY (mailbox, address))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS ndr_state (mailbox TEXT PRIMARY KEY, last_received TEXT)")
+
+    def ingest(self, backend):
+        """Parse the NDRs received since the last ingestion. Returns the number of new failures."""
+        row = self.conn.execute("SELECT last_received FROM ndr_state WHERE mailbox = ?", (self.mailbox,)).fetchone()
+        since = parse_datetime(row[0]) if row else None
+        reports = backend.delivery_reports(since)
+
+        latest = since
+        failures = []
+        for item_id, received, mime in reports:
+            try:
+                found = failed_recipients(mime)
+            except Exception as e:
+                # One malformed report must not hold back the ones after it
+                print(f"  ⚠️ Could not parse delivery report {item_id}: {e}")
+                found = set()
+            for address in found:
+                failures.append((address, received.timestamp() if received else time.time()))
+            if received and (latest is None or received > latest):
+                latest = received
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO dead_addresses (mailbox, address, failures, first_seen, last_seen) VALUES (?, ?, 1, ?, ?)"
+                " ON CONFLICT (mailbox, address) DO UPDATE SET failures = failures + 1,"
+                " last_seen = MAX(last_seen, excluded.last_seen)",
+                [(self.mailbox, address, seen, seen) for address, seen in failures],
+            )
+            if latest is not None:
+                # The next window starts just after the newest report seen
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ndr_state (mailbox, last_received) VALUES (?, ?)",
+                    (self.mailbox, (latest + datetime.timedelta(seconds=1)).isoformat()),
+                )
+        print(f"📭 Ingested {len(reports)} delivery reports, {len(failures)} failed recipients.")
+        return len(failures)
+
+    def dead(self, addresses=None):
+        """Addresses with a recent delivery failure (limited to `addresses` if given)."""
+        rows = self.conn.execute(
+            "SELECT address FROM dead_addresses WHERE mailbox = ? AND last_seen > ?",
+            (self.mailbox, time.time() - self.max_age),
+        )
+        found = {address for (address,) in rows}
+        return found if addresses is None else found & set(addresses)
+
+    def forget(self, addresses):
+        """Drop addresses from the suppression set (e.g. a mailbox was restored)."""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM dead_addresses WHERE mailbox = ? AND address = ?",
+                [(self.mailbox, address.lower()) for address in addresses],
+            )
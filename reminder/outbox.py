@@ -0,0 +1,177 @@
+# outbox.py
+# Durable outbox between deciding and delivering.
+#
+# The plan phase queues one entry per due item; the delivery worker drains
+# the queue in batches. An entry moves pending -> sent -> done and is only
+# retired once its category commit succeeded, so a crash or a failed send
+# never loses a decision and never repeats a reminder that already went out.
+# Only sending can fail for good: a sent entry keeps retrying its category
+# commit, since the ledger already keeps the item out of every later plan.
+import hashlib
+import json
+import time
+
+from .ledger import REMINDER_STAGE
+
+PENDING = "pending"
+SENT = "sent"
+DONE = "done"
+FAILED = "failed"
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+# Longest wait between category commit retries of a sent entry
+MAX_COMMIT_RETRY_SECONDS = 6 * 3600
+KEEP_DONE_DAYS = 30
+
+
+def idempotency_key(item_id, category, stage=REMINDER_STAGE, reminded_before=()):
+    """
+    One reminder per item, reminder category and stage, however often it is
+    planned. A follow-up for recipients deferred earlier gets its own key.
+    """
+    key = f"{item_id}|{category}|{stage}"
+    if reminded_before:
+        key += "|" + ",".join(sorted(reminded_before))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class Outbox:
+    """SQLite-backed reminder queue (the state database runs in WAL mode)."""
+
+    def __init__(self, conn, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " key TEXT PRIMARY KEY, item_id TEXT NOT NULL, category TEXT NOT NULL,"
+                " payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL, last_error TEXT,"
+                " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, next_attempt_at)")
+
+    # ================================================
+    # 📥 Decision side
+    # ================================================
+    def enqueue(self, plan):
+        """
+        Queue every plan item; items already queued keep their state, except
+        failed entries, which the new plan puts back to pending. Returns the
+        number added.
+        """
+        now = time.time()
+        rows = [
+            (
+                idempotency_key(item["id"], plan["sent_category"], item.get("stage", REMINDER_STAGE), item.get("reminded_before", ())),
+                item["id"], plan["sent_category"],
+                json.dumps(item, ensure_ascii=False), PENDING, now, now, now,
+            )
+            for item in plan["items"]
+        ]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (key, item_id, category, payload, status,"
+                " next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self.conn.total_changes - before
+            # A failed entry would otherwise block its item for good
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "UPDATE outbox SET status = ?, payload = ?, attempts = 0, next_attempt_at = ?, updated_at = ?"
+                " WHERE key = ? AND status = ?",
+                [(PENDING, payload, now, now, key, FAILED) for key, _, _, payload, _, _, _, _ in rows],
+            )
+            retried = self.conn.total_changes - before
+        print(f"📥 Queued {added} new of {len(rows)} planned reminders.")
+        if retried:
+            print(f"🔁 Retrying {retried} reminders that had failed {self.max_attempts} times.")
+        return added
+
+    # ================================================
+    # 📤 Delivery side
+    # ================================================
+    def _ready(self, status, limit=None):
+        rows = self.conn.execute(
+            "SELECT key, category, payload, attempts FROM outbox"
+            " WHERE status = ? AND next_attempt_at <= ? ORDER BY created_at LIMIT ?",
+            (status, time.time(), limit or self.batch_size),
+        ).fetchall()
+        return [(key, category, json.loads(payload), attempts) for key, category, payload, attempts in rows]
+
+    def _record(self, outcomes, success_status):
+        """
+        outcomes: [(key, attempts, result)]; failures are retried with exponential
+        backoff. A failed send gives up after max_attempts; a failed commit
+        (success_status DONE) stays SENT and keeps retrying.
+        """
+        now = time.time()
+        with self.conn:
+            for key, attempts, result in outcomes:
+                if not isinstance(result, Exception):
+                    self.conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?, last_error = NULL,"
+                        " updated_at = ? WHERE key = ?",
+                        (success_status, now, now, key),
+                    )
+                    continue
+                attempts += 1
+                delay = RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                status = None
+                if success_status == DONE:
+                    delay = min(delay, MAX_COMMIT_RETRY_SECONDS)
+                elif attempts >= self.max_attempts:
+                    status = FAILED
+                self.conn.execute(
+                    "UPDATE outbox SET status = COALESCE(?, status), attempts = ?, next_attempt_at = ?,"
+                    " last_error = ?, updated_at = ? WHERE key = ?",
+                    (status, attempts, now + delay, str(result), now, key),
+                )
+
+    def drain(self, engine, now=None):
+        """
+        Deliver everything that is due: send pending entries batch by batch,
+        then commit categories for sent ones (stamped with the run's `now`).
+        Returns the number retired. A whole-plan transport (digest) gets
+        every pending entry in one batch.
+        """
+        retired = 0
+        # SQLite reads LIMIT -1 as no limit
+        send_limit = -1 if engine.transport.whole_plan else None
+        while True:
+            batch = self._ready(PENDING, send_limit)
+            if not batch:
+                break
+            results = engine.send_reminders([item for _, _, item, _ in batch])
+            self._record([(key, attempts, r) for (key, _, _, attempts), r in zip(batch, results)], SENT)
+
+        while True:
+            batch = self._ready(SENT)
+            if not batch:
+                break
+            by_category = {}
+            for entry in batch:
+                by_category.setdefault(entry[1], []).append(entry)
+            for category, entries in by_category.items():
+                results = engine.commit_categories([item for _, _, item, _ in entries], category, now)
+                self._record([(key, attempts, r) for (key, _, _, attempts), r in zip(entries, results)], DONE)
+                retired += sum(1 for r in results if not isinstance(r, Exception))
+
+        self.purge()
+        return retired
+
+    def stats(self):
+        """Entry count per status."""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def purge(self, keep_days=KEEP_DONE_DAYS):
+        """Forget retired entries older than `keep_days`."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND updated_at < ?", (DONE, time.time() - keep_days * 86400)
+            )
@@ -0,0 +1,85 @@
+# recipients.py
+# Recipient policies: who on the original message gets the reminder.
+
+
+class RecipientPolicy:
+    """
+    Base policy: everyone in `fields` except the original sender, minus the
+    people who already replied when `needs_responders` is set.
+    """
+    name = None
+    fields = ("to", "cc")
+    needs_responders = True
+    exclude_sender = True
+    include_sender = False
+    # Drop the mailbox's own address, as the server does for a reply-all
+    exclude_mailbox = False
+
+    def __init__(self, mailbox=None):
+        self.mailbox = mailbox
+
+    def candidates(self, item, members=None, canonical=None):
+        """
+        All addresses the policy considers for this item.
+        members: {DL address: member addresses}; expanded DLs are replaced by their members.
+        canonical: {address: primary SMTP address}; aliases and X500 addresses are mapped through it.
+        """
+        members = members or {}
+        canonical = canonical or {}
+        recipients = set()
+        for field in self.fields:
+            for address in getattr(item, field):
+                if address in members:
+                    recipients.update(canonical.get(m, m) for m in members[address])
+                else:
+                    recipients.add(canonical.get(address, address))
+        if self.exclude_sender and item.sender:
+            recipients.discard(canonical.get(item.sender, item.sender))
+        elif self.include_sender and item.sender:
+            recipients.add(canonical.get(item.sender, item.sender))
+        if self.exclude_mailbox and self.mailbox:
+            recipients.discard(canonical.get(self.mailbox, self.mailbox))
+        return recipients
+
+    def select(self, item, responders, members=None, canonical=None):
+        """Addresses that should receive the reminder (`responders` already canonical)."""
+        recipients = self.candidates(item, members, canonical)
+        if self.needs_responders:
+            recipients -= responders
+        return recipients
+
+
+class NonResponders(RecipientPolicy):
+    """To and CC recipients who haven't responded (reply/, AutoSendWorks/)."""
+    name = "non-responders"
+
+
+class ToOnlyNonResponders(RecipientPolicy):
+    """To recipients who haven't responded, CC excluded (DDay/)."""
+    name = "to-only"
+    fields = ("to",)
+
+
+class AllRecipients(RecipientPolicy):
+    """Every original recipient, including BCC, replied or not (Server/, NewOut/)."""
+    name = "all"
+    fields = ("to", "cc", "bcc")
+    needs_responders = False
+    exclude_sender = False
+
+
+class ReplyAllRecipients(RecipientPolicy):
+    """
+    Whoever a reply-all reaches: the original author plus To and CC, replied
+    or not. BCC recipients stay off the thread (NewOut/).
+    """
+    name = "reply-all"
+    needs_responders = False
+    exclude_sender = False
+    include_sender = True
+    exclude_mailbox = True
+
+
+RECIPIENT_POLICIES = {
+    cls.name: cls for cls in (NonResponders, ToOnlyNonResponders, AllRecipients, ReplyAllRecipients)
+}
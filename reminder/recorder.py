@@ -0,0 +1,254 @@
+# recorder.py
+# Record-and-replay of raw EWS traffic.
+#
+# exchangelib sends every SOAP call through BaseProtocol.HTTP_ADAPTER_CLS, so
+# swapping that adapter is enough to capture a real run (RecordingAdapter) or
+# to serve a captured run back offline (ReplayAdapter).
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from exchangelib.protocol import NoVerifyHTTPAdapter
+
+# Headers that must never end up in a recording
+SENSITIVE_HEADERS = {"authorization", "cookie", "set-cookie", "www-authenticate", "proxy-authorization"}
+
+SMTP_RE = re.compile(r"([A-Za-z0-9._%+\-']+)@([A-Za-z0-9.\-]+\.[A-Za-z]{2,})")
+X500_CN_RE = re.compile(r"(/CN=RECIPIENTS/CN=)([^<\"/\s]+)", re.IGNORECASE)
+BODY_RE = re.compile(r"(<t:Body\b[^>]*>)(.*?)(</t:Body>)", re.DOTALL)
+PASSWORD_RE = re.compile(r"(<t:Password>)(.*?)(</t:Password>)", re.DOTALL)
+# Full contact data from ResolveNames and raw MIME (e.g. NDR bodies): dropped
+BLANKED_RE = re.compile(
+    r"(<t:(PhoneNumbers|PhysicalAddresses|OfficeLocation|MimeContent)\b[^>]*>)(.*?)(</t:\2>)", re.DOTALL
+)
+NAME_RE = re.compile(r"(<t:(Name|DisplayTo|DisplayCc)>)(.*?)(</t:\2>)", re.DOTALL)
+CONTACT_RE = re.compile(r"<t:Contact>.*?</t:Contact>", re.DOTALL)
+CONTACT_NAME_RE = re.compile(
+    r"(<t:(DisplayName|GivenName|Surname|Initials|Nickname|JobTitle|CompanyName|Department)>)(.*?)(</t:\2>)", re.DOTALL
+)
+SUBJECT_RE = re.compile(r"(<t:Subject>)(.*?)(</t:Subject>)", re.DOTALL)
+# Subject restrictions of the reply search, e.g. subject__contains
+SUBJECT_CONSTANT_RE = re.compile(r'(FieldURI="item:Subject"\s*/>\s*<t:Constant Value=")([^"]*)(")')
+MESSAGE_ID_RE = re.compile(r"(<t:(InternetMessageId|InReplyTo|References)>)(.*?)(</t:\2>)", re.DOTALL)
+MESSAGE_ID_HOST_RE = re.compile(r"@([A-Za-z0-9.\-]+)")
+PSEUDONYM_RE = re.compile(r"^u[0-9a-f]{10}$")
+
+
+# ================================================
+# 🧽 Scrubbing
+# ================================================
+def _pseudonym(value):
+    """Stable short pseudonym, so scrubbed addresses still match each other."""
+    # Already scrubbed (e.g. an address echoed back during replay): keep it
+    if PSEUDONYM_RE.match(value):
+        return value
+    return "u" + hashlib.sha1(value.lower().encode("utf-8")).hexdigest()[:10]
+
+
+def _pseudonym_words(value):
+    """
+    Pseudonymise a subject word by word. A replayed run builds its searches
+    and reply subjects from scrubbed subjects, and those scrub to the same text.
+    """
+    return " ".join(_pseudonym(word) for word in html.unescape(value).split())
+
+
+def _pseudonym_names(value):
+    """Pseudonymise a "; "-separated display name list."""
+    return "; ".join(_pseudonym(name.strip()) for name in html.unescape(value).split(";") if name.strip())
+
+
+def _pseudonym_host(host):
+    if host.endswith(".invalid"):
+        return host
+    return _pseudonym(host) + ".invalid"
+
+
+def scrub_text(text):
+    """
+    Remove personal data from a SOAP payload.
+    Bodies, MIME content, phone numbers and postal addresses are dropped.
+    Addresses, display names, subjects and Message-ID hosts are pseudonymised
+    (not dropped) so responder matching, X500 quirks, reply threading and
+    thread sizes survive the scrub.
+    """
+    if not text:
+        return text
+    text = PASSWORD_RE.sub(r"\1[scrubbed]\3", text)
+    text = BODY_RE.sub(r"\1[scrubbed]\3", text)
+    text = BLANKED_RE.sub(r"\1[scrubbed]\4", text)
+    text = NAME_RE.sub(lambda m: m.group(1) + _pseudonym_names(m.group(3)) + m.group(4), text)
+    text = CONTACT_RE.sub(
+        lambda c: CONTACT_NAME_RE.sub(lambda m: m.group(1) + _pseudonym_names(m.group(3)) + m.group(4), c.group(0)),
+        text,
+    )
+    text = SUBJECT_RE.sub(lambda m: m.group(1) + _pseudonym_words(m.group(2)) + m.group(3), text)
+    text = SUBJECT_CONSTANT_RE.sub(lambda m: m.group(1) + _pseudonym_words(m.group(2)) + m.group(3), text)
+    text = MESSAGE_ID_RE.sub(
+        lambda m: m.group(1) + MESSAGE_ID_HOST_RE.sub(lambda h: "@" + _pseudonym_host(h.group(1)), m.group(3)) + m.group(4),
+        text,
+    )
+    text = SMTP_RE.sub(lambda m: f"{_pseudonym(m.group(1))}@{m.group(2).lower()}", text)
+    text = X500_CN_RE.sub(lambda m: m.group(1) + _pseudonym(m.group(2)), text)
+    return text
+
+
+def scrub_headers(headers):
+    """Drop credentials and session cookies from a header mapping."""
+    return {k: v for k, v in (headers or {}).items() if k.lower() not in SENSITIVE_HEADERS}
+
+
+def _decode(body):
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+    return str(body)
+
+
+def request_key(method, url, body):
+    """Key used to pair a live request with a recorded one."""
+    path = re.sub(r"^https?://[^/]+", "", url or "")
+    digest = hashlib.sha1(scrub_text(_decode(body)).encode("utf-8")).hexdigest()
+    return f"{method} {path} {digest}"
+
+
+# ================================================
+# ⏺️ Recording
+# ================================================
+def recording_adapter(path):
+    """Return an HTTP adapter class that appends every exchange to `path` (JSON lines)."""
+
+    class RecordingAdapter(NoVerifyHTTPAdapter):
+        record_path = path
+        _lock = threading.Lock()
+        _started = None
+
+        def send(self, request, **kwargs):
+            started = time.monotonic()
+            response = super().send(request, **kwargs)
+            # Reading content here keeps exchangelib's parsing unaffected
+            content = response.content
+            elapsed = time.monotonic() - started
+
+            with self._lock:
+                if RecordingAdapter._started is None:
+                    RecordingAdapter._started = started
+                entry = {
+                    "key": request_key(request.method, request.url, request.body),
+                    "offset": round(started - RecordingAdapter._started, 4),
+                    "elapsed": round(elapsed, 4),
+                    "method": request.method,
+                    "url": request.url,
+                    "request_headers": scrub_headers(request.headers),
+                    "request_body": scrub_text(_decode(request.body)),
+                    "status": response.status_code,
+                    "headers": scrub_headers(response.headers),
+                    "body": scrub_text(_decode(content)),
+                }
+                with open(self.record_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            return response
+
+    return RecordingAdapter
+
+
+# ================================================
+# ▶️ Replay
+# ================================================
+def load_recording(path):
+    """Load a recording into {key: deque(entries)}, keeping recorded order per key."""
+    pairs = defaultdict(deque)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                pairs[entry["key"]].append(entry)
+    return pairs
+
+
+def replay_adapter(path, speed=1.0):
+    """
+    Return an HTTP adapter class that answers from a recording instead of the network.
+    speed=1.0 reproduces the recorded spacing and latency of the requests,
+    speed=2.0 runs twice as fast, speed=0 replays as fast as possible.
+    """
+    pairs = load_recording(path)
+    stats = {"served": 0, "recorded_seconds": 0.0}
+    lock = threading.Lock()
+    # Replay time that corresponds to the recording's offset 0
+    clock = {"start": None}
+
+    class ReplayAdapter(BaseAdapter):
+        recording = pairs
+        replay_stats = stats
+
+        def __init__(self, **kwargs):
+            # exchangelib passes pool/retry settings meant for a real adapter
+            super().__init__()
+
+        def send(self, request, **kwargs):
+            key = request_key(request.method, request.url, request.body)
+            with lock:
+                queue = self.recording.get(key)
+                if not queue:
+                    raise LookupError(f"No recorded response for {request.method} {request.url} ({key})")
+                # Keep the last answer for calls that were repeated more often than recorded
+                entry = queue.popleft() if len(queue) > 1 else queue[0]
+                stats["served"] += 1
+                stats["recorded_seconds"] += entry["elapsed"]
+                if speed and clock["start"] is None:
+                    clock["start"] = time.monotonic() - entry["offset"] / speed
+
+            if speed:
+                # Hold the request until its recorded offset, then for its recorded latency
+                wait = clock["start"] + entry["offset"] / speed - time.monotonic()
+                time.sleep(max(0.0, wait) + entry["elapsed"] / speed)
+
+            response = Response()
+            response.status_code = entry["status"]
+            response.headers = CaseInsensitiveDict(entry["headers"])
+            response._content = entry["body"].encode("utf-8")
+            response._content_consumed = True
+            response.encoding = "utf-8"
+            response.url = request.url
+            response.request = request
+            response.reason = "Replayed"
+            return response
+
+        def close(self):
+            pass
+
+    return ReplayAdapter
+
+
+def get_http_adapter_cls(default_cls):
+    """
+    Pick the adapter from the environment:
+      EWS_RECORD_FILE=path   record the run (scrubbed) to path
+      EWS_REPLAY_FILE=path   serve the run from path, no network
+      EWS_REPLAY_SPEED=x     1 = original timing (default), 0 = as fast as possible
+    """
+    replay_file = os.getenv("EWS_REPLAY_FILE")
+    if replay_file:
+        speed = float(os.getenv("EWS_REPLAY_SPEED", "1"))
+        print(f"▶️ Replaying EWS traffic from {replay_file} (speed={speed or 'max'})")
+        return replay_adapter(replay_file, speed)
+
+    record_file = os.getenv("EWS_RECORD_FILE")
+    if record_file:
+        print(f"⏺️ Recording EWS traffic to {record_file}")
+        print(f"   Replay with REMINDER_NOW={datetime.now(timezone.utc).isoformat()} for identical due checks")
+        return recording_adapter(record_file)
+
+    return default_cls
@@ -0,0 +1,77 @@
+# schedule.py
+# Pre-scheduled reminders. An off-peak run hands each reminder to Exchange
+# with deferred delivery (PR_DEFERRED_SEND_TIME) set to its exact reminder
+# moment. This table keeps what is still pending, so later runs can cancel
+# the ones answered in the meantime and record delivered ones in the ledger.
+import datetime
+import json
+import time
+
+from .dates import parse_datetime
+
+SCHEDULE_HORIZON = datetime.timedelta(days=7)
+
+
+class ReminderSchedule:
+    """(mailbox, item id, stage) -> the deferred reminder waiting in Exchange."""
+
+    def __init__(self, conn, mailbox):
+        self.conn = conn
+        self.mailbox = mailbox
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_reminders ("
+                " mailbox TEXT NOT NULL, item_id TEXT NOT NULL, stage INTEGER NOT NULL,"
+                " subject TEXT, conversation_id TEXT, internet_message_id TEXT, datetime_sent TEXT,"
+                " due TEXT NOT NULL, recipients TEXT NOT NULL, send_at TEXT NOT NULL, scheduled_at REAL NOT NULL,"
+                " PRIMARY KEY (mailbox, item_id, stage))"
+            )
+
+    def record(self, items):
+        """items: plan items with "send_at" that Exchange accepted."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scheduled_reminders (mailbox, item_id, stage, subject, conversation_id,"
+                " internet_message_id, datetime_sent, due, recipients, send_at, scheduled_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.mailbox, item["id"], item["stage"], item["subject"], item.get("conversation_id"),
+                     item.get("internet_message_id"), item.get("datetime_sent"), item["due"],
+                     json.dumps(sorted(item["remind"])), item["send_at"], now)
+                    for item in items
+                ],
+            )
+
+    def pending_ids(self, item_ids, stage):
+        """Return the subset of `item_ids` with a reminder scheduled at `stage`."""
+        wanted = set(item_ids)
+        rows = self.conn.execute(
+            "SELECT item_id FROM scheduled_reminders WHERE mailbox = ? AND stage = ?", (self.mailbox, stage)
+        )
+        return {item_id for (item_id,) in rows if item_id in wanted}
+
+    def entries(self):
+        """Every scheduled reminder, as plan-item-like dicts with send_at parsed."""
+        rows = self.conn.execute(
+            "SELECT item_id, stage, subject, conversation_id, internet_message_id, datetime_sent, due,"
+            " recipients, send_at FROM scheduled_reminders WHERE mailbox = ? ORDER BY send_at",
+            (self.mailbox,),
+        )
+        return [
+            {
+                "id": item_id, "stage": stage, "subject": subject, "conversation_id": conversation_id,
+                "internet_message_id": internet_message_id, "datetime_sent": datetime_sent, "due": due,
+                "remind": json.loads(recipients), "send_at": parse_datetime(send_at),
+            }
+            for item_id, stage, subject, conversation_id, internet_message_id, datetime_sent, due, recipients, send_at
+            in rows
+        ]
+
+    def remove(self, entries):
+        """Forget delivered or cancelled reminders."""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM scheduled_reminders WHERE mailbox = ? AND item_id = ? AND stage = ?",
+                [(self.mailbox, entry["id"], entry["stage"]) for entry in entries],
+            )
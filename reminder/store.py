@@ -0,0 +1,71 @@
+# store.py
+# Local SQLite state shared by the engine's caches and queues.
+# One file per mailbox runner, opened in WAL mode so a reader (e.g. a
+# delivery worker) never blocks the writer.
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_DB_PATH = ".reminder_state.db"
+
+
+def default_db_path():
+    """REMINDER_STATE_DB or .reminder_state.db in the runner's folder."""
+    return os.getenv("REMINDER_STATE_DB", DEFAULT_DB_PATH)
+
+
+def connect(path=None):
+    """Open (and create) the state database."""
+    conn = sqlite3.connect(path or default_db_path(), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TtlCache:
+    """Persistent key -> JSON value cache with a per-namespace time-to-live."""
+
+    def __init__(self, conn, namespace, ttl_seconds):
+        self.conn = conn
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ttl_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached and not expired."""
+        found = {}
+        keys = list(keys)
+        now = time.time()
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, value FROM ttl_cache WHERE namespace = ? AND expires_at > ?"
+                f" AND key IN ({','.join('?' * len(batch))})",
+                [self.namespace, now, *batch],
+            )
+            found.update((key, json.loads(value)) for key, value in rows)
+        return found
+
+    def set_many(self, mapping, ttl_seconds=None):
+        """Store every key/value pair with a fresh expiry (`ttl_seconds` overrides the namespace TTL)."""
+        if not mapping:
+            return
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ttl_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                [(self.namespace, key, json.dumps(value), expires_at) for key, value in mapping.items()],
+            )
+
+    def purge(self):
+        """Drop expired entries of this namespace."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM ttl_cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time())
+            )
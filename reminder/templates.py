@@ -0,0 +1,76 @@
+# templates.py
+# Reminder text. All deployments use the same Arabic wording; DDay adds the
+# timezone to the due-date label.
+from .dates import format_due_date_for_email
+
+
+def _count_messages(count):
+    """Arabic count of messages: dual for 2, plural for 3-10, singular tamyiz from 11."""
+    if count == 2:
+        return "رسالتان"
+    if 3 <= count <= 10:
+        return f"{count} رسائل"
+    return f"{count} رسالة"
+
+
+class ArabicReminderTemplate:
+    """The follow-up reminder sent by every mailbox runner."""
+    name = "arabic"
+
+    def __init__(self, due_label="الموعد"):
+        self.due_label = due_label
+
+    def subject(self, original_subject):
+        """Returns the formatted subject for the reminder email."""
+        return f"🔔 تذكير بالمتابعة: {original_subject}"
+
+    def body(self, original_subject, due_date_str):
+        """Returns the formatted body for the reminder email."""
+        return (
+            f"السلام عليكم ورحمة الله وبركاته،\n\n"
+            f"نود تذكيركم بأن الرسالة التالية بلغت موعدها المحدد للمتابعة:\n\n"
+            f"📩 العنوان: {original_subject}\n"
+            f"📅 {self.due_label}: {due_date_str or 'غير محدد'}\n\n"
+            f"يرجى اتخاذ اللازم.\n\n"
+            f"قسم المتابعة - هيئة الغذاء والدواء"
+        )
+
+    def render(self, item):
+        """Subject and body for one mail item."""
+        due_date_str = format_due_date_for_email(item.due)
+        return {"subject": self.subject(item.subject), "body": self.body(item.subject, due_date_str)}
+
+    def digest(self, entries):
+        """
+        Subject and body of one consolidated reminder.
+        entries: [(original subject, due date string)], in the order listed.
+        A single entry gets the ordinary reminder text.
+        """
+        if len(entries) == 1:
+            subject, due_date_str = entries[0]
+            return {"subject": self.subject(subject), "body": self.body(subject, due_date_str)}
+        lines = "\n\n".join(
+            f"📩 العنوان: {subject}\n📅 {self.due_label}: {due_date_str or 'غير محدد'}"
+            for subject, due_date_str in entries
+        )
+        return {
+            "subject": f"🔔 تذكير بالمتابعة: {_count_messages(len(entries))} بانتظار ردكم",
+            "body": (
+                f"السلام عليكم ورحمة الله وبركاته،\n\n"
+                f"نود تذكيركم بأن الرسائل التالية بلغت موعدها المحدد للمتابعة:\n\n"
+                f"{lines}\n\n"
+                f"يرجى اتخاذ اللازم.\n\n"
+                f"قسم المتابعة - هيئة الغذاء والدواء"
+            ),
+        }
+
+
+class RiyadhLabelTemplate(ArabicReminderTemplate):
+    """Same text with 'الموعد (بتوقيت الرياض)' as used by DDay/."""
+    name = "arabic-riyadh"
+
+    def __init__(self):
+        super().__init__(due_label="الموعد (بتوقيت الرياض)")
+
+
+TEMPLATES = {cls.name: cls for cls in (ArabicReminderTemplate, RiyadhLabelTemplate)}
@@ -0,0 +1,68 @@
+# threads.py
+# Reply graph built from In-Reply-To / References headers. Unlike
+# conversation_id it survives other mail clients and changed subjects, and
+# one projected Inbox pass answers "who replied to X" for every candidate.
+import re
+from collections import defaultdict
+
+MESSAGE_ID_RE = re.compile(r"<[^<>\s]+>")
+
+
+def parse_message_ids(value):
+    """'<a@x> <b@x>' (or a list of such strings) -> ['<a@x>', '<b@x>']."""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        value = " ".join(v for v in value if v)
+    found = MESSAGE_ID_RE.findall(value)
+    # A bare id without angle brackets
+    return found or [f"<{value.strip()}>"]
+
+
+class ReplyGraph:
+    """Message-ID -> replies, with the sender of every reply."""
+
+    def __init__(self):
+        self.children = defaultdict(set)
+        self.senders = {}
+
+    def add(self, message_id, sender, in_reply_to=None, references=None):
+        """Index one Inbox message under every message it answers or references."""
+        ids = parse_message_ids(message_id)
+        if not ids:
+            return
+        message_id = ids[0]
+        if sender:
+            self.senders[message_id] = sender
+        for parent in set(parse_message_ids(in_reply_to)) | set(parse_message_ids(references)):
+            if parent != message_id:
+                self.children[parent].add(message_id)
+
+    def replies(self, message_id):
+        """Every message below `message_id` in the thread, replies to replies included."""
+        ids = parse_message_ids(message_id)
+        if not ids:
+            return set()
+        found = set()
+        pending = [ids[0]]
+        while pending:
+            for child in self.children.get(pending.pop(), ()):
+                if child not in found:
+                    found.add(child)
+                    pending.append(child)
+        return found
+
+    def repliers(self, message_id):
+        """Senders of every reply to `message_id`."""
+        return {self.senders[m] for m in self.replies(message_id) if m in self.senders}
+
+    @classmethod
+    def build(cls, backend, since=None, until=None):
+        """One projected, paged pass over Inbox headers received in [since, until]."""
+        graph = cls()
+        count = 0
+        for header in backend.inbox_headers(since, until):
+            graph.add(header.internet_message_id, header.sender, header.in_reply_to, header.references)
+            count += 1
+        print(f"🧵 Reply graph: {count} Inbox headers, {len(graph.children)} answered messages.")
+        return graph
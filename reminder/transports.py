@@ -0,0 +1,265 @@
+# transports.py
+# Delivery strategies: how a planned reminder reaches its recipients.
+import queue
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+
+from .backends.base import chunked
+from .breaker import CircuitOpen
+from .dates import format_due_date_for_email, parse_datetime
+from .templates import ArabicReminderTemplate
+
+# Exchange's default per-message recipient limit (MaxRecipientEnvelopeLimit)
+MAX_RECIPIENTS = 500
+SEND_WORKERS = 4
+SMTP_TIMEOUT = 60
+
+
+class Transport:
+    """
+    Sends planned reminders through a mailbox backend. A reminder with more
+    than `max_recipients` addresses goes out as several messages; the k-th
+    chunks of all reminders form one wave, and waves are sent concurrently.
+    A reminder succeeds only when all of its chunks did, so a retry after a
+    partial failure may repeat it for the chunks that had gone out.
+    """
+    name = None
+    # True when the transport needs the whole run's reminders in one send call
+    whole_plan = False
+
+    def __init__(self, template=None, max_recipients=MAX_RECIPIENTS, workers=SEND_WORKERS):
+        # Only transports that compose their own text use it
+        self.template = template or ArabicReminderTemplate()
+        self.max_recipients = max_recipients
+        self.workers = workers
+
+    def send(self, backend, reminders):
+        """
+        reminders: plan items ({"id", "remind", "template", ...}).
+        Returns one result per reminder: True or the exception raised.
+        """
+        waves = []
+        for index, reminder in enumerate(reminders):
+            for wave, part in enumerate(chunked(sorted(reminder["remind"]), self.max_recipients)):
+                if wave == len(waves):
+                    waves.append([])
+                waves[wave].append((index, {**reminder, "remind": part}))
+
+        if len(waves) > 1:
+            print(f"  ✂️ Recipient lists over {self.max_recipients} split into {len(waves)} concurrent waves.")
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(waves))) as pool:
+                sent = list(pool.map(lambda wave: self._deliver_wave(backend, wave), waves))
+        else:
+            sent = [self._deliver_wave(backend, wave) for wave in waves]
+
+        results = [True] * len(reminders)
+        for wave, wave_results in zip(waves, sent):
+            for (index, _), result in zip(wave, wave_results):
+                if isinstance(result, Exception) and results[index] is True:
+                    results[index] = result
+        return results
+
+    def _deliver_wave(self, backend, wave):
+        try:
+            return self.deliver(backend, [chunk for _, chunk in wave])
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            return [e] * len(wave)
+
+    def deliver(self, backend, reminders):
+        """Send reminders whose recipient lists are within the limit. Returns True or an exception per reminder."""
+        raise NotImplementedError
+
+
+class ReplyAllTransport(Transport):
+    """Reply on the original thread, To = selected recipients, CC cleared."""
+    name = "reply-all"
+
+    def deliver(self, backend, reminders):
+        return backend.send_replies(reminders)
+
+
+class ReplyTransport(Transport):
+    """Plain reply on the original thread (no reply-all), To = selected recipients, CC cleared (DDay/)."""
+    name = "reply"
+
+    def deliver(self, backend, reminders):
+        return backend.send_replies(reminders, reply_all=False)
+
+
+class NewMessageTransport(Transport):
+    """Send a fresh message outside the original thread."""
+    name = "new-message"
+
+    def deliver(self, backend, reminders):
+        return backend.send_new_messages(reminders)
+
+
+class DigestTransport(Transport):
+    """
+    One new message per recipient listing every item they are reminded about,
+    instead of one message per item. An item succeeds when every digest it
+    appears in was sent; a failed digest fails all of its items, so their
+    other recipients may see them again when the items are retried.
+    The engine hands it the whole run's plan at once, not page by page.
+    """
+    name = "digest"
+    whole_plan = True
+
+    def send(self, backend, reminders):
+        pending = {}
+        for reminder in reminders:
+            for address in reminder["remind"]:
+                pending.setdefault(address, []).append(reminder)
+        if not pending:
+            return [True] * len(reminders)
+
+        recipients = sorted(pending)
+        digests = []
+        for address in recipients:
+            items = sorted(pending[address], key=lambda r: r["due"])
+            entries = [(r["subject"], format_due_date_for_email(parse_datetime(r["due"]))) for r in items]
+            digests.append({"id": None, "remind": [address], "template": self.template.digest(entries)})
+        sent = backend.send_new_messages(digests)
+
+        failed = {}
+        for address, result in zip(recipients, sent):
+            if isinstance(result, Exception):
+                for reminder in pending[address]:
+                    failed.setdefault(reminder["id"], result)
+        return [failed.get(reminder["id"], True) for reminder in reminders]
+
+
+class SmtpPool:
+    """A few persistent SMTP connections to the relay, shared by the send threads."""
+
+    def __init__(self, settings, size=SEND_WORKERS):
+        self.settings = settings
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.settings.host, self.settings.port, timeout=SMTP_TIMEOUT)
+        if self.settings.starttls and smtp.has_extn("starttls"):
+            smtp.starttls()
+        if self.settings.username:
+            smtp.login(self.settings.username, self.settings.password)
+        return smtp
+
+    def acquire(self):
+        self.slots.acquire()
+        try:
+            smtp = self.idle.get_nowait()
+        except queue.Empty:
+            smtp = None
+        if smtp is not None:
+            # A connection idle since the last batch may have been dropped by the relay
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(smtp)
+        try:
+            return self._connect()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, smtp, broken=False):
+        if broken:
+            self._discard(smtp)
+        else:
+            self.idle.put(smtp)
+        self.slots.release()
+
+    def _discard(self, smtp):
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+    def close(self):
+        while not self.idle.empty():
+            try:
+                self.idle.get_nowait().quit()
+            except Exception:
+                pass
+
+
+class SmtpRelayTransport(Transport):
+    """
+    Submit reminders to an SMTP relay instead of creating items over EWS:
+    no SOAP round trip, no Sent Items copy, no share of the EWS throttling
+    budget. In-Reply-To/References point at the original message, so mail
+    clients still thread the reminder under it. Settings come from SMTP_*.
+    """
+    name = "smtp"
+
+    def __init__(self, template=None, max_recipients=MAX_RECIPIENTS, workers=SEND_WORKERS, settings=None):
+        super().__init__(template, max_recipients, workers)
+        self.settings = settings
+        self.pool = None
+
+    def _pool(self):
+        if self.pool is None:
+            if self.settings is None:
+                from .config import SmtpSettings
+                self.settings = SmtpSettings()
+            self.pool = SmtpPool(self.settings, self.workers)
+        return self.pool
+
+    def compose(self, reminder):
+        msg = EmailMessage()
+        msg["From"] = self.settings.sender
+        msg["To"] = ", ".join(reminder["remind"])
+        msg["Subject"] = reminder["template"]["subject"]
+        msg["Date"] = formatdate(localtime=True)
+        msg["Message-ID"] = make_msgid(domain=self.settings.sender.rpartition("@")[2] or None)
+        original = reminder.get("internet_message_id")
+        if original:
+            msg["In-Reply-To"] = original
+            msg["References"] = " ".join(filter(None, [reminder.get("references"), original]))
+        msg.set_content(reminder["template"]["body"])
+        return msg
+
+    def deliver(self, backend, reminders):
+        pool = self._pool()
+        smtp = pool.acquire()
+        broken = False
+        results = []
+        try:
+            # One connection for the whole batch: no reconnect or login per message
+            for reminder in reminders:
+                if broken:
+                    results.append(smtplib.SMTPServerDisconnected("connection lost earlier in the batch"))
+                    continue
+                try:
+                    refused = smtp.send_message(self.compose(reminder))
+                    if len(refused) == len(reminder["remind"]):
+                        results.append(smtplib.SMTPRecipientsRefused(refused))
+                        continue
+                    if refused:
+                        # The rest were accepted: resending would remind them twice
+                        print(f"  ⚠️ Relay refused {len(refused)} recipients of '{reminder['subject']}': {sorted(refused)}")
+                    results.append(True)
+                except smtplib.SMTPRecipientsRefused as e:
+                    print(f"  ❌ Relay refused every recipient of '{reminder['subject']}': {sorted(e.recipients)}")
+                    results.append(e)
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    broken = True
+                    results.append(e)
+                except smtplib.SMTPException as e:
+                    results.append(e)
+        finally:
+            pool.release(smtp, broken)
+        return results
+
+
+TRANSPORTS = {
+    cls.name: cls for cls in (ReplyAllTransport, ReplyTransport, NewMessageTransport, DigestTransport, SmtpRelayTransport)
+}
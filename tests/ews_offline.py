@@ -0,0 +1,25 @@
+# An exchangelib Account and EwsBackend that never touch the network: the
+# version is fixed, so nothing is autodiscovered or probed. Requests are
+# built as usual and can be inspected; sending them is up to the test.
+from exchangelib import DELEGATE, Account, Configuration, Credentials
+from exchangelib.version import Build, Version
+
+from reminder.backends.ews import EwsBackend
+
+
+class Settings:
+    email = "me@x.com"
+    username = "me"
+    password = "secret"
+    url = "https://127.0.0.1:9/EWS/Exchange.asmx"
+
+
+def offline_backend():
+    config = Configuration(
+        credentials=Credentials(Settings.username, Settings.password),
+        service_endpoint=Settings.url,
+        version=Version(Build(15, 1)),
+    )
+    backend = EwsBackend(Settings())
+    backend._account = Account(Settings.email, config=config, autodiscover=False, access_type=DELEGATE)
+    return backend
@@ -0,0 +1,140 @@
+# Local Microsoft Graph stand-in for the graph backend tests. It serves a
+# small mailbox over http.server and implements just what the backend calls:
+# $batch, paged message lists, Inbox delta and replyAll. `throttle` makes
+# chosen request paths answer 429 a number of times first.
+import json
+import re
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def message(id, subject, received, **fields):
+    return {"id": id, "subject": subject, "receivedDateTime": received, "categories": [], **fields}
+
+
+class GraphStandIn:
+    def __init__(self, flagged=(), inbox=()):
+        self.flagged = [dict(m) for m in flagged]
+        self.inbox = [dict(m) for m in inbox]
+        self.removed = []
+        self.replies = []
+        self.requests = []
+        self.batches = 0
+        # {path regex: number of 429 answers still to give}
+        self.throttle = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1.0"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ================================================
+    # Routing
+    # ================================================
+    def handle(self, method, path, body):
+        parsed = urllib.parse.urlparse(path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+        route = re.sub(r"^/v1.0", "", parsed.path)
+        self.requests.append((method, route, query))
+
+        if self.throttled(route):
+            return 429, {"error": {"message": "throttled"}}, {"Retry-After": "0"}
+
+        if method == "GET" and route.endswith("/messages") and "/mailFolders/" not in route:
+            return self.list_flagged(query)
+        if route == "/groups":
+            return 200, {"value": []}, {}
+        if route.endswith("/mailFolders/inbox/messages/delta"):
+            return self.delta(query)
+        match = re.match(r".*/messages/([^/]+)/replyAll$", route)
+        if match:
+            self.replies.append((match.group(1), body))
+            return 202, None, {}
+        match = re.match(r".*/messages/([^/]+)$", route)
+        if match:
+            found = [m for m in self.flagged if m["id"] == match.group(1)]
+            if not found:
+                return 404, {"error": {"message": "not found"}}, {}
+            if method == "PATCH":
+                found[0].update(body)
+            return 200, found[0], {}
+        return 404, {"error": {"message": f"no route {route}"}}, {}
+
+    def throttled(self, route):
+        for pattern, remaining in self.throttle.items():
+            if remaining and re.search(pattern, route):
+                self.throttle[pattern] -= 1
+                return True
+        return False
+
+    def list_flagged(self, query):
+        order, expression = query.get("$orderby"), query.get("$filter", "")
+        # Graph's rule: $orderby properties come first in $filter, in order
+        if order and expression and not expression.startswith(order.split()[0]):
+            return 400, {"error": {"code": "InefficientFilter", "message": "The restriction or sort order is too complex"}}, {}
+        items = [m for m in self.flagged if (m.get("flag") or {}).get("flagStatus") == "flagged"]
+        skip, top = int(query.get("$skip", 0)), int(query.get("$top", 100))
+        return 200, {"value": items[skip:skip + top]}, {}
+
+    def delta(self, query):
+        # Round one pages the Inbox one message at a time; later rounds report removals
+        if query.get("token") == "1":
+            removed = [{"id": i, "@removed": {"reason": "deleted"}} for i in self.removed]
+            return 200, {"value": removed, "@odata.deltaLink": f"{self.url}/users/me/mailFolders/inbox/messages/delta?token=2"}, {}
+        page = int(query.get("page", 0))
+        answer = {"value": self.inbox[page:page + 1]}
+        if page + 1 < len(self.inbox):
+            answer["@odata.nextLink"] = f"{self.url}/users/me/mailFolders/inbox/messages/delta?page={page + 1}"
+        else:
+            answer["@odata.deltaLink"] = f"{self.url}/users/me/mailFolders/inbox/messages/delta?token=1"
+        return 200, answer, {}
+
+    def batch(self, body):
+        if self.throttled("/$batch"):
+            return 429, {"error": {"message": "throttled"}}, {"Retry-After": "0"}
+        self.batches += 1
+        responses = []
+        for request in body["requests"]:
+            status, answer, headers = self.handle(request["method"], "/v1.0" + request["url"], request.get("body"))
+            responses.append({"id": request["id"], "status": status, "headers": headers, "body": answer})
+        # Graph answers in any order
+        return 200, {"responses": responses[::-1]}, {}
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                if self.path.endswith("/$batch"):
+                    status, answer, headers = standin.batch(body)
+                else:
+                    status, answer, headers = standin.handle(method, self.path, body)
+                raw = json.dumps(answer).encode() if answer is not None else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                self.dispatch("GET")
+
+            def do_POST(self):
+                self.dispatch("POST")
+
+            def do_PATCH(self):
+                self.dispatch("PATCH")
+
+        return Handler
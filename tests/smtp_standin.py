@@ -0,0 +1,79 @@
+# Local SMTP relay stand-in for the SMTP transport tests. It speaks just
+# enough SMTP for smtplib (EHLO, MAIL, RCPT, DATA, NOOP, RSET, QUIT), keeps
+# every accepted message and counts the connections that were opened.
+# Addresses in `refuse` are answered 550 at RCPT.
+import email
+import email.policy
+import socketserver
+import threading
+
+
+class SmtpStandIn:
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                with standin.lock:
+                    standin.connections += 1
+                self.reply("220 stand-in ESMTP")
+                envelope = []
+                while True:
+                    line = self.rfile.readline().decode(errors="replace").strip()
+                    if not line:
+                        return
+                    command = line.split(" ", 1)[0].upper()
+                    if command == "EHLO":
+                        self.reply("250-stand-in")
+                        self.reply("250 8BITMIME")
+                    elif command in ("HELO", "NOOP", "RSET", "MAIL"):
+                        envelope = [] if command in ("MAIL", "RSET") else envelope
+                        self.reply("250 OK")
+                    elif command == "RCPT":
+                        address = line.split(":", 1)[1].strip(" <>")
+                        if address in standin.refuse:
+                            self.reply("550 No such user")
+                            continue
+                        envelope.append(address)
+                        self.reply("250 OK")
+                    elif command == "DATA" and not envelope:
+                        self.reply("503 No valid recipients")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        lines = []
+                        while True:
+                            data = self.rfile.readline()
+                            if data in (b".\r\n", b".\n", b""):
+                                break
+                            lines.append(data[1:] if data.startswith(b"..") else data)
+                        message = email.message_from_bytes(b"".join(lines), policy=email.policy.default)
+                        with standin.lock:
+                            standin.messages.append((list(envelope), message))
+                        self.reply("250 OK queued")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
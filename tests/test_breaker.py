@@ -0,0 +1,33 @@
+import pytest
+
+from reminder.backends.memory import MemoryBackend
+from reminder.breaker import CircuitBreaker, CircuitOpen, GuardedBackend
+
+
+class CountingBackend(MemoryBackend):
+    """Memory backend that pretends each address lookup is one server request."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests_made = 0
+
+    def expand_groups(self, addresses):
+        self.count_requests(len(addresses))
+        return {address: None for address in addresses}
+
+
+def test_budget_counts_server_requests_not_method_calls():
+    breaker = CircuitBreaker(max_requests=50)
+    backend = GuardedBackend(CountingBackend(), breaker)
+    backend.expand_groups([f"dl{n}@x.com" for n in range(50)])
+    assert breaker.requests == 50
+    with pytest.raises(CircuitOpen):
+        backend.expand_groups(["dl@x.com"])
+
+
+def test_budget_counts_method_calls_without_server():
+    breaker = CircuitBreaker(max_requests=1)
+    backend = GuardedBackend(MemoryBackend(), breaker)
+    backend.expand_groups(["dl@x.com"])
+    with pytest.raises(CircuitOpen):
+        backend.expand_groups(["dl@x.com"])
@@ -0,0 +1,104 @@
+import datetime
+
+from reminder import Checkpoint, MailItem, MemoryBackend, ReminderEngine, SentLedger, connect
+from reminder.dates import parse_datetime
+
+NOW = parse_datetime("2026-10-19T10:00:00+00:00")
+
+
+def flagged(id):
+    return MailItem(id, subject=f"Subject {id}", reminder_is_set=True, due=NOW + datetime.timedelta(days=1),
+                    conversation_id=f"c-{id}", sender="me@x.com", to=[f"{id}@x.com"])
+
+
+class SlowScan(MemoryBackend):
+    """Every page read takes ten seconds of a fake clock; `fail_at` offsets raise once."""
+
+    def __init__(self, clock, fail_at=(), failing_details=(), **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.fail_at = set(fail_at)
+        self.failing_details = set(failing_details)
+
+    def scan_flagged(self, folder_name, offset=0, limit=None, below_stage=None):
+        self.clock[0] += 10
+        if offset in self.fail_at:
+            self.fail_at.discard(offset)
+            raise RuntimeError("ReadTimeout")
+        return super().scan_flagged(folder_name, offset, limit, below_stage)
+
+    def fetch_details(self, items):
+        details = super().fetch_details(items)
+        details.update({item_id: RuntimeError("GetItem failed") for item_id in self.failing_details})
+        return details
+
+
+def setup(tmp_path, monkeypatch, count=5, **kwargs):
+    clock = [0]
+    monkeypatch.setattr("reminder.engine.time.monotonic", lambda: clock[0])
+    conn = connect(str(tmp_path / "state.db"))
+    backend = SlowScan(clock, folders={"Flag": [flagged(f"m{i}") for i in range(1, count + 1)]}, **kwargs)
+    return conn, backend, Checkpoint(conn, backend.mailbox, "Flag")
+
+
+def reminded(backend):
+    return [m["reply_to"] for m in backend.sent]
+
+
+def test_run_stopped_by_its_deadline_resumes_where_it_stopped(tmp_path, monkeypatch):
+    conn, backend, checkpoint = setup(tmp_path, monkeypatch)
+    engine = ReminderEngine(backend, ledger=SentLedger(conn, backend.mailbox))
+
+    stats = engine.run_resumable(checkpoint, deadline=15, page_size=2, now=NOW)
+    assert not stats["finished"] and stats["remaining"] == 1
+    assert checkpoint.position() == 4 and checkpoint.processed() == {"m1", "m2", "m3", "m4"}
+
+    # The overlap pages are re-read, but their items are not planned again
+    stats = engine.run_resumable(checkpoint, page_size=2, now=NOW)
+    assert stats["finished"] and stats["scanned"] == 1
+    assert reminded(backend) == ["m1", "m2", "m3", "m4", "m5"]
+    assert checkpoint.position() == 0 and checkpoint.processed() == set()
+
+
+def test_backend_error_aborts_without_checkpointing_the_page(tmp_path, monkeypatch):
+    conn, backend, checkpoint = setup(tmp_path, monkeypatch, fail_at={2})
+    engine = ReminderEngine(backend, ledger=SentLedger(conn, backend.mailbox))
+
+    stats = engine.run_resumable(checkpoint, page_size=2, now=NOW)
+    assert stats["aborted"] == "ReadTimeout" and stats["remaining"] is None
+    assert checkpoint.position() == 2 and checkpoint.processed() == {"m1", "m2"}
+
+    stats = engine.run_resumable(checkpoint, page_size=2, now=NOW)
+    assert stats["finished"] and not stats["aborted"]
+    assert reminded(backend) == ["m1", "m2", "m3", "m4", "m5"]
+
+
+def test_reminder_state_position_accounts_for_items_leaving_the_scan(tmp_path, monkeypatch):
+    conn, backend, checkpoint = setup(tmp_path, monkeypatch)
+    engine = ReminderEngine(backend, ledger=SentLedger(conn, backend.mailbox), reminder_state=True)
+
+    engine.run_resumable(checkpoint, deadline=5, page_size=2, now=NOW)
+    # m1 and m2 are stamped and drop out of the filtered scan: m3 is now first
+    assert checkpoint.position() == 0 and backend.count_items("Flag", below_stage=1) == 3
+
+    stats = engine.run_resumable(checkpoint, page_size=2, now=NOW)
+    assert stats["finished"]
+    assert reminded(backend) == ["m1", "m2", "m3", "m4", "m5"]
+
+
+def test_item_skipped_by_an_error_is_retried_by_the_next_run(tmp_path, monkeypatch):
+    conn, backend, checkpoint = setup(tmp_path, monkeypatch, failing_details={"m1"})
+    engine = ReminderEngine(backend, ledger=SentLedger(conn, backend.mailbox))
+
+    engine.run_resumable(checkpoint, deadline=15, page_size=2, now=NOW)
+    assert checkpoint.processed() == {"m2", "m3", "m4"} and checkpoint.retry_position() == 0
+
+    backend.failing_details = set()
+    stats = engine.run_resumable(checkpoint, deadline=15, page_size=2, now=NOW)
+    assert reminded(backend) == ["m2", "m3", "m4", "m1"]
+    # Re-reading for the retry does not move the pass back
+    assert not stats["finished"] and checkpoint.position() == 4
+    assert checkpoint.retry_position() is None
+
+    engine.run_resumable(checkpoint, page_size=2, now=NOW)
+    assert reminded(backend) == ["m2", "m3", "m4", "m1", "m5"]
@@ -0,0 +1,56 @@
+import json
+
+from reminder import cli
+from reminder.backends.memory import MemoryBackend
+
+FIXTURE = {
+    "folders": {"Flag": [{
+        "id": "m1", "subject": "Budget", "reminder_is_set": True, "due": "2026-10-20T10:00:00+00:00",
+        "conversation_id": "c1", "sender": "me@x.com", "to": ["a@x.com"],
+    }]},
+}
+
+
+def run_cli(tmp_path, monkeypatch, *args, mailbox=FIXTURE):
+    fixture = tmp_path / "mailbox.json"
+    fixture.write_text(json.dumps(mailbox))
+    monkeypatch.setenv("REMINDER_NOW", "2026-10-19T10:00:00+00:00")
+    sent = []
+    original = MemoryBackend.send_replies
+    monkeypatch.setattr(MemoryBackend, "send_replies", lambda self, r: sent.extend(r) or original(self, r))
+    cli.main(["--backend", "memory", "--fixture", str(fixture), "--state-db", str(tmp_path / "state.db"), *args])
+    return sent
+
+
+def test_failed_ndr_ingestion_does_not_stop_the_run(tmp_path, monkeypatch):
+    def broken(self, since=None):
+        raise RuntimeError("GetItem failed")
+    monkeypatch.setattr(MemoryBackend, "delivery_reports", broken)
+    assert [r["id"] for r in run_cli(tmp_path, monkeypatch, "--ndr-suppression")] == ["m1"]
+
+
+def test_failed_mirror_sync_falls_back_to_live_reads(tmp_path, monkeypatch):
+    def broken(self, sync_state=None):
+        raise RuntimeError("SyncFolderItems failed")
+    monkeypatch.setattr(MemoryBackend, "sync_inbox", broken)
+    assert [r["id"] for r in run_cli(tmp_path, monkeypatch, "--inbox-mirror")] == ["m1"]
+
+
+def test_second_stage_reminds_again_once(tmp_path, monkeypatch):
+    assert [r["id"] for r in run_cli(tmp_path, monkeypatch)] == ["m1"]
+    assert run_cli(tmp_path, monkeypatch) == []
+    assert [r["id"] for r in run_cli(tmp_path, monkeypatch, "--stage", "2")] == ["m1"]
+    assert run_cli(tmp_path, monkeypatch, "--stage", "2") == []
+
+
+def test_digest_covers_every_page_of_the_run(tmp_path, monkeypatch):
+    items = [
+        {**FIXTURE["folders"]["Flag"][0], "id": f"m{n}", "subject": f"Item {n}", "conversation_id": f"c{n}"}
+        for n in range(1, 4)
+    ]
+    digests = []
+    original = MemoryBackend.send_new_messages
+    monkeypatch.setattr(MemoryBackend, "send_new_messages", lambda self, r: digests.extend(r) or original(self, r))
+    run_cli(tmp_path, monkeypatch, "--transport", "digest", "--page-size", "1", mailbox={"folders": {"Flag": items}})
+    assert len(digests) == 1
+    assert digests[0]["template"]["subject"] == "🔔 تذكير بالمتابعة: 3 رسائل بانتظار ردكم"
@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from reminder import (
+    DedupIndex, GroupExpander, MailItem, MemoryBackend, Outbox, ReminderEngine, ReplyAllTransport, SentLedger, connect,
+)
+from reminder.dates import parse_datetime
+
+NOW = parse_datetime("2026-10-19T10:00:00+00:00")
+
+
+def flagged(id, due_in_days=1, **fields):
+    fields = {"subject": f"Subject {id}", "conversation_id": f"c-{id}", "sender": "me@x.com", "to": ["a@x.com"], **fields}
+    return MailItem(id, reminder_is_set=True, due=NOW + datetime.timedelta(days=due_in_days), **fields)
+
+
+def engine_for(backend, conn, **kwargs):
+    return ReminderEngine(backend, ledger=SentLedger(conn, backend.mailbox), **kwargs)
+
+
+def test_only_non_responders_are_reminded_once(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    item = flagged("m1", to=["a@x.com", "b@x.com"], cc=["c@x.com"])
+    reply = MailItem("r1", subject="RE: Subject m1", conversation_id="c-m1", sender="b@x.com",
+                     datetime_received=NOW - datetime.timedelta(hours=1))
+    backend = MemoryBackend(folders={"Flag": [item]}, inbox=[reply])
+    engine = engine_for(backend, conn)
+
+    plan, marked = engine.run(NOW)
+    assert marked == 1
+    assert plan["items"][0]["responders"] == ["b@x.com"]
+    assert [(m["reply_to"], m["to"]) for m in backend.sent] == [("m1", ["a@x.com", "c@x.com"])]
+    assert list(item.categories) == ["AutoReminderSent"]
+
+    plan, marked = engine.run(NOW)
+    assert plan["items"] == [] and len(backend.sent) == 1
+
+
+def test_items_not_due_or_already_processed_are_skipped(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    items = [flagged("late", due_in_days=30), flagged("done", categories=["AutoReminderSent"]), flagged("due")]
+    engine = engine_for(MemoryBackend(folders={"Flag": items}), conn)
+
+    plan = engine.build_plan(NOW)
+    assert [item["id"] for item in plan["items"]] == ["due"]
+    assert {s["id"]: s["reason"] for s in plan["skipped"]} == {"late": "not due", "done": "already processed"}
+
+
+def test_building_a_plan_changes_nothing(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    item = flagged("m1")
+    backend = MemoryBackend(folders={"Flag": [item]})
+    engine_for(backend, conn).build_plan(NOW)
+    assert not backend.sent and not item.categories
+    assert SentLedger(conn, backend.mailbox).sent_ids(["m1"]) == set()
+
+
+def test_distribution_lists_are_replaced_by_their_members(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    backend = MemoryBackend(folders={"Flag": [flagged("m1", to=["team@x.com"])]},
+                            groups={"team@x.com": ["a@x.com", "b@x.com"]})
+    plan, _ = engine_for(backend, conn, groups=GroupExpander(backend, conn)).run(NOW)
+    assert plan["items"][0]["remind"] == ["a@x.com", "b@x.com"]
+
+
+def test_outbox_does_not_resend_when_the_category_commit_failed(tmp_path, monkeypatch):
+    conn = connect(str(tmp_path / "state.db"))
+    item = flagged("m1")
+    backend = MemoryBackend(folders={"Flag": [item]})
+    engine = engine_for(backend, conn, outbox=Outbox(conn))
+    monkeypatch.setattr(backend, "add_category", lambda *args, **kwargs: [RuntimeError("UpdateItem failed")])
+
+    assert engine.run(NOW)[1] == 0
+    plan, _ = engine.run(NOW)
+    assert plan["skipped"][0]["reason"] == "in sent ledger"
+    assert len(backend.sent) == 1
+
+
+def test_shared_thread_is_reminded_once_across_mailboxes(tmp_path):
+    dedup_path = str(tmp_path / "dedup.db")
+    sent = []
+    for mailbox in ("one@x.com", "two@x.com"):
+        backend = MemoryBackend(folders={"Flag": [flagged("m1", internet_message_id="<orig@x.com>")]})
+        backend.mailbox = mailbox
+        conn = connect(str(tmp_path / f"{mailbox}.db"))
+        engine_for(backend, conn, dedup=DedupIndex.open(dedup_path, mailbox)).run(NOW)
+        sent.extend(backend.sent)
+    assert len(sent) == 1
+
+
+def test_long_recipient_lists_go_out_in_chunks(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    recipients = [f"p{n}@x.com" for n in range(5)]
+    backend = MemoryBackend(folders={"Flag": [flagged("m1", to=recipients)]})
+    engine_for(backend, conn, transport=ReplyAllTransport(max_recipients=2)).run(NOW)
+    assert sorted(len(m["to"]) for m in backend.sent) == [1, 2, 2]
+    assert sorted(a for m in backend.sent for a in m["to"]) == recipients
+
+
+@pytest.mark.parametrize("received, reminded", [
+    (NOW - datetime.timedelta(hours=1), []),
+    # Before the original went out: an earlier message of the conversation
+    (NOW - datetime.timedelta(days=3), ["a@x.com"]),
+    # The window includes both ends: sent time and due + grace
+    (NOW - datetime.timedelta(days=2), []),
+    (NOW + datetime.timedelta(days=1, hours=12), []),
+    (NOW + datetime.timedelta(days=1, hours=12, seconds=1), ["a@x.com"]),
+])
+def test_replies_count_only_inside_the_reply_window(tmp_path, received, reminded):
+    conn = connect(str(tmp_path / "state.db"))
+    item = flagged("m1", datetime_sent=NOW - datetime.timedelta(days=2))
+    reply = MailItem("r1", subject="RE: Subject m1", conversation_id="c-m1", sender="a@x.com",
+                     datetime_received=received)
+    backend = MemoryBackend(folders={"Flag": [item]}, inbox=[reply])
+    engine = engine_for(backend, conn, reply_grace=datetime.timedelta(hours=12))
+
+    plan = engine.build_plan(NOW)
+    assert plan["items"][0]["remind"] == reminded
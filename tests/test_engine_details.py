@@ -0,0 +1,37 @@
+import datetime
+
+from reminder import MailItem, MemoryBackend, ReminderEngine, SentLedger, connect
+from reminder.dates import parse_datetime
+
+NOW = parse_datetime("2026-10-19T10:00:00+00:00")
+
+
+class FlakyDetails(MemoryBackend):
+    """GetItem fails for the ids in `failing`."""
+
+    def __init__(self, failing, **kwargs):
+        super().__init__(**kwargs)
+        self.failing = set(failing)
+
+    def fetch_details(self, items):
+        details = super().fetch_details(items)
+        details.update({item_id: RuntimeError("GetItem failed") for item_id in self.failing})
+        return details
+
+
+def test_item_without_details_is_retried_later(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    item = MailItem("m1", subject="Budget", reminder_is_set=True, due=NOW + datetime.timedelta(days=1),
+                    conversation_id="c1", sender="me@x.com", to=["a@x.com"])
+    backend = FlakyDetails({"m1"}, folders={"Flag": [item]})
+    engine = ReminderEngine(backend, ledger=SentLedger(conn, "memory"))
+
+    plan, marked = engine.run(NOW)
+    assert plan["items"] == [] and marked == 0
+    assert plan["skipped"][0]["reason"] == "details unavailable"
+    assert not item.categories and not backend.sent
+
+    backend.failing = set()
+    plan, marked = engine.run(NOW)
+    assert marked == 1
+    assert [m["to"] for m in backend.sent] == [["a@x.com"]]
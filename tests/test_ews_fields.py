@@ -0,0 +1,31 @@
+# Offline check of the EWS field lists: every name must be a field path
+# exchangelib knows, or QuerySet.only() / Account.fetch() reject the query.
+import pytest
+
+pytest.importorskip("exchangelib")
+
+from exchangelib.folders import FolderCollection, Inbox
+from exchangelib.queryset import QuerySet
+
+from reminder.backends import ews
+
+
+@pytest.mark.parametrize("name", [
+    "SCAN_FIELDS", "DETAIL_FIELDS", "HEADER_FIELDS", "MIRROR_FIELDS", "REMINDER_STATE_FIELDS",
+])
+def test_field_list_is_known_to_exchangelib(name):
+    query = QuerySet(FolderCollection(account=None, folders=[Inbox()]))
+    query.only(*getattr(ews, name))
+
+
+def test_unknown_field_is_rejected():
+    query = QuerySet(FolderCollection(account=None, folders=[Inbox()]))
+    with pytest.raises(ValueError):
+        query.only("internet_message_id")
+
+
+def test_to_mail_item_maps_message_id():
+    msg = ews.Message(subject="Budget", message_id="<m1@x>", in_reply_to="<m0@x>")
+    item = ews.to_mail_item(msg)
+    assert item.internet_message_id == "<m1@x>"
+    assert item.in_reply_to == "<m0@x>"
@@ -0,0 +1,47 @@
+# Offline check of the mailbox-wide flagged search used when Outlook has
+# not created the To-Do search folder.
+import pytest
+
+pytest.importorskip("exchangelib")
+
+from exchangelib import Account
+from exchangelib.errors import ErrorFolderNotFound
+from exchangelib.folders import DeletedItems, Inbox, JunkEmail, Messages, SentItems
+from exchangelib.properties import ParentFolderId
+
+from reminder.backends.base import SEARCH_SOURCE
+
+from .ews_offline import offline_backend
+
+
+def folder(cls, id, parent="root"):
+    return cls(id=id, name=id, parent_folder_id=ParentFolderId(id=parent))
+
+
+HIERARCHY = [
+    folder(Inbox, "inbox"),
+    folder(Messages, "projects", parent="inbox"),
+    folder(SentItems, "sent"),
+    folder(DeletedItems, "deleted"),
+    folder(Messages, "old", parent="deleted"),
+    folder(Messages, "older", parent="old"),
+    folder(JunkEmail, "junk"),
+]
+
+
+class Root:
+    def walk(self):
+        return iter(HIERARCHY)
+
+
+def test_flagged_search_skips_deleted_items_and_junk(monkeypatch):
+    def no_todo_search(account):
+        raise ErrorFolderNotFound("no To-Do search folder")
+
+    monkeypatch.setattr(Account, "todo_search", property(no_todo_search))
+    monkeypatch.setattr(Account, "msg_folder_root", property(lambda account: Root()))
+    backend = offline_backend()
+
+    query = backend._flagged_query(SEARCH_SOURCE)
+    assert [f.id for f in query.folder_collection.folders] == ["inbox", "projects", "sent"]
+    assert "flag_status" in str(query.q)
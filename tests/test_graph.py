@@ -0,0 +1,73 @@
+import pytest
+
+from reminder.backends import get_backend
+from reminder.backends.base import SEARCH_SOURCE
+from reminder.config import GraphSettings
+
+from .graph_standin import GraphStandIn, message
+
+FLAGGED = [
+    message("m1", "Budget", "2026-10-01T09:00:00Z", flag={"flagStatus": "flagged"},
+            sender={"emailAddress": {"address": "me@x.com"}},
+            toRecipients=[{"emailAddress": {"address": "a@x.com"}}]),
+    message("m2", "Plan", "2026-10-02T09:00:00Z", flag={"flagStatus": "flagged"},
+            sender={"emailAddress": {"address": "me@x.com"}},
+            toRecipients=[{"emailAddress": {"address": "b@x.com"}}]),
+    message("m3", "Done", "2026-10-03T09:00:00Z", flag={"flagStatus": "complete"}),
+]
+INBOX = [
+    message("i1", "RE: Budget", "2026-10-04T09:00:00Z", internetMessageId="<i1@x.com>"),
+    message("i2", "RE: Plan", "2026-10-05T09:00:00Z", internetMessageId="<i2@x.com>"),
+]
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    with GraphStandIn(flagged=FLAGGED, inbox=INBOX) as standin:
+        monkeypatch.setenv("GRAPH_URL", standin.url)
+        monkeypatch.setenv("GRAPH_TOKEN", "test")
+        monkeypatch.setenv("GRAPH_MAILBOX", "me@x.com")
+        monkeypatch.setattr("reminder.backends.graph.time.sleep", lambda seconds: None)
+        yield standin, get_backend("graph", settings=GraphSettings())
+
+
+def test_flagged_scan_orders_by_the_leading_filter_property(graph):
+    standin, backend = graph
+    assert [item.id for item in backend.scan_flagged(SEARCH_SOURCE)] == ["m1", "m2"]
+    _, _, query = standin.requests[-1]
+    assert query["$filter"].startswith("receivedDateTime ge ")
+
+
+def test_details_are_fetched_in_one_batch_and_throttled_requests_retried(graph):
+    standin, backend = graph
+    items = backend.scan_flagged(SEARCH_SOURCE)
+    standin.throttle[r"/messages/m2$"] = 1
+    batches = standin.batches
+
+    details = backend.fetch_details(items)
+
+    assert list(details["m1"].to) == ["a@x.com"] and list(details["m2"].to) == ["b@x.com"]
+    # details round, its retry for m2, then the group lookups
+    assert standin.batches - batches == 3
+    # Every request inside a batch counts, the throttled one twice
+    assert backend.requests_made == 1 + 3 + 2
+
+
+def test_throttled_batch_call_is_retried(graph):
+    standin, backend = graph
+    standin.throttle[r"/\$batch$"] = 1
+    reminders = [{"id": "m1", "remind": ["a@x.com"], "template": {"subject": "RE: Budget", "body": "Any news?"}}]
+    assert backend.send_replies(reminders) == [True]
+    assert [item_id for item_id, _ in standin.replies] == ["m1"]
+
+
+def test_delta_sync_follows_pages_then_reports_removals(graph):
+    standin, backend = graph
+    changes, state = backend.sync_inbox()
+    assert [(kind, item.id) for kind, item in changes] == [("create", "i1"), ("create", "i2")]
+    assert state.endswith("token=1")
+
+    standin.removed = ["i1"]
+    changes, state = backend.sync_inbox(state)
+    assert changes == [("delete", "i1")]
+    assert state.endswith("token=2")
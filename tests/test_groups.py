@@ -0,0 +1,28 @@
+import time
+
+from reminder import GroupExpander, MemoryBackend, connect
+
+
+def test_unexpandable_group_is_cached_for_the_shorter_ttl(tmp_path, monkeypatch):
+    conn = connect(str(tmp_path / "state.db"))
+    backend = MemoryBackend(groups={"team@x.com": ["a@x.com"]})
+    expander = GroupExpander(backend, conn, ttl_seconds=86400, negative_ttl_seconds=60)
+
+    assert expander.expand({"team@x.com", "dynamic@x.com"}) == {"team@x.com": {"a@x.com"}}
+    assert expander.expand({"team@x.com", "dynamic@x.com"}) == {"team@x.com": {"a@x.com"}}
+    assert backend.calls["expand_groups"] == 1
+
+    later = time.time() + 120
+    monkeypatch.setattr("reminder.store.time.time", lambda: later)
+    expander.expand({"team@x.com", "dynamic@x.com"})
+    assert backend.calls["expand_groups"] == 2
+
+
+def test_failed_expansion_is_not_cached(tmp_path, monkeypatch):
+    conn = connect(str(tmp_path / "state.db"))
+    backend = MemoryBackend(groups={"team@x.com": ["a@x.com"]})
+    expander = GroupExpander(backend, conn)
+    monkeypatch.setattr(backend, "expand_groups", lambda addresses: 1 / 0)
+    assert expander.expand({"team@x.com"}) == {}
+    monkeypatch.undo()
+    assert expander.expand({"team@x.com"}) == {"team@x.com": {"a@x.com"}}
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from reminder import hedge
+from reminder.hedge import HedgedBackend, ReadTimeout
+
+
+class SlowInbox:
+    """inbox_headers yields `pages` pages of 2 items, each page taking `delay` seconds."""
+
+    def __init__(self, pages, delay, hang_on=None):
+        self.pages, self.delay, self.hang_on = pages, delay, hang_on
+
+    def inbox_headers(self, since=None, until=None):
+        for page in range(self.pages):
+            time.sleep(1 if page == self.hang_on else self.delay)
+            yield from (f"h{page}a", f"h{page}b")
+
+    def close(self):
+        pass
+
+
+def test_timeout_applies_per_page(monkeypatch):
+    monkeypatch.setattr(hedge, "PAGE_ITEMS", 2)
+    backend = HedgedBackend(SlowInbox(pages=5, delay=0.1), timeout=0.3)
+    # The whole pass takes longer than the timeout; no single page does
+    assert len(list(backend.inbox_headers())) == 10
+
+
+def test_stalled_page_times_out(monkeypatch):
+    monkeypatch.setattr(hedge, "PAGE_ITEMS", 2)
+    backend = HedgedBackend(SlowInbox(pages=3, delay=0.01, hang_on=1), timeout=0.3)
+    with pytest.raises(ReadTimeout):
+        list(backend.inbox_headers())
@@ -0,0 +1,65 @@
+import pytest
+
+from reminder import IdentityResolver, MemoryBackend, connect
+
+X500 = "/o=org/ou=exchange administrative group/cn=recipients/cn=ahmed"
+RESOLVED = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<m:ResolveNamesResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+ xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types"><m:ResponseMessages>
+<m:ResolveNamesResponseMessage ResponseClass="Success"><m:ResponseCode>NoError</m:ResponseCode>
+<m:ResolutionSet TotalItemsInView="1" IncludesLastItemInRange="true"><t:Resolution>
+<t:Mailbox><t:Name>Ahmed</t:Name><t:EmailAddress>Ahmed@x.com</t:EmailAddress><t:RoutingType>SMTP</t:RoutingType>
+<t:MailboxType>Mailbox</t:MailboxType></t:Mailbox>
+<t:Contact><t:DisplayName>Ahmed</t:DisplayName><t:EmailAddresses>
+<t:Entry Key="EmailAddress1">SMTP:Ahmed@x.com</t:Entry>
+<t:Entry Key="EmailAddress2">smtp:a.ahmed@x.com</t:Entry>
+<t:Entry Key="EmailAddress3">X500:/O=Org/OU=Exchange Administrative Group/CN=Recipients/CN=ahmed</t:Entry>
+</t:EmailAddresses></t:Contact>
+</t:Resolution></m:ResolutionSet></m:ResolveNamesResponseMessage>
+</m:ResponseMessages></m:ResolveNamesResponse></s:Body></s:Envelope>"""
+NOT_FOUND = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<m:ResolveNamesResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+ xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types"><m:ResponseMessages>
+<m:ResolveNamesResponseMessage ResponseClass="Error"><m:MessageText>No results were found.</m:MessageText>
+<m:ResponseCode>ErrorNameResolutionNoResults</m:ResponseCode><m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+</m:ResolveNamesResponseMessage></m:ResponseMessages></m:ResolveNamesResponse></s:Body></s:Envelope>"""
+
+
+def test_memory_aliases_resolve_to_the_primary_address(tmp_path):
+    backend = MemoryBackend(aliases={"ahmed@x.com": ["a.ahmed@x.com", X500]})
+    resolver = IdentityResolver(backend, connect(str(tmp_path / "state.db")))
+    assert resolver.resolve({"a.ahmed@x.com", X500, "guest@y.com"}) == {
+        "a.ahmed@x.com": "ahmed@x.com", X500: "ahmed@x.com", "guest@y.com": "guest@y.com",
+    }
+    # Every proxy of the mailbox was learned from the one lookup
+    assert resolver.resolve({"ahmed@x.com"}) == {"ahmed@x.com": "ahmed@x.com"}
+    assert backend.calls["resolve_addresses"] == 1
+
+
+def test_ews_resolve_names_maps_smtp_and_x500_proxies(monkeypatch):
+    pytest.importorskip("exchangelib")
+    from exchangelib.services import ResolveNames
+
+    from .ews_offline import offline_backend
+
+    backend = offline_backend()
+    protocol = backend.account.protocol
+
+    asked = []
+
+    def resolve_names(names, return_full_contact_data=False, **kwargs):
+        asked.extend(names)
+        service = ResolveNames(protocol=protocol)
+        service.return_full_contact_data = return_full_contact_data
+        return list(service.parse(RESOLVED if names[0] != "guest@y.com" else NOT_FOUND))
+
+    monkeypatch.setattr(protocol, "resolve_names", resolve_names)
+    resolver = IdentityResolver(backend)
+    assert resolver.resolve({"a.ahmed@x.com", "guest@y.com"}) == {
+        "a.ahmed@x.com": "ahmed@x.com", "guest@y.com": "guest@y.com",
+    }
+    # The X500 proxy (an old legacyExchangeDN) was learned with the SMTP alias
+    assert resolver.resolve({X500, "ahmed@x.com"}) == {X500: "ahmed@x.com", "ahmed@x.com": "ahmed@x.com"}
+    assert sorted(asked) == ["a.ahmed@x.com", "guest@y.com"]
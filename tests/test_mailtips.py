@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+
+from reminder import MailItem, MailTipsFilter, MemoryBackend, Outbox, ReminderEngine, SentLedger, connect
+from reminder.dates import parse_datetime
+
+NOW = parse_datetime("2026-10-19T10:00:00+00:00")
+
+GET_MAIL_TIPS_RESPONSE = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<m:GetMailTipsResponse ResponseClass="Success"
+    xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+    xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+<m:ResponseCode>NoError</m:ResponseCode><m:ResponseMessages>
+<m:MailTipsResponseMessageType ResponseClass="Success"><m:ResponseCode>NoError</m:ResponseCode><m:MailTips>
+<t:RecipientAddress><t:EmailAddress>A@x.com</t:EmailAddress><t:RoutingType>SMTP</t:RoutingType></t:RecipientAddress>
+<t:OutOfOffice><t:ReplyBody><t:Message>Back on Sunday</t:Message></t:ReplyBody></t:OutOfOffice>
+<t:MaxMessageSize>1000</t:MaxMessageSize><t:InvalidRecipient>false</t:InvalidRecipient>
+</m:MailTips></m:MailTipsResponseMessageType>
+<m:MailTipsResponseMessageType ResponseClass="Success"><m:ResponseCode>NoError</m:ResponseCode><m:MailTips>
+<t:RecipientAddress><t:EmailAddress>b@x.com</t:EmailAddress><t:RoutingType>SMTP</t:RoutingType></t:RecipientAddress>
+<t:OutOfOffice><t:ReplyBody><t:Message></t:Message></t:ReplyBody></t:OutOfOffice>
+<t:InvalidRecipient>true</t:InvalidRecipient>
+</m:MailTips></m:MailTipsResponseMessageType>
+</m:ResponseMessages></m:GetMailTipsResponse></s:Body></s:Envelope>"""
+
+
+def test_ews_mail_tips_are_parsed():
+    pytest.importorskip("exchangelib")
+    from exchangelib.services import GetMailTips
+    from exchangelib.version import Build, Version
+
+    from reminder.backends.ews import to_mail_tip
+
+    class Protocol:
+        version = Version(Build(15, 1))
+
+    tips = [to_mail_tip(tip) for tip in GetMailTips(protocol=Protocol()).parse(GET_MAIL_TIPS_RESPONSE)]
+    assert tips == [
+        {"oof": True, "invalid": False, "max_size": 1000},
+        {"oof": False, "invalid": True, "max_size": None},
+    ]
+
+
+def test_ews_mail_tips_request_names_the_requested_tips():
+    pytest.importorskip("exchangelib")
+    from exchangelib.properties import Mailbox, SendingAs
+    from exchangelib.util import xml_to_str
+
+    from reminder.backends.ews import MailTipsRequest
+
+    from .ews_offline import offline_backend
+
+    service = MailTipsRequest(protocol=offline_backend().account.protocol)
+    payload = service.get_payload(
+        recipients=[Mailbox(email_address="a@x.com")], sending_as=SendingAs(email_address="me@x.com"),
+        mail_tips_requested="All",
+    )
+    assert payload.text is None
+    assert payload.find("{*}MailTipsRequested").text == "All"
+    assert "<m:MailTipsRequested>All</m:MailTipsRequested>" in xml_to_str(payload)
+
+
+def test_deferred_recipients_are_reminded_on_a_later_run(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    item = MailItem("m1", subject="Budget", reminder_is_set=True, due=NOW + datetime.timedelta(days=1),
+                    conversation_id="c1", sender="me@x.com", to=["a@x.com", "b@x.com"])
+    backend = MemoryBackend(folders={"Flag": [item]}, mailtips={"a@x.com": {"oof": True}})
+
+    def run():
+        engine = ReminderEngine(backend, ledger=SentLedger(conn, "memory"), outbox=Outbox(conn),
+                                mail_tips=MailTipsFilter(backend))
+        engine.run(NOW)
+
+    run()
+    assert [m["to"] for m in backend.sent] == [["b@x.com"]]
+    assert not item.categories
+
+    backend.mailtips = {}
+    run()
+    run()
+    assert [m["to"] for m in backend.sent] == [["b@x.com"], ["a@x.com"]]
+    assert list(item.categories) == ["AutoReminderSent"]
+    assert SentLedger(conn, "memory").history("m1")[0]["recipients"] == ["a@x.com", "b@x.com"]
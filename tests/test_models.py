@@ -0,0 +1,57 @@
+import pytest
+
+from reminder import MailItem
+
+
+def runtime(text):
+    # Built at runtime, so equal strings are distinct objects until interned
+    return "".join(list(text))
+
+
+def test_mail_item_is_slotted():
+    item = MailItem("m1", to=["a@x.com"])
+    assert not hasattr(item, "__dict__")
+    with pytest.raises(AttributeError):
+        item.extra = "no room"
+
+
+def test_recipients_are_interned_and_shared_across_items():
+    first = MailItem("m1", sender=runtime("Boss@X.com"), to=[runtime("A@x.com")], conversation_id=runtime("c-1"))
+    second = MailItem("m2", sender=runtime("boss@x.com"), cc=[runtime("a@X.COM")], conversation_id=runtime("c-1"))
+    assert first.to == second.cc == ("a@x.com",)
+    assert first.to[0] is second.cc[0]
+    assert first.sender is second.sender
+    assert first.conversation_id is second.conversation_id
+    assert isinstance(first.to, tuple) and first.groups is second.groups
+
+
+def test_ews_scan_keeps_compact_records_only(monkeypatch):
+    pytest.importorskip("exchangelib")
+    from exchangelib.properties import ConversationId, Mailbox
+
+    from reminder.backends import ews
+
+    from .ews_offline import offline_backend
+
+    messages = [
+        ews.Message(id=f"m{n}", changekey="ck", subject="Budget", reminder_is_set=True, categories=["Red"],
+                    conversation_id=ConversationId(id=runtime("c-1")),
+                    sender=Mailbox(email_address=runtime("Me@x.com")),
+                    to_recipients=[Mailbox(email_address=runtime("A@X.com"))])
+        for n in (1, 2)
+    ]
+
+    class Query:
+        def only(self, *fields):
+            return self
+
+        def order_by(self, *fields):
+            return messages
+
+    backend = offline_backend()
+    monkeypatch.setattr(backend, "_candidates", lambda folder_name, below_stage=None: Query())
+
+    first, second = backend.scan_flagged("Flag")
+    assert type(first) is MailItem and first.categories == ("Red",)
+    assert first.to == ("a@x.com",) and first.to[0] is second.to[0]
+    assert first.sender is second.sender and first.conversation_id is second.conversation_id
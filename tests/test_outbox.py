@@ -0,0 +1,57 @@
+from reminder import Outbox, connect
+from reminder.outbox import DONE, FAILED, PENDING, SENT
+from reminder.transports import Transport
+
+PLAN = {"sent_category": "AutoReminderSent", "items": [{"id": "m1", "subject": "Budget", "remind": ["a@x.com"]}]}
+
+
+class FailingEngine:
+    transport = Transport()
+
+    def send_reminders(self, items):
+        return [RuntimeError("send failed")] * len(items)
+
+
+def test_replanned_failed_entry_is_retried(tmp_path):
+    outbox = Outbox(connect(str(tmp_path / "state.db")), max_attempts=1)
+    assert outbox.enqueue(PLAN) == 1
+    outbox.drain(FailingEngine())
+    assert outbox.stats() == {FAILED: 1}
+
+    assert outbox.enqueue(PLAN) == 0
+    assert outbox.stats() == {PENDING: 1}
+    assert outbox.enqueue(PLAN) == 0
+    assert outbox.stats() == {PENDING: 1}
+
+
+class CommitFailingEngine:
+    transport = Transport()
+
+    def __init__(self):
+        self.commit_ok = False
+        self.sends = 0
+
+    def send_reminders(self, items):
+        self.sends += len(items)
+        return [True] * len(items)
+
+    def commit_categories(self, items, category, now=None):
+        return [True if self.commit_ok else RuntimeError("UpdateItem failed")] * len(items)
+
+
+def test_sent_entry_keeps_retrying_its_commit(tmp_path, monkeypatch):
+    outbox = Outbox(connect(str(tmp_path / "state.db")), max_attempts=2)
+    engine = CommitFailingEngine()
+    clock = [1000.0]
+    monkeypatch.setattr("reminder.outbox.time.time", lambda: clock[0])
+    outbox.enqueue(PLAN)
+
+    for _ in range(5):
+        assert outbox.drain(engine) == 0
+        clock[0] += 86400
+    assert outbox.stats() == {SENT: 1}
+
+    engine.commit_ok = True
+    assert outbox.drain(engine) == 1
+    assert outbox.stats() == {DONE: 1}
+    assert engine.sends == 1
@@ -0,0 +1,18 @@
+from reminder.models import MailItem
+from reminder.recipients import AllRecipients, ReplyAllRecipients
+
+
+def make_item():
+    return MailItem(
+        "m1", subject="Budget", sender="author@x.com",
+        to=["a@x.com", "box@x.com"], cc=["c@x.com"], bcc=["hidden@x.com"],
+    )
+
+
+def test_reply_all_keeps_bcc_off_the_thread_and_includes_the_author():
+    policy = ReplyAllRecipients(mailbox="box@x.com")
+    assert policy.select(make_item(), {"a@x.com"}) == {"author@x.com", "a@x.com", "c@x.com"}
+
+
+def test_all_recipients_reaches_bcc_without_the_author():
+    assert AllRecipients().select(make_item(), set()) == {"a@x.com", "box@x.com", "c@x.com", "hidden@x.com"}
@@ -0,0 +1,78 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("exchangelib")
+from requests import Request
+
+from reminder.backends import ews
+from reminder.dates import parse_datetime
+from reminder.recorder import replay_adapter, request_key, scrub_text
+
+from .ews_offline import offline_backend
+
+RESPONSE = (
+    "<t:Message><t:Subject>RE: Budget 2027</t:Subject>"
+    "<t:InternetMessageId>&lt;abc123@mail.contoso.com&gt;</t:InternetMessageId>"
+    "<t:From><t:Mailbox><t:Name>Fatima Al-Harbi</t:Name><t:EmailAddress>fatima@contoso.com</t:EmailAddress>"
+    "</t:Mailbox></t:From><t:DisplayTo>Omar Saleh; Lina Haddad</t:DisplayTo></t:Message>"
+)
+
+CONTACT = (
+    "<t:Contact><t:DisplayName>Fatima Al-Harbi</t:DisplayName><t:PhysicalAddresses>"
+    '<t:Entry Key="Business"><t:Street>12 King Fahd Road</t:Street><t:City>Riyadh</t:City></t:Entry>'
+    '</t:PhysicalAddresses><t:PhoneNumbers><t:Entry Key="MobilePhone">+966 55 123 4567</t:Entry></t:PhoneNumbers>'
+    "<t:OfficeLocation>Tower B, floor 14</t:OfficeLocation></t:Contact>"
+)
+NDR = '<t:Message><t:MimeContent CharacterSet="UTF-8">UmVjZWl2ZWQ6IGZyb20gbWFpbC5jb250b3NvLmNvbQ==</t:MimeContent></t:Message>'
+
+
+def test_scrub_removes_names_subjects_and_message_id_hosts():
+    scrubbed = scrub_text(RESPONSE)
+    for secret in ("Budget", "mail.contoso", "Fatima", "Omar", "Lina", "fatima@"):
+        assert secret not in scrubbed
+    # Scrubbing is stable, so replayed requests still match the recording
+    assert scrub_text(scrubbed) == scrubbed
+
+
+def test_scrub_drops_full_contact_data_and_mime_content():
+    scrubbed = scrub_text(CONTACT + NDR)
+    for secret in ("King Fahd", "Riyadh", "+966", "Tower B", "UmVjZWl2ZWQ"):
+        assert secret not in scrubbed
+    assert '<t:MimeContent CharacterSet="UTF-8">[scrubbed]</t:MimeContent>' in scrubbed
+
+
+def test_reminder_state_is_stamped_with_the_run_clock(monkeypatch):
+    backend = offline_backend()
+    account = backend.account
+    updated = []
+    monkeypatch.setattr(account, "fetch", lambda ids, only_fields: [ews.Message(categories=[]) for _ in ids])
+    monkeypatch.setattr(account, "bulk_update", lambda items: updated.extend(items) or [True] * len(items))
+    now = parse_datetime("2026-10-19T13:00:00+03:00")
+
+    backend.add_category(["m1"], "AutoReminderSent", states={"m1": (1, ["a@x.com"], now)})
+    msg, fields = updated[0]
+    # A replayed run sends the same UpdateItem, so its request key still matches
+    assert msg.reminder_last_sent == now and "reminder_last_sent" in fields
+
+
+def test_replayed_subject_search_matches_the_recording():
+    search = '<t:FieldURI FieldURI="item:Subject"/><t:Constant Value="{}"/>'
+    subject = scrub_text(RESPONSE).split("<t:Subject>")[1].split("</t:Subject>")[0]
+    assert scrub_text(search.format("RE: Budget 2027")) == scrub_text(search.format(subject))
+
+
+def test_replay_honours_recorded_offsets(tmp_path):
+    requests = [Request("POST", "https://mail.x.com/EWS/Exchange.asmx", data=f"<n>{n}</n>").prepare() for n in (0, 1)]
+    recording = tmp_path / "run.jsonl"
+    with open(recording, "w") as f:
+        for request, offset in zip(requests, (0.0, 0.3)):
+            key = request_key(request.method, request.url, request.body)
+            f.write(json.dumps({"key": key, "offset": offset, "elapsed": 0.0, "status": 200, "headers": {}, "body": ""}) + "\n")
+
+    adapter = replay_adapter(str(recording), speed=1.0)()
+    started = time.monotonic()
+    for request in requests:
+        adapter.send(request)
+    assert time.monotonic() - started >= 0.3
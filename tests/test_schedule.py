@@ -0,0 +1,48 @@
+import datetime
+
+from reminder import MailItem, MemoryBackend, ReminderEngine, ReminderSchedule, SentLedger, connect
+from reminder.dates import parse_datetime
+
+NIGHT = parse_datetime("2026-10-19T01:00:00+00:00")
+
+
+def make_backend():
+    return MemoryBackend(folders={"Flag": [
+        MailItem("m1", subject="Budget", reminder_is_set=True, due=parse_datetime("2026-10-24T10:00:00+00:00"),
+                 conversation_id="c1", sender="me@x.com", to=["a@x.com", "b@x.com"]),
+    ]})
+
+
+def make_engine(backend, conn, **kwargs):
+    return ReminderEngine(backend, ledger=SentLedger(conn, "memory"), schedule=ReminderSchedule(conn, "memory"),
+                          **kwargs)
+
+
+def test_reply_cancels_and_reschedules(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    backend = make_backend()
+    stats = make_engine(backend, conn, due_window=datetime.timedelta(days=7)).run_scheduled(NIGHT)
+    assert stats["scheduled"] == 1
+    assert backend.scheduled[0]["send_at"] == "2026-10-22T10:00:00+00:00"
+
+    backend.inbox.append(MailItem("r1", subject="RE: Budget", conversation_id="c1", sender="b@x.com"))
+    stats = make_engine(backend, conn, due_window=datetime.timedelta(days=7)).run_scheduled(
+        NIGHT + datetime.timedelta(days=1))
+    assert stats["cancelled"] == 1 and stats["scheduled"] == 1
+    assert [m["to"] for m in backend.scheduled] == [["a@x.com"]]
+
+
+def test_plain_runs_skip_and_settle_scheduled_reminders(tmp_path):
+    conn = connect(str(tmp_path / "state.db"))
+    backend = make_backend()
+    make_engine(backend, conn, due_window=datetime.timedelta(days=7)).run_scheduled(NIGHT)
+
+    # Inside the reminder window, but Exchange holds the reminder until 10-22 10:00
+    plan, _ = make_engine(backend, conn).run(parse_datetime("2026-10-22T09:00:00+00:00"))
+    assert plan["skipped"][0]["reason"] == "already scheduled"
+
+    # After the send time the poll records the delivery instead of sending again
+    plan, _ = make_engine(backend, conn).run(parse_datetime("2026-10-23T13:00:00+00:00"))
+    assert plan["items"] == [] and plan["skipped"][0]["reason"] == "in sent ledger"
+    assert backend.sent == []
+    assert SentLedger(conn, "memory").sent_ids(["m1"]) == {"m1"}
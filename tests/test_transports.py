@@ -0,0 +1,99 @@
+import smtplib
+
+import pytest
+
+from reminder import TRANSPORTS, SmtpRelayTransport
+from reminder.config import SmtpSettings
+from reminder.templates import ArabicReminderTemplate
+
+from .smtp_standin import SmtpStandIn
+
+
+def reminder(id, **fields):
+    return {
+        "id": id, "subject": f"Subject {id}", "remind": ["a@x.com", "b@x.com"],
+        "template": {"subject": f"RE: Subject {id}", "body": "Reminder"}, **fields,
+    }
+
+
+def smtp_transport(relay, monkeypatch):
+    monkeypatch.setenv("SMTP_HOST", relay.host)
+    monkeypatch.setenv("SMTP_PORT", str(relay.port))
+    monkeypatch.setenv("SMTP_STARTTLS", "0")
+    monkeypatch.setenv("SMTP_FROM", "followup@x.com")
+    return SmtpRelayTransport(ArabicReminderTemplate(), settings=SmtpSettings())
+
+
+def test_smtp_batches_share_one_pooled_connection(monkeypatch):
+    with SmtpStandIn() as relay:
+        transport = smtp_transport(relay, monkeypatch)
+        assert transport.send(None, [reminder("m1"), reminder("m2")]) == [True, True]
+        assert transport.send(None, [reminder("m3")]) == [True]
+        transport.pool.close()
+
+    assert relay.connections == 1
+    assert [envelope for envelope, _ in relay.messages] == [["a@x.com", "b@x.com"]] * 3
+
+
+def test_smtp_reminder_threads_under_the_original(monkeypatch):
+    with SmtpStandIn() as relay:
+        transport = smtp_transport(relay, monkeypatch)
+        transport.send(None, [
+            reminder("m1", internet_message_id="<orig@x.com>", references="<root@x.com>"),
+            reminder("m2"),
+        ])
+        transport.pool.close()
+
+    threaded, standalone = (message for _, message in relay.messages)
+    assert threaded["In-Reply-To"] == "<orig@x.com>"
+    assert threaded["References"] == "<root@x.com> <orig@x.com>"
+    assert threaded["Subject"] == "RE: Subject m1"
+    assert standalone["In-Reply-To"] is None and standalone["References"] is None
+
+
+def test_smtp_refused_recipients(monkeypatch):
+    with SmtpStandIn(refuse={"b@x.com", "c@x.com"}) as relay:
+        transport = smtp_transport(relay, monkeypatch)
+        partial, refused = transport.send(None, [reminder("m1"), reminder("m2", remind=["b@x.com", "c@x.com"])])
+        transport.pool.close()
+
+    # Partly refused still went out to the others; refused by all is a failure
+    assert partial is True
+    assert isinstance(refused, smtplib.SMTPRecipientsRefused)
+    assert [envelope for envelope, _ in relay.messages] == [["a@x.com"]]
+
+
+def test_stale_pooled_connection_is_closed_and_replaced(monkeypatch):
+    class Stale:
+        closed = False
+
+        def noop(self):
+            return 421, b"Timeout"
+
+        def close(self):
+            self.closed = True
+
+    with SmtpStandIn() as relay:
+        transport = smtp_transport(relay, monkeypatch)
+        stale = Stale()
+        transport._pool().idle.put(stale)
+        assert transport.send(None, [reminder("m1")]) == [True]
+        transport.pool.close()
+
+    assert stale.closed and relay.connections == 1
+
+@pytest.mark.parametrize("transport, item_class", [
+    ("reply", "ReplyToItem"), ("reply-all", "ReplyAllToItem"), ("new-message", "Message"),
+])
+def test_ews_item_class_per_transport(transport, item_class):
+    pytest.importorskip("exchangelib")
+    from .ews_offline import offline_backend
+
+    backend = offline_backend()
+    created = []
+    backend._create = lambda items: created.extend(items) or [True] * len(items)
+    assert TRANSPORTS[transport]().send(backend, [reminder("m1")]) == [True]
+
+    assert [type(item).__name__ for item in created] == [item_class]
+    assert list(created[0].to_recipients) == ["a@x.com", "b@x.com"]
+    assert not created[0].cc_recipients